@@ -1,20 +1,60 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, ADMIN_USERNAME, ADMIN_PASSWORD
+from cache import TTLCache
+from config import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, TOKEN_CACHE_SIZE,
+    BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, STAFF_CACHE_SIZE, STAFF_CACHE_TTL
+)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Хэши с другой схемой или стоимостью считаются устаревшими и пересчитываются при входе
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 security = HTTPBearer()
 
+# bcrypt - сотни миллисекунд CPU (GIL при этом отпускается): проверка пароля
+# идет в своем ограниченном пуле, а не в event loop и не в пуле потоков FastAPI
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+# Проверенные токены: sha256(токен) -> имя пользователя, запись живет до exp токена.
+# Недействительные токены не кэшируются.
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# Учетные записи для входа: ("staff", имя) -> строка StaffUser; отсутствующие имена не кэшируются
+staff_cache = TTLCache(maxsize=STAFF_CACHE_SIZE, ttl=STAFF_CACHE_TTL)
+
+
+def staff_tag(username: str) -> str:
+    """Тег записи кэша учетной записи username"""
+    return f"staff:{username}"
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """Проверить пароль в password_executor: (верен, новый хэш или None).
+    
+    Новый хэш возвращается, если сохраненный устарел. Без хэша (нет такого
+    пользователя) выполняется холостая проверка той же длительности, чтобы
+    время ответа не выдавало существующие имена.
+    """
+    loop = asyncio.get_running_loop()
+    if hashed_password is None:
+        await loop.run_in_executor(password_executor, pwd_context.dummy_verify)
+        return False, None
+    return await loop.run_in_executor(
+        password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -25,6 +65,24 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def decode_token(token: str) -> str:
+    """Имя пользователя из токена; подпись проверяется один раз за время жизни токена.
+    
+    Бросает JWTError, если токен недействителен.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    found, username = token_cache.get(key)
+    if found:
+        return username
+    
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    username = payload.get("sub")
+    if username is None:
+        raise JWTError("Token has no subject")
+    expires_at = payload.get("exp")
+    token_cache.set(key, username, ttl=expires_at - time.time() if expires_at is not None else None)
+    return username
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -33,16 +91,7 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     )
     
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        return username
+        return decode_token(credentials.credentials)
     except JWTError:
         raise credentials_exception
 
-def authenticate_user(username: str, password: str):
-    if username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
-        return {"username": username}
-    return False
-
@@ -0,0 +1,93 @@
+"""
+Стоимость аутентификации на запрос: проверка JWT с кэшем и без.
+
+Сначала измеряется сама проверка токена: jwt.decode (подпись и exp)
+против auth.decode_token с попаданием в кэш проверенных токенов. Затем
+те же запросы выполняются через приложение чередующимися раундами с
+выключенным и включенным кэшем (берется лучший раунд): /health (без аутентификации), /auth/me (только аутентификация)
+и /issues/customers/{id}/current (аутентификация и один запрос к базе).
+
+Запуск: python -m benchmarks.auth_overhead --requests 1000
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.common import use_temporary_database, populate
+
+use_temporary_database()
+
+from fastapi.testclient import TestClient  # noqa: E402
+from jose import jwt  # noqa: E402
+import auth  # noqa: E402
+from config import SECRET_KEY, ALGORITHM  # noqa: E402
+from database import engine, SessionLocal  # noqa: E402
+from models import Base  # noqa: E402
+from main import app  # noqa: E402
+
+ENDPOINTS = ["/health", "/auth/me", "/issues/customers/1000/current"]
+
+
+def per_call_us(function, calls: int) -> float:
+    """Среднее время вызова, мкс"""
+    started = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def per_request_ms(client: TestClient, path: str, headers: dict, requests: int) -> float:
+    """Среднее время запроса через приложение, мс"""
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(path, headers=headers)
+    return (time.perf_counter() - started) / requests * 1000
+
+
+def compare(client: TestClient, path: str, headers: dict, requests: int, rounds: int) -> tuple:
+    """(без кэша, с кэшем), мс на запрос: лучший из чередующихся раундов"""
+    cache_size = auth.token_cache.maxsize
+    client.get(path, headers=headers).raise_for_status()
+    uncached, cached = [], []
+    for _ in range(rounds):
+        auth.token_cache.maxsize = 0
+        auth.token_cache.clear()
+        uncached.append(per_request_ms(client, path, headers, requests // rounds))
+        auth.token_cache.maxsize = cache_size
+        cached.append(per_request_ms(client, path, headers, requests // rounds))
+    return min(uncached), min(cached)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        populate(db, books=50, customers=5)
+    finally:
+        db.close()
+
+    token = auth.create_access_token({"sub": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    decode = per_call_us(lambda: jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]), args.calls)
+    auth.decode_token(token)
+    cached = per_call_us(lambda: auth.decode_token(token), args.calls)
+    print(f"jwt.decode            {decode:8.1f} us/call")
+    print(f"decode_token (cached) {cached:8.1f} us/call\n")
+
+    client = TestClient(app)
+    print(f"{'endpoint':34} {'no cache, ms':>13} {'cache, ms':>10} {'saved, us':>10}")
+    for path in ENDPOINTS:
+        uncached_ms, cached_ms = compare(client, path, headers, args.requests, args.rounds)
+        print(f"{path:34} {uncached_ms:>13.3f} {cached_ms:>10.3f} {(uncached_ms - cached_ms) * 1000:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
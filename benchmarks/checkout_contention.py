@@ -0,0 +1,186 @@
+"""
+Конкурентная выдача книг: нет ли двойных выдач и превышения лимита.
+
+Потоки одновременно выдают случайные книги из небольшого каталога
+небольшому числу клиентов (часть книг сразу возвращается), так что
+выдачи постоянно сталкиваются. После каждого уровня проверяется, что
+у книги не больше одной открытой выдачи, у клиента не больше лимита и
+books.current_issue_id совпадает с открытой выдачей. При нарушении
+скрипт завершается с ненулевым кодом.
+
+По умолчанию используется временная SQLite база; --database-url
+позволяет проверить другую СУБД (база будет очищена).
+
+С --batch N каждый пульт выдает и возвращает сразу по N книг
+(IssueRepository.create_issues / return_issues).
+
+Запуск: python -m benchmarks.checkout_contention --threads 1 8 32 --duration 5
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date
+from typing import Tuple
+
+
+INVARIANTS = {
+    "books with several open issues": (
+        "SELECT COUNT(*) FROM (SELECT book_key FROM issues WHERE return_date IS NULL "
+        "GROUP BY book_key HAVING COUNT(*) > 1) t"
+    ),
+    "customers over the limit": (
+        "SELECT COUNT(*) FROM (SELECT customer_id FROM issues WHERE return_date IS NULL "
+        "GROUP BY customer_id HAVING COUNT(*) > :limit) t"
+    ),
+    "books with a stale current_issue_id": (
+        "SELECT COUNT(*) FROM books WHERE COALESCE(current_issue_id, 0) <> COALESCE(("
+        "SELECT MAX(id) FROM issues WHERE issues.book_key = books.key AND return_date IS NULL), 0)"
+    ),
+}
+
+
+def worker(seed: int, args, deadline: float, stats: Counter, lock: threading.Lock) -> None:
+    """Один пульт выдачи: выдает случайные книги до истечения времени"""
+    from database import SessionLocal
+    from repositories import IssueRepository, CheckoutConflictError
+
+    rng = random.Random(seed)
+    local = Counter()
+    held = []
+    db = SessionLocal()
+    try:
+        repo = IssueRepository(db)
+        while time.perf_counter() < deadline:
+            customer_id = 1000 + rng.randrange(args.customers)
+            try:
+                if args.batch > 1:
+                    book_keys = [rng.randint(1, args.books) for _ in range(args.batch)]
+                    for book_key, issue_id, error in repo.create_issues(book_keys, customer_id):
+                        if issue_id is not None:
+                            local["checkouts"] += 1
+                            held.append(issue_id)
+                        elif error == "Book is already checked out":
+                            local["conflicts"] += 1
+                        else:
+                            local["limit"] += 1
+                else:
+                    issue = repo.create_issue(rng.randint(1, args.books), customer_id)
+                    local["checkouts"] += 1
+                    held.append(issue.id)
+            except CheckoutConflictError:
+                local["conflicts"] += 1
+            except ValueError:
+                local["limit"] += 1
+
+            # Вернуть часть книг, чтобы каталог не заканчивался
+            if held and (len(held) > 3 or rng.random() < 0.5):
+                if args.batch > 1:
+                    returned = repo.return_issues(held[:args.batch], [])
+                    local["returns"] += sum(1 for row, error in returned if row is not None)
+                    del held[:args.batch]
+                else:
+                    repo.return_book(held.pop(0))
+                    local["returns"] += 1
+    finally:
+        db.close()
+    with lock:
+        stats.update(local)
+
+
+def reset(engine) -> None:
+    """Закрыть все выдачи перед следующим уровнем"""
+    from sqlalchemy import text
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE issues SET return_date = :today WHERE return_date IS NULL"), {"today": date.today()})
+        conn.execute(text("UPDATE books SET current_issue_id = NULL"))
+
+
+def check_invariants(engine, limit: int) -> dict:
+    """Количество нарушений по каждому инварианту"""
+    from sqlalchemy import text
+    with engine.connect() as conn:
+        return {name: conn.execute(text(sql), {"limit": limit}).scalar() for name, sql in INVARIANTS.items()}
+
+
+def prepare(engine, books: int, customers: int) -> None:
+    """Пересоздать схему: каталог из books книг и customers клиентов без выдач"""
+    from benchmarks.common import populate
+    from database import SessionLocal
+    from models import Base
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        populate(db, books=books, customers=customers, issues_per_customer=0)
+    finally:
+        db.close()
+
+
+def run_level(engine, args, threads: int) -> Tuple[Counter, float]:
+    """Один уровень: threads пультов в течение args.duration секунд; счетчики и время"""
+    reset(engine)
+    stats, lock = Counter(), threading.Lock()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    pool = [
+        threading.Thread(target=worker, args=(seed, args, deadline, stats, lock))
+        for seed in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return stats, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=5.0, help="секунд на каждый уровень")
+    parser.add_argument("--books", type=int, default=20, help="размер каталога (меньше - больше конфликтов)")
+    parser.add_argument("--customers", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=1, help="книг в одной выдаче (POST /issues/batch)")
+    parser.add_argument("--database-url", help="база для проверки (иначе временная SQLite)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        from benchmarks.common import use_temporary_database
+        use_temporary_database()
+
+    from database import engine
+    from repositories import IssueRepository
+
+    prepare(engine, args.books, args.customers)
+
+    limit = IssueRepository.max_active_issues
+    failed = False
+    print(f"{args.books} books, {args.customers} customers, limit {limit}")
+    print(f"{'threads':>8} {'checkout/s':>11} {'checkouts':>10} {'conflicts':>10} {'limit':>8} {'violations':>11}")
+    for threads in args.threads:
+        stats, elapsed = run_level(engine, args, threads)
+
+        violations = check_invariants(engine, limit)
+        total = sum(violations.values())
+        print(f"{threads:>8} {stats['checkouts'] / elapsed:>11.1f} {stats['checkouts']:>10} "
+              f"{stats['conflicts']:>10} {stats['limit']:>8} {total:>11}")
+        for name, count in violations.items():
+            if count:
+                print(f"         ! {name}: {count}")
+        failed = failed or total > 0
+
+    if failed:
+        print("\nConcurrent checkout broke an invariant")
+        return 1
+    print("\nNo double issues, no customer over the limit")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
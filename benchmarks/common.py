@@ -0,0 +1,123 @@
+"""
+Общие утилиты для бенчмарков Bookmaster3000.
+
+Скрипты запускаются из корня проекта (python -m benchmarks.<name>) и
+работают с отдельной временной базой, чтобы не трогать рабочую.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_temporary_database() -> str:
+    """Направить приложение на временную SQLite базу (до импорта database)"""
+    path = os.path.join(tempfile.mkdtemp(prefix="bookmaster-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return path
+
+
+def migrate() -> None:
+    """Создать схему базы миграциями alembic"""
+    from alembic import command
+    from alembic.config import Config
+    
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    command.upgrade(config, "head")
+
+
+class QueryCounter:
+    """Счетчик SQL запросов, выполненных через engine"""
+    
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self.statements = []
+        self.parameters = []
+    
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+    
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+    
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        return False
+
+
+@contextmanager
+def count_queries(engine):
+    """Посчитать запросы внутри блока with"""
+    counter = QueryCounter(engine)
+    with counter:
+        yield counter
+
+
+def populate(db, books: int, customers: int = 10, issues_per_customer: int = 3):
+    """Заполнить базу простыми тестовыми данными"""
+    from models import Author, Book, BookCover, BookSubject, Customer, Issue
+    
+    today = date.today()
+    authors = [Author(key=i, name=f"Author {i}") for i in range(1, books // 2 + 2)]
+    db.add_all(authors)
+    for key in range(1, books + 1):
+        book = Book(key=key, title=f"Book {key}", subtitle="", description=f"Description {key}")
+        book.authors.append(authors[key % len(authors)])
+        db.add(book)
+        db.add(BookSubject(subject=f"Subject {key % 7}", book_key=key))
+        db.add(BookCover(cover_file=f"cover_{key}", book_key=key))
+    
+    book_key = 1
+    for customer_id in range(1000, 1000 + customers):
+        db.add(Customer(
+            id=customer_id,
+            name=f"Customer {customer_id}",
+            email=f"c{customer_id}@example.com",
+            phone=f"555-{customer_id}"
+        ))
+        for n in range(issues_per_customer):
+            issued = today - timedelta(days=30 + n)
+            returned = today - timedelta(days=5) if n % 2 else None
+            db.add(Issue(
+                book_key=book_key,
+                customer_id=customer_id,
+                date_of_issue=issued,
+                return_until=issued + timedelta(days=21),
+                return_date=returned,
+                renewed=False
+            ))
+            book_key = book_key % books + 1
+    db.commit()
+    
+    from repositories import IssueRepository
+    IssueRepository(db).sync_active_loans()
+
+
+def percentile(values, p: float) -> float:
+    """Перцентиль p (0..100) по списку значений"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed: float) -> dict:
+    """Сводка по задержкам (секунды) и пропускной способности"""
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
@@ -0,0 +1,84 @@
+"""
+Бенчмарк пропускной способности при конкурентных клиентах.
+
+По умолчанию приложение запускается в процессе (httpx ASGITransport) на
+временной базе. С --url нагрузка подается на уже запущенный сервер
+(например, uvicorn с несколькими воркерами).
+
+Ответы GET /books кэшируются (cache.py); CATALOG_CACHE_SIZE=0 измеряет
+путь без кэша.
+
+Запуск: python -m benchmarks.concurrency --clients 1 4 16 64 --duration 5
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.common import use_temporary_database, populate, summarize
+
+
+async def client_loop(client: httpx.AsyncClient, path: str, deadline: float, latencies: list, errors: list):
+    """Один клиент: запросы подряд до истечения времени"""
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(path)
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(response.status_code)
+
+
+async def run_level(client: httpx.AsyncClient, path: str, clients: int, duration: float) -> dict:
+    """Прогнать нагрузку с заданным числом одновременных клиентов"""
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*[
+        client_loop(client, path, deadline, latencies, errors) for _ in range(clients)
+    ])
+    result = summarize(latencies, time.perf_counter() - started)
+    result["errors"] = len(errors)
+    return result
+
+
+async def main_async(args) -> None:
+    if args.url:
+        transport, base_url = None, args.url
+    else:
+        use_temporary_database()
+        from database import engine, SessionLocal
+        from models import Base
+        from main import app
+        
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        try:
+            populate(db, books=args.books, customers=50)
+        finally:
+            db.close()
+        transport, base_url = httpx.ASGITransport(app=app), "http://bench"
+    
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+        await client.get(args.path)  # прогрев
+        print(f"GET {args.path}")
+        print(f"{'clients':>8} {'req/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'errors':>8}")
+        for clients in args.clients:
+            result = await run_level(client, args.path, clients, args.duration)
+            print(f"{clients:>8} {result['throughput']:>10.1f} {result['p50_ms']:>10.2f} "
+                  f"{result['p95_ms']:>10.2f} {result['errors']:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="URL запущенного сервера (иначе приложение в процессе)")
+    parser.add_argument("--path", default="/books?limit=20")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=5.0, help="секунд на каждый уровень")
+    parser.add_argument("--books", type=int, default=2000, help="размер каталога для запуска в процессе")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""
+Детерминированный генератор большой базы для нагрузочных тестов.
+
+Создает книги с авторами, темами и обложками, клиентов и историю выдач
+за --years лет до --end-date:
+
+- популярность книг, авторов и тем и активность клиентов распределены
+  по Ципфу (немного книг и читателей дают большую часть выдач);
+- часть выдач продлена (+7 дней), часть возвращена с опозданием;
+- на конец периода часть книг на руках, в том числе просроченные;
+- у книги не больше одной выдачи одновременно, у клиента не больше
+  IssueRepository.max_active_issues открытых выдач.
+
+Одинаковые --seed, размеры и --end-date дают одинаковую базу; каталог,
+клиенты и выдачи генерируются независимыми потоками случайных чисел,
+поэтому изменение --issues не меняет каталог. Схема создается миграциями,
+строки пишутся пачками executemany, вторичные индексы строятся после
+загрузки. В конце заполняются books.current_issue_id и поисковый индекс,
+создается учетная запись ADMIN_USERNAME и проверяются инварианты выдач.
+
+Запуск: python -m benchmarks.dataset --database-url sqlite:///large.db --books 1000000 --issues 10000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from bisect import bisect
+from collections import Counter
+from datetime import date, datetime, time as day_time, timedelta, timezone
+from itertools import accumulate
+from typing import Iterator, List, Tuple
+
+from benchmarks.common import migrate
+
+SYLLABLES = [
+    "ka", "lo", "ri", "ven", "dar", "mi", "so", "tel", "an", "ber", "cor", "du", "el", "fa", "gor", "ha",
+    "is", "jo", "ker", "la", "mor", "na", "os", "pel", "qui", "ra", "sen", "tor", "ul", "va", "wen", "yr",
+]
+SUBJECT_KINDS = [
+    "History", "Fiction", "Poetry", "Philosophy", "Travel", "Biography", "Science", "Drama",
+    "Folklore", "Economics", "Art", "Music", "Religion", "Law", "Medicine", "Cooking",
+]
+
+
+class Zipf:
+    """Индекс 0..n-1 с вероятностью ~ 1 / (rank + 1) ** s"""
+    
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.cumulative = list(accumulate(1 / (rank + 1) ** s for rank in range(n)))
+        self.total = self.cumulative[-1]
+        self.last = n - 1
+        self.rng = rng
+    
+    def sample(self) -> int:
+        return min(bisect(self.cumulative, self.rng.random() * self.total), self.last)
+
+
+def zipf_counts(total: int, n: int, s: float, cap: int) -> List[int]:
+    """Разложить total по n рангам пропорционально 1 / rank ** s, не больше cap на ранг.
+    
+    Избыток популярных рангов уходит остальным; округление - методом
+    наибольших остатков, сумма ровно total.
+    """
+    if total > n * cap:
+        raise ValueError(f"{total} issues do not fit: at most {cap} per book, {n * cap} in total")
+    weights = [1 / (rank + 1) ** s for rank in range(n)]
+    suffix = list(accumulate(reversed(weights)))[::-1]
+    counts = [0] * n
+    remaining, first = total, 0
+    # Веса убывают: ранги, упершиеся в cap, идут подряд с начала
+    while first < n and remaining * weights[first] / suffix[first] > cap:
+        counts[first] = cap
+        remaining -= cap
+        first += 1
+    if first == n:
+        return counts
+    shares = [remaining * weights[rank] / suffix[first] for rank in range(first, n)]
+    floors = [int(share) for share in shares]
+    order = sorted(range(len(shares)), key=lambda i: floors[i] - shares[i])
+    for i in order[:remaining - sum(floors)]:
+        floors[i] += 1
+    counts[first:] = floors
+    return counts
+
+
+class DatasetGenerator:
+    """Строки таблиц для пустой базы (словари для insert().executemany)"""
+    
+    def __init__(self, args, loan_period_days: int, active_limit: int):
+        self.args = args
+        self.loan_period_days = loan_period_days
+        self.active_limit = active_limit
+        self.end_date = args.end_date
+        self.start_date = args.end_date - timedelta(days=round(args.years * 365))
+        
+        rng = random.Random(f"{args.seed}-vocabulary")
+        words = {}
+        while len(words) < 3000:
+            word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+            words.setdefault(word, None)
+        self.words = list(words)
+        self.names = [word.capitalize() for word in self.words]
+        self.subjects = [f"{self.names[i]} {rng.choice(SUBJECT_KINDS)}" for i in range(1000)]
+        self.cities = [self.names[i] + rng.choice(["", " City", "burg", "ville"]) for i in range(50)]
+    
+    def catalog(self) -> Iterator[Tuple[str, dict]]:
+        """Авторы, затем книги со связями, темами и обложками: пары (таблица, строка)"""
+        args = self.args
+        rng = random.Random(f"{args.seed}-catalog")
+        for key in range(1, args.authors + 1):
+            born = date(rng.randint(1750, 1990), rng.randint(1, 12), rng.randint(1, 28)) if rng.random() < 0.6 else None
+            yield "authors", {
+                "key": key,
+                "name": f"{rng.choice(self.names[:300])} {rng.choice(self.names)}",
+                "biography": self._sentence(rng, 10, 40) if rng.random() < 0.3 else None,
+                "birth_date": born,
+                "death_date": born + timedelta(days=rng.randint(30, 90) * 365) if born and born.year < 1940 else None,
+                "wikipedia": None,
+            }
+        
+        word = Zipf(len(self.words), 1.0, rng)
+        author = Zipf(args.authors, args.zipf, rng)
+        subject = Zipf(len(self.subjects), 1.0, rng)
+        # Популярные авторы разбросаны по ключам
+        author_keys = list(range(1, args.authors + 1))
+        rng.shuffle(author_keys)
+        for key in range(1, args.books + 1):
+            year = rng.randint(1800, self.end_date.year)
+            yield "books", {
+                "key": key,
+                "title": " ".join(self.words[word.sample()] for _ in range(rng.randint(1, 5))).capitalize(),
+                "subtitle": self._sentence(rng, 2, 6) if rng.random() < 0.2 else None,
+                "first_publish_date": date(year, rng.randint(1, 12), rng.randint(1, 28)) if rng.random() < 0.7 else None,
+                "description": self._sentence(rng, 8, 40, word) if rng.random() < 0.6 else None,
+            }
+            for author_key in dict.fromkeys(author_keys[author.sample()] for _ in range(1 if rng.random() < 0.8 else 2)):
+                yield "book_authors", {"book_key": key, "author_key": author_key}
+            # dict, а не set: порядок строк не должен зависеть от PYTHONHASHSEED
+            for name in dict.fromkeys(self.subjects[subject.sample()] for _ in range(rng.randint(0, 4))):
+                yield "book_subjects", {"book_key": key, "subject": name}
+            for n in range(rng.choice((0, 1, 1, 2))):
+                yield "book_covers", {"book_key": key, "cover_file": f"{key}_{n + 1}"}
+    
+    def customers(self) -> Iterator[dict]:
+        from models import normalize_name
+        
+        rng = random.Random(f"{self.args.seed}-customers")
+        for n in range(self.args.customers):
+            customer_id = 1000 + n
+            first, last = rng.choice(self.names[:300]), rng.choice(self.names)
+            name = f"{first} {last}"
+            yield {
+                "id": customer_id,
+                "name": name,
+                # Core не вызывает @validates модели
+                "name_normalized": normalize_name(name),
+                "address": f"{rng.randint(1, 300)} {rng.choice(self.names)} Street",
+                "zip_code": f"{rng.randint(10000, 99999)}",
+                "city": rng.choice(self.cities),
+                "phone": f"555-{customer_id}",
+                "email": f"{first}.{last}{customer_id}@example.com".lower(),
+            }
+    
+    def issues(self, stats: Counter) -> Iterator[dict]:
+        """История выдач книга за книгой; id по порядку с 1"""
+        args = self.args
+        rng = random.Random(f"{args.seed}-issues")
+        span = (self.end_date - self.start_date).days
+        # Не больше одной выдачи на полный срок с продлением на каждую книгу
+        cap = span // (self.loan_period_days + 7)
+        counts = zipf_counts(args.issues, args.books, args.zipf, cap)
+        books = list(range(1, args.books + 1))
+        rng.shuffle(books)
+        
+        customer = Zipf(args.customers, args.customer_zipf, rng)
+        customer_ids = list(range(1000, 1000 + args.customers))
+        rng.shuffle(customer_ids)
+        open_loans = Counter()
+        fallback = 0
+        
+        issue_id = 0
+        for book_key, count in sorted(zip(books, counts)):
+            if not count:
+                continue
+            loans = [self._loan(rng) for _ in range(count)]
+            window_end = self.end_date
+            current = None
+            if rng.random() < args.open_rate:
+                # Последняя выдача еще не закрыта; просрочена, если опоздание уже наступило
+                held, due, renewed, late = loans.pop()
+                age = held if late else rng.randint(0, due - 1)
+                current = (self.end_date - timedelta(days=age), due, renewed)
+                window_end = current[0]
+            
+            available = (window_end - self.start_date).days
+            while sum(loan[0] for loan in loans) > available:
+                # Редкий случай: длинные опоздания не помещаются в историю книги
+                longest = max(range(len(loans)), key=lambda i: loans[i][0])
+                due, renewed = loans[longest][1], loans[longest][2]
+                loans[longest] = (rng.randint(1, 7), due, renewed, False)
+            slack = available - sum(loan[0] for loan in loans)
+            cuts = sorted(rng.randint(0, slack) for _ in loans)
+            
+            previous_cut = 0
+            day = self.start_date
+            for (held, due, renewed, late), cut in zip(loans, cuts):
+                issued = day + timedelta(days=cut - previous_cut)
+                previous_cut = cut
+                day = issued + timedelta(days=held)
+                issue_id += 1
+                stats["late_returns"] += late
+                yield self._issue_row(issue_id, book_key, customer_ids[customer.sample()], issued, due, renewed, day)
+            
+            if current:
+                issued, due, renewed = current
+                for _ in range(20):
+                    customer_id = customer_ids[customer.sample()]
+                    if open_loans[customer_id] < self.active_limit:
+                        break
+                else:
+                    # Активные читатели заняты: первый по кругу клиент со свободным лимитом
+                    while open_loans[customer_ids[fallback]] >= self.active_limit:
+                        fallback = (fallback + 1) % len(customer_ids)
+                    customer_id = customer_ids[fallback]
+                open_loans[customer_id] += 1
+                issue_id += 1
+                stats["open_issues"] += 1
+                stats["overdue_issues"] += issued + timedelta(days=due) < self.end_date
+                yield self._issue_row(issue_id, book_key, customer_id, issued, due, renewed, None)
+    
+    def _loan(self, rng: random.Random) -> Tuple[int, int, bool, bool]:
+        """(дней на руках, срок в днях, продлена, возвращена с опозданием)"""
+        renewed = rng.random() < self.args.renew_rate
+        due = self.loan_period_days + (7 if renewed else 0)
+        if rng.random() < self.args.overdue_rate:
+            return due + min(60, int(rng.expovariate(1 / 7)) + 1), due, renewed, True
+        return rng.randint(1, due), due, renewed, False
+    
+    @staticmethod
+    def _issue_row(issue_id, book_key, customer_id, issued, due, renewed, returned) -> dict:
+        return {
+            "id": issue_id,
+            "book_key": book_key,
+            "customer_id": customer_id,
+            "date_of_issue": issued,
+            "return_until": issued + timedelta(days=due),
+            "return_date": returned,
+            "renewed": renewed,
+            # Время выдачи - тоже часть детерминированной истории
+            "created_at": datetime.combine(issued, day_time(10), tzinfo=timezone.utc),
+        }
+    
+    def _sentence(self, rng: random.Random, shortest: int, longest: int, word: Zipf = None) -> str:
+        pick = (lambda: self.words[word.sample()]) if word else (lambda: rng.choice(self.words))
+        return " ".join(pick() for _ in range(rng.randint(shortest, longest))).capitalize() + "."
+
+
+def write(db, table, rows: Iterator[dict], batch_size: int, stats: Counter) -> None:
+    """Вставить строки пачками, каждая пачка - отдельная транзакция"""
+    from sqlalchemy import insert
+    
+    statement = insert(table)
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.execute(statement, batch)
+            db.commit()
+            stats[table.name] += len(batch)
+            batch = []
+    if batch:
+        db.execute(statement, batch)
+        db.commit()
+        stats[table.name] += len(batch)
+
+
+def write_catalog(db, rows: Iterator[Tuple[str, dict]], tables: dict, batch_size: int, stats: Counter) -> None:
+    """Каталог: пачки по batch_size книг, таблицы по порядку внешних ключей"""
+    from sqlalchemy import insert
+    
+    order = ["authors", "books", "book_authors", "book_subjects", "book_covers"]
+    batches = {name: [] for name in order}
+    
+    def flush():
+        for name in order:
+            if batches[name]:
+                db.execute(insert(tables[name]), batches[name])
+                stats[name] += len(batches[name])
+                batches[name] = []
+        db.commit()
+    
+    for name, row in rows:
+        batches[name].append(row)
+        if len(batches[name]) >= batch_size:
+            flush()
+    flush()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--authors", type=int, help="по умолчанию books / 3")
+    parser.add_argument("--customers", type=int, help="по умолчанию books / 10")
+    parser.add_argument("--issues", type=int, default=1_000_000)
+    parser.add_argument("--years", type=float, default=3.0, help="длина истории выдач")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                        help="последний день истории (YYYY-MM-DD, по умолчанию сегодня)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--zipf", type=float, default=1.1, help="показатель Ципфа для книг и авторов")
+    parser.add_argument("--customer-zipf", type=float, default=0.8, help="показатель Ципфа для клиентов")
+    parser.add_argument("--overdue-rate", type=float, default=0.08, help="доля выдач с опозданием")
+    parser.add_argument("--renew-rate", type=float, default=0.15, help="доля продленных выдач")
+    parser.add_argument("--open-rate", type=float, default=0.3, help="доля выдававшихся книг, которые сейчас на руках")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--database-url", help="пустая база (иначе временная SQLite)")
+    args = parser.parse_args()
+    args.authors = args.authors or max(1, args.books // 3)
+    args.customers = args.customers or max(1, args.books // 10)
+    if args.years < 1 or min(args.books, args.customers, args.batch_size) < 1 or args.issues < 0:
+        parser.error("--years must be at least 1, sizes and --batch-size positive")
+    for name in ("overdue_rate", "renew_rate", "open_rate"):
+        if not 0 <= getattr(args, name) <= 1:
+            parser.error(f"--{name.replace('_', '-')} must be between 0 and 1")
+    
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        from benchmarks.common import use_temporary_database
+        use_temporary_database()
+    
+    migrate()
+    from sqlalchemy import func, select
+    from benchmarks.checkout_contention import check_invariants
+    from config import ADMIN_PASSWORD, ADMIN_USERNAME
+    from database import SessionLocal, engine
+    from models import Author, Book, BookCover, BookSubject, Customer, Issue, book_authors
+    from repositories import BookSearchIndex, CatalogBulkRepository, IssueRepository
+    from services import StaffService
+    
+    limit = IssueRepository.max_active_issues
+    generator = DatasetGenerator(args, IssueRepository.loan_period_days, limit)
+    if args.issues and args.open_rate * args.books > args.customers * limit:
+        parser.error("too few customers for the open issues")
+    tables = {table.name: table for table in (
+        Author.__table__, Book.__table__, book_authors, BookSubject.__table__, BookCover.__table__,
+        Customer.__table__, Issue.__table__,
+    )}
+    
+    db = SessionLocal()
+    stats, seconds = Counter(), {}
+    try:
+        if db.scalar(select(func.count()).select_from(Book)) or db.scalar(select(func.count()).select_from(Customer)):
+            print(f"{engine.url.render_as_string()} is not empty")
+            return 1
+        print(f"{engine.url.render_as_string()}: seed {args.seed}, "
+              f"{generator.start_date} .. {generator.end_date}")
+        
+        bulk_repo = CatalogBulkRepository(db)
+        indexes = bulk_repo.deferrable_indexes(list(tables.values()))
+        bulk_repo.drop_indexes(indexes)
+        try:
+            for phase, load in (
+                ("catalog", lambda: write_catalog(db, generator.catalog(), tables, args.batch_size, stats)),
+                ("customers", lambda: write(db, tables["customers"], generator.customers(), args.batch_size, stats)),
+                ("issues", lambda: write(db, tables["issues"], generator.issues(stats), args.batch_size, stats)),
+            ):
+                started = time.perf_counter()
+                load()
+                seconds[phase] = time.perf_counter() - started
+        finally:
+            db.rollback()
+            started = time.perf_counter()
+            bulk_repo.create_indexes(indexes)
+            bulk_repo.analyze(list(tables.values()))
+            seconds["indexes"] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        IssueRepository(db).sync_active_loans()
+        seconds["current_issue_id"] = time.perf_counter() - started
+        started = time.perf_counter()
+        BookSearchIndex(db).rebuild(batch_size=5000)
+        db.commit()
+        seconds["search_index"] = time.perf_counter() - started
+        StaffService(db).ensure_user(ADMIN_USERNAME, ADMIN_PASSWORD)
+    finally:
+        db.close()
+    
+    rows = sum(stats[name] for name in tables)
+    print(f"\n{'table':14} {'rows':>11}")
+    for name in tables:
+        print(f"{name:14} {stats[name]:>11}")
+    issues = stats["issues"] or 1
+    print(f"\nopen {stats['open_issues']} (overdue {stats['overdue_issues']}), "
+          f"returned late {stats['late_returns'] / issues:.1%} of issues")
+    print(f"\n{'phase':17} {'seconds':>8} {'rows/s':>9}")
+    for phase, elapsed in seconds.items():
+        count = stats["issues"] if phase == "issues" else stats["customers"] if phase == "customers" else (
+            sum(stats[name] for name in ("authors", "books", "book_authors", "book_subjects", "book_covers"))
+            if phase == "catalog" else 0)
+        print(f"{phase:17} {elapsed:>8.1f} {count / elapsed if count and elapsed else 0:>9.0f}")
+    total = sum(seconds.values())
+    print(f"{'total':17} {total:>8.1f} {rows / total if total else 0:>9.0f}")
+    
+    violations = {name: count for name, count in check_invariants(engine, limit).items() if count}
+    for name, count in violations.items():
+        print(f"! {name}: {count}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Проверка планов частых запросов к выдачам, темам, обложкам и клиентам.
+
+Схема создается миграциями alembic, база заполняется тестовыми
+данными, затем SQL каждого запроса из репозиториев прогоняется через
+EXPLAIN QUERY PLAN (SQLite). Если по таблицам issues, book_subjects,
+book_covers или customers выполняется полный просмотр, скрипт
+завершается с ненулевым кодом.
+
+Запуск: python -m benchmarks.explain_hot_queries
+"""
+import sys
+
+from benchmarks.common import use_temporary_database, count_queries, migrate, populate
+
+use_temporary_database()
+
+from sqlalchemy import text  # noqa: E402
+from database import engine, SessionLocal  # noqa: E402
+from repositories import BookRepository, CustomerRepository, IssueRepository  # noqa: E402
+
+WATCHED_TABLES = ("issues", "book_subjects", "book_covers", "customers")
+
+HOT_QUERIES = {
+    "current issues": lambda db: IssueRepository(db).get_current_issues_by_customer(1000, profile="with_book"),
+    "customer history": lambda db: IssueRepository(db).get_issue_history_by_customer(1000, profile="with_book"),
+    "book history": lambda db: IssueRepository(db).get_book_history(1, profile="with_customer"),
+    "overdue": lambda db: IssueRepository(db).get_overdue_issues(profile="full"),
+    "borrow limit": lambda db: IssueRepository(db).can_customer_borrow(1000),
+    "book detail": lambda db: BookRepository(db).get_by_key(1, profile="detail"),
+    "books by subject": lambda db: BookRepository(db).search_books(subject="Subject 3", limit=20),
+    "customer lookup": lambda db: CustomerRepository(db).lookup_customers(name="customer 100"),
+    "customer by email": lambda db: CustomerRepository(db).lookup_customers(email="c1001@example.com"),
+    "customer by phone": lambda db: CustomerRepository(db).lookup_customers(phone="555-1001"),
+}
+
+
+def full_scans(statement: str, parameters) -> list:
+    """Строки плана с полным просмотром отслеживаемых таблиц"""
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return [
+        row[-1] for row in plan
+        if row[-1].startswith("SCAN ") and row[-1].split()[1] in WATCHED_TABLES
+    ]
+
+
+def main() -> int:
+    migrate()
+    db = SessionLocal()
+    try:
+        populate(db, books=200, customers=20, issues_per_customer=4)
+        db.execute(text("ANALYZE"))
+        db.commit()
+        
+        failures = 0
+        for name, run in HOT_QUERIES.items():
+            with count_queries(engine) as counter:
+                run(db)
+            db.rollback()
+            
+            selects = [
+                (statement, parameters)
+                for statement, parameters in zip(counter.statements, counter.parameters)
+                if statement.lstrip().upper().startswith("SELECT")
+            ]
+            scans = [scan for statement, parameters in selects for scan in full_scans(statement, parameters)]
+            status = "FAIL" if scans else "ok"
+            print(f"{status:>4}  {name:<18} {len(selects)} queries" + (f"  {'; '.join(scans)}" if scans else ""))
+            failures += bool(scans)
+    finally:
+        db.close()
+    
+    if failures:
+        print(f"\n{failures} hot queries do a full table scan")
+        return 1
+    print("\nAll hot queries use indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,494 @@
+"""
+HTTP бенчмарк всех маршрутов книг, клиентов, выдач и аутентификации.
+
+Приложение работает в том же процессе (httpx ASGITransport), база -
+сгенерированная benchmarks.dataset (--books, --issues, --seed) или
+готовая (--database-url). Для каждого сценария выполняется --warmup
+запросов без замера, затем --requests запросов --concurrency клиентами;
+выводятся p50/p95/p99, запросы в секунду и SQL запросов на HTTP запрос.
+
+Сценарии записи идут парами: созданные книги удаляются, выданные
+книги возвращаются (история выдач и созданные клиенты остаются).
+Зависимый сценарий выполняет не больше запросов, чем данных создал
+предыдущий, и пропускается, если тот не создал ничего. Если у маршрута
+нет сценария, скрипт завершается с ненулевым кодом.
+
+Результаты сохраняются в JSON (--output). С --compare предыдущий файл
+служит базой: сценарий считается регрессией, если медиана выросла
+больше чем на --threshold (и больше чем на --min-ms) или выросло число
+SQL запросов на HTTP запрос (больше чем на 0.5); тогда код выхода
+ненулевой. p95 и p99 выводятся для сравнения, но на малом числе
+запросов слишком шумят.
+
+Запуск:
+    python -m benchmarks.http_suite --books 20000 --issues 200000 --output base.json
+    python -m benchmarks.http_suite --books 20000 --issues 200000 --compare base.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from benchmarks.common import ROOT, summarize
+from benchmarks.dataset import Zipf
+
+ROUTERS = ("/books", "/customers", "/issues", "/auth")
+
+
+class Scenario(NamedTuple):
+    name: str
+    # Маршрут как в приложении: "GET /books/{book_key}"
+    route: str
+    # Аргументы client.request для i-го запроса сценария
+    request: Callable[["Workload", int], dict]
+    expect: Tuple[int, ...] = (200,)
+    # Ответ нужен следующим сценариям (ключи созданных книг, id выдач)
+    after: Optional[Callable[["Workload", int, dict], None]] = None
+    # Ограничение числа запросов (bcrypt, выгрузка всех просроченных)
+    max_requests: Optional[int] = None
+    # Данные предыдущего сценария записи, по одному элементу на запрос
+    source: Optional[Callable[["Workload"], list]] = None
+
+
+class Workload:
+    """Данные для запросов: выборка из базы и то, что создали сценарии записи"""
+    
+    def __init__(self, engine, seed: int, needed: int, credentials: dict):
+        from sqlalchemy import text
+        from repositories import IssueRepository
+        
+        self.rng = random.Random(seed)
+        self.credentials = credentials
+        self.headers: Dict[str, str] = {}
+        self.cursor: Optional[str] = None
+        self.etags: Dict[str, str] = {}
+        self.created_books: List[int] = []
+        self.created_customers: List[int] = []
+        self.issued: List[int] = []
+        self.batches: List[List[int]] = []
+        self.limit = IssueRepository.max_active_issues
+        
+        with engine.connect() as conn:
+            def column(sql: str, **params) -> list:
+                return [row[0] for row in conn.execute(text(sql), params)]
+            
+            self.book_keys = column("SELECT key FROM books ORDER BY key")
+            self.customer_ids = column("SELECT id FROM customers ORDER BY id")
+            titles = column("SELECT title FROM books ORDER BY key LIMIT 500")
+            self.words = sorted({word.lower() for title in titles for word in title.split() if len(word) > 3})
+            self.authors = column(
+                "SELECT DISTINCT a.name FROM authors a JOIN book_authors ba ON ba.author_key = a.key "
+                "ORDER BY a.name LIMIT 200"
+            )
+            self.subjects = column("SELECT DISTINCT subject FROM book_subjects ORDER BY subject LIMIT 200")
+            self.emails = column("SELECT email FROM customers WHERE email IS NOT NULL ORDER BY id LIMIT 500")
+            # Для выдач: свободные книги и клиенты без открытых выдач
+            self.available = column(
+                "SELECT key FROM books WHERE current_issue_id IS NULL ORDER BY key LIMIT :n", n=needed * 4
+            )
+            self.free_customers = column(
+                "SELECT id FROM customers c WHERE NOT EXISTS (SELECT 1 FROM issues i "
+                "WHERE i.customer_id = c.id AND i.return_date IS NULL) ORDER BY id LIMIT :n", n=needed
+            )
+        if not self.book_keys or not self.customer_ids or not self.words:
+            raise ValueError("The database has no books or customers; generate it with benchmarks.dataset")
+        if len(self.available) < needed * 4:
+            raise ValueError("Not enough available books for the checkout scenarios")
+        self.needed = needed
+        
+        # Популярность как в benchmarks.dataset: немного книг и клиентов получают большую часть запросов
+        self.rng.shuffle(self.book_keys)
+        self.rng.shuffle(self.customer_ids)
+        self.book_rank = Zipf(len(self.book_keys), 1.1, self.rng)
+        self.customer_rank = Zipf(len(self.customer_ids), 0.8, self.rng)
+    
+    def book(self) -> int:
+        return self.book_keys[self.book_rank.sample()]
+    
+    def customer(self) -> int:
+        return self.customer_ids[self.customer_rank.sample()]
+    
+    def pick(self, values: list):
+        return self.rng.choice(values)
+    
+    def loan_customer(self, i: int) -> int:
+        """Клиент без открытых выдач для i-й выдачи.
+        
+        Не хватит клиентов базы - берутся созданные сценарием
+        customers.create. Одиночные выдачи возвращаются до выдач пачками,
+        поэтому пачки берут тех же клиентов.
+        """
+        customers = self.free_customers + self.created_customers
+        if len(customers) < self.needed:
+            raise ValueError("Not enough customers without loans; run customers.create first or generate more customers")
+        return customers[i]
+    
+    def prefix(self) -> str:
+        """Начало имени клиента (как набирают в поиске)"""
+        return self.pick(self.authors).split()[0][:3].lower()
+
+
+def get(path: str, auth: bool = False, etag: Optional[str] = None, **params) -> dict:
+    return {"method": "GET", "url": path, "params": params, "auth": auth, "etag": etag}
+
+
+def follow_cursor(workload: Workload, i: int, response) -> None:
+    """Следующая страница обхода каталога; в конце - снова с начала"""
+    workload.cursor = response.json().get("next_cursor")
+
+
+def book_payload(workload: Workload, i: int) -> dict:
+    return {
+        "title": f"{workload.pick(workload.words).capitalize()} {workload.pick(workload.words)} {i}",
+        "subtitle": "Benchmark edition",
+        "first_publish_date": "2001-01-01",
+        "description": " ".join(workload.rng.sample(workload.words, min(12, len(workload.words)))),
+        "subjects": workload.rng.sample(workload.subjects, min(2, len(workload.subjects))),
+    }
+
+
+def customer_payload(workload: Workload, i: int) -> dict:
+    name = f"{workload.pick(workload.authors).split()[0]} Bench{i}"
+    return {"name": name, "email": f"bench{i}.{time.time_ns()}@example.com", "phone": f"556-{i}", "city": "Bench"}
+
+
+SCENARIOS = [
+    # Книги
+    Scenario("books.list", "GET /books", lambda w, i: get("/books", page=w.rng.randint(1, 20), limit=20)),
+    Scenario("books.list_not_modified", "GET /books",
+             lambda w, i: get("/books", page=1, limit=20, etag=w.etags["books"]), expect=(304,)),
+    Scenario("books.list_cursor", "GET /books",
+             lambda w, i: get("/books", limit=50, sort="key", **({"cursor": w.cursor} if w.cursor else {})),
+             after=follow_cursor),
+    Scenario("books.search_q", "GET /books", lambda w, i: get("/books", q=w.pick(w.words), limit=20)),
+    Scenario("books.search_title", "GET /books", lambda w, i: get("/books", title=w.pick(w.words), limit=20)),
+    Scenario("books.search_author", "GET /books",
+             lambda w, i: get("/books", author=w.pick(w.authors).split()[-1], limit=20)),
+    Scenario("books.search_subject", "GET /books", lambda w, i: get("/books", subject=w.pick(w.subjects), limit=20)),
+    Scenario("books.available", "GET /books", lambda w, i: get("/books", available="true", limit=20)),
+    Scenario("books.get", "GET /books/{book_key}", lambda w, i: get(f"/books/{w.book()}")),
+    Scenario("books.get_not_modified", "GET /books/{book_key}",
+             lambda w, i: get(f"/books/{w.book_keys[0]}", etag=w.etags["book"]), expect=(304,)),
+    Scenario("books.availability", "GET /books/{book_key}/availability",
+             lambda w, i: get(f"/books/{w.book()}/availability")),
+    Scenario("books.create", "POST /books",
+             lambda w, i: {"method": "POST", "url": "/books", "json": book_payload(w, i), "auth": True},
+             after=lambda w, i, response: w.created_books.append(response.json()["key"])),
+    Scenario("books.update", "PUT /books/{book_key}",
+             lambda w, i: {"method": "PUT", "url": f"/books/{w.created_books[i]}", "json": book_payload(w, i), "auth": True},
+             source=lambda w: w.created_books),
+    Scenario("books.delete", "DELETE /books/{book_key}",
+             lambda w, i: {"method": "DELETE", "url": f"/books/{w.created_books[i]}", "auth": True},
+             source=lambda w: w.created_books),
+    # Клиенты
+    Scenario("customers.list", "GET /customers", lambda w, i: get("/customers", auth=True, limit=50)),
+    Scenario("customers.list_name", "GET /customers", lambda w, i: get("/customers", auth=True, name=w.prefix())),
+    Scenario("customers.search_name", "GET /customers/search",
+             lambda w, i: get("/customers/search", auth=True, name=w.prefix())),
+    Scenario("customers.search_email", "GET /customers/search",
+             lambda w, i: get("/customers/search", auth=True, email=w.pick(w.emails))),
+    Scenario("customers.get", "GET /customers/{customer_id}", lambda w, i: get(f"/customers/{w.customer()}", auth=True)),
+    Scenario("customers.create", "POST /customers",
+             lambda w, i: {"method": "POST", "url": "/customers", "json": customer_payload(w, i), "auth": True},
+             after=lambda w, i, response: w.created_customers.append(response.json()["id"])),
+    Scenario("customers.update", "PUT /customers/{customer_id}",
+             lambda w, i: {"method": "PUT", "url": f"/customers/{w.created_customers[i]}",
+                           "json": customer_payload(w, i), "auth": True},
+             source=lambda w: w.created_customers),
+    # Выдачи
+    Scenario("issues.current", "GET /issues/customers/{customer_id}/current",
+             lambda w, i: get(f"/issues/customers/{w.customer()}/current", auth=True)),
+    Scenario("issues.customer_history", "GET /issues/customers/{customer_id}/history",
+             lambda w, i: get(f"/issues/customers/{w.customer()}/history", auth=True, limit=50)),
+    Scenario("issues.book_history", "GET /issues/books/{book_key}/history",
+             lambda w, i: get(f"/issues/books/{w.book()}/history", auth=True, limit=50)),
+    Scenario("issues.overdue", "GET /issues/overdue",
+             lambda w, i: get("/issues/overdue", auth=True, sort=("due", "issued", "customer")[i % 3], limit=100)),
+    Scenario("issues.overdue_export", "GET /issues/overdue/export",
+             lambda w, i: get("/issues/overdue/export", auth=True, format=("ndjson", "csv")[i % 2]), max_requests=20),
+    Scenario("issues.create", "POST /issues",
+             lambda w, i: {"method": "POST", "url": "/issues", "auth": True, "json": {
+                 "book_key": w.available[i], "customer_id": w.loan_customer(i // w.limit)}},
+             after=lambda w, i, response: w.issued.append(response.json()["issue_id"])),
+    Scenario("issues.renew", "POST /issues/{issue_id}/renew",
+             lambda w, i: {"method": "POST", "url": f"/issues/{w.issued[i]}/renew", "auth": True},
+             source=lambda w: w.issued),
+    Scenario("issues.return", "POST /issues/{issue_id}/return",
+             lambda w, i: {"method": "POST", "url": f"/issues/{w.issued[i]}/return", "auth": True},
+             source=lambda w: w.issued),
+    Scenario("issues.batch", "POST /issues/batch",
+             lambda w, i: {"method": "POST", "url": "/issues/batch", "auth": True, "json": {
+                 "customer_id": w.loan_customer(i), "book_keys": w.available[-3 * (i + 1):len(w.available) - 3 * i]}},
+             after=lambda w, i, response: w.batches.append([item["issue_id"] for item in response.json()["items"]])),
+    Scenario("issues.batch_return", "POST /issues/batch/return",
+             lambda w, i: {"method": "POST", "url": "/issues/batch/return", "auth": True,
+                           "json": {"issue_ids": w.batches[i]}},
+             source=lambda w: w.batches),
+    # Аутентификация
+    Scenario("auth.login", "POST /auth/login",
+             lambda w, i: {"method": "POST", "url": "/auth/login", "json": w.credentials}, max_requests=20),
+    Scenario("auth.me", "GET /auth/me", lambda w, i: get("/auth/me", auth=True)),
+]
+
+
+def uncovered_routes(app) -> List[str]:
+    """Маршруты контроллеров без сценария"""
+    covered = {scenario.route for scenario in SCENARIOS}
+    routes = [
+        f"{method} {route.path}"
+        for route in app.routes
+        if route.path.startswith(ROUTERS)
+        for method in sorted(getattr(route, "methods", None) or ())
+    ]
+    return [route for route in routes if route not in covered]
+
+
+class Runner:
+    """Прогон сценариев через один httpx.AsyncClient"""
+    
+    def __init__(self, client, workload: Workload, statements: list):
+        self.client = client
+        self.workload = workload
+        self.statements = statements
+    
+    async def send(self, scenario: Scenario, i: int, errors: list) -> Optional[float]:
+        """Один запрос; длительность в секундах (None - запрос не собран)"""
+        try:
+            spec = scenario.request(self.workload, i)
+        except (KeyError, ValueError) as e:
+            # В базе не нашлось данных для запроса
+            errors.append(f"request #{i} not built: {e!r}")
+            return None
+        headers = dict(self.workload.headers) if spec.get("auth") else {}
+        if spec.get("etag"):
+            headers["If-None-Match"] = spec["etag"]
+        started = time.perf_counter()
+        response = await self.client.request(spec["method"], spec["url"], params=spec.get("params"),
+                                             json=spec.get("json"), headers=headers)
+        elapsed = time.perf_counter() - started
+        if response.status_code not in scenario.expect:
+            errors.append(f"{spec['method']} {spec['url']}: {response.status_code} {response.text[:200]}")
+            return elapsed
+        if scenario.after:
+            scenario.after(self.workload, i, response)
+        return elapsed
+    
+    async def run(self, scenario: Scenario, requests: int, warmup: int, concurrency: int) -> dict:
+        errors: List[str] = []
+        for i in range(warmup):
+            await self.send(scenario, i, errors)
+        
+        # Запросы нумеруются по порядку, параллельные клиенты берут следующий номер
+        numbers = iter(range(warmup, warmup + requests))
+        latencies: List[float] = []
+        before = len(self.statements)
+        
+        async def client_loop():
+            for i in numbers:
+                elapsed = await self.send(scenario, i, errors)
+                if elapsed is not None:
+                    latencies.append(elapsed)
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        
+        result = summarize(latencies, elapsed)
+        result.update(
+            route=scenario.route,
+            sql_per_request=(len(self.statements) - before) / max(1, len(latencies)),
+            errors=len(errors),
+        )
+        if errors:
+            result["first_error"] = errors[0]
+        return result
+
+
+async def run_suite(args, workload: Workload, statements: list, app) -> Dict[str, dict]:
+    import httpx
+    
+    results = {}
+    # Исключение приложения - ответ 500 и ошибка сценария, а не остановка прогона
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/auth/login", json=workload.credentials)
+        response.raise_for_status()
+        workload.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        # ETag, которые клиент уже видел: сценарии *_not_modified получают 304
+        workload.etags["book"] = (await client.get(f"/books/{workload.book_keys[0]}")).headers["etag"]
+        workload.etags["books"] = (await client.get("/books", params={"page": 1, "limit": 20})).headers["etag"]
+        
+        runner = Runner(client, workload, statements)
+        for scenario in SCENARIOS:
+            if args.scenarios and not any(scenario.name.startswith(prefix) for prefix in args.scenarios):
+                continue
+            requests = min(args.requests, scenario.max_requests or args.requests)
+            warmup = min(args.warmup, requests)
+            if scenario.source:
+                size = len(scenario.source(workload))
+                if not size:
+                    print(f"{scenario.name:26} skipped: the previous write scenario created nothing")
+                    continue
+                requests = min(requests, size)
+                warmup = min(warmup, size - requests)
+            results[scenario.name] = result = await runner.run(scenario, requests, warmup, args.concurrency)
+            print(row(scenario.name, result))
+    return results
+
+
+def row(name: str, result: dict, baseline: Optional[dict] = None) -> str:
+    line = (f"{name:26} {result['requests']:>6} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+            f"{result['p99_ms']:>8.2f} {result['throughput']:>8.1f} {result['sql_per_request']:>6.1f}")
+    if result["errors"]:
+        line += f"  ! {result['errors']} errors: {result['first_error']}"
+    return line
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float, min_ms: float) -> List[str]:
+    """Сценарии, ставшие медленнее базы (по медиане) или выполняющие больше SQL запросов"""
+    print(f"\n{'scenario':26} {'p50 base':>9} {'p50 now':>9} {'change':>8} {'p95 base':>9} {'p95 now':>9} "
+          f"{'sql base':>9} {'sql now':>8}")
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:26} {'-':>9} {result['p50_ms']:>9.2f}")
+            continue
+        change = result["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0.0
+        slower = change > threshold and result["p50_ms"] - base["p50_ms"] > min_ms
+        # Кэши дают дробные значения; N+1 добавляет хотя бы запрос
+        more_sql = result["sql_per_request"] > base["sql_per_request"] + 0.5
+        flag = "  ! slower" if slower else ""
+        flag += "  ! more SQL" if more_sql else ""
+        print(f"{name:26} {base['p50_ms']:>9.2f} {result['p50_ms']:>9.2f} {change:>+8.0%} "
+              f"{base['p95_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+              f"{base['sql_per_request']:>9.1f} {result['sql_per_request']:>8.1f}{flag}")
+        if slower or more_sql:
+            regressions.append(name)
+    return regressions
+
+
+def generate_dataset(args) -> None:
+    """Сгенерировать временную базу через benchmarks.dataset"""
+    from benchmarks.common import use_temporary_database
+    
+    path = use_temporary_database()
+    command = [
+        sys.executable, "-m", "benchmarks.dataset", "--database-url", os.environ["DATABASE_URL"],
+        "--books", str(args.books), "--issues", str(args.issues), "--seed", str(args.seed),
+    ]
+    print(f"generating {args.books} books, {args.issues} issues in {path}")
+    completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode:
+        sys.stderr.write(completed.stdout[-2000:] + completed.stderr[-2000:])
+        raise SystemExit(f"benchmarks.dataset failed with exit code {completed.returncode}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=20_000, help="размер сгенерированного каталога")
+    parser.add_argument("--issues", type=int, default=200_000, help="выдач в сгенерированной истории")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database-url", help="готовая база (иначе генерируется временная SQLite)")
+    parser.add_argument("--requests", type=int, default=200, help="замеряемых запросов на сценарий")
+    parser.add_argument("--warmup", type=int, default=10, help="запросов без замера перед сценарием")
+    parser.add_argument("--concurrency", type=int, default=1, help="параллельных клиентов")
+    parser.add_argument("--scenarios", nargs="+", help="только сценарии с этими префиксами (books, issues.create)")
+    parser.add_argument("--output", help="файл результатов JSON (по умолчанию benchmarks/results/http-suite-<время>.json)")
+    parser.add_argument("--compare", help="файл результатов предыдущего прогона")
+    parser.add_argument("--threshold", type=float, default=0.25, help="допустимый рост медианы (0.25 = 25%%)")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="рост медианы меньше этого не считается регрессией")
+    args = parser.parse_args()
+    if min(args.requests, args.concurrency) < 1 or args.warmup < 0:
+        parser.error("--requests and --concurrency must be positive")
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+    
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        generate_dataset(args)
+    
+    import logging
+    from sqlalchemy import event, func, select
+    from sqlalchemy.engine import Engine
+    from config import ADMIN_PASSWORD, ADMIN_USERNAME
+    from database import engine
+    from main import app
+    from models import Book, Customer, Issue
+    
+    # Лог запросов uvicorn не нужен в выводе бенчмарка
+    logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
+    missing = uncovered_routes(app)
+    if missing:
+        print("Routes without a scenario: " + ", ".join(missing))
+        return 1
+    
+    needed = args.requests + args.warmup
+    workload = Workload(engine, args.seed, needed, {"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    with engine.connect() as conn:
+        dataset = {
+            name: conn.scalar(select(func.count()).select_from(model))
+            for name, model in (("books", Book), ("customers", Customer), ("issues", Issue))
+        }
+    
+    # SQL запросы всех движков процесса (синхронного и асинхронного)
+    statements: list = []
+    
+    def on_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    event.listen(Engine, "before_cursor_execute", on_execute)
+    
+    async def with_lifespan() -> Dict[str, dict]:
+        async with app.router.lifespan_context(app):
+            return await run_suite(args, workload, statements, app)
+    
+    print(f"{dataset['books']} books, {dataset['customers']} customers, {dataset['issues']} issues; "
+          f"{args.requests} requests per scenario, concurrency {args.concurrency}\n")
+    print(f"{'scenario':26} {'reqs':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'sql':>6}")
+    try:
+        results = asyncio.run(with_lifespan())
+    finally:
+        event.remove(Engine, "before_cursor_execute", on_execute)
+    
+    settings = {"requests": args.requests, "warmup": args.warmup, "concurrency": args.concurrency}
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results", f"http-suite-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump({
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "dataset": dict(dataset, seed=args.seed, generated=not args.database_url, date=date.today().isoformat()),
+            "settings": settings,
+            "scenarios": results,
+        }, file, indent=2, sort_keys=True)
+    print(f"\nlatencies in ms, sql = statements per request; results saved to {output}")
+    
+    failed = [name for name, result in results.items() if result["errors"]]
+    if failed:
+        print("Scenarios with unexpected responses: " + ", ".join(failed))
+    if baseline is not None:
+        if baseline.get("settings") != settings or baseline.get("dataset", {}).get("books") != dataset["books"]:
+            print(f"\n! baseline was measured with {baseline.get('settings')} on {baseline.get('dataset')}")
+        regressions = compare(results, baseline["scenarios"], args.threshold, args.min_ms)
+        if regressions:
+            print("Regressions: " + ", ".join(regressions))
+            failed += regressions
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Параллельное создание клиентов и книг: нет ли столкновений ключей.
+
+Потоки одновременно регистрируют клиентов
+(CustomerRepository.create_customer) и каталогизируют книги
+(BookRepository.create_with_relations); оба ключа назначает база
+(autoincrement). После каждого уровня проверяется, что ошибок первичного
+ключа не было, все ключи уникальны, а номера клиентов начинаются с 1000.
+При нарушении скрипт завершается с ненулевым кодом.
+
+Запуск: python -m benchmarks.key_allocation --threads 1 8 32 --duration 3
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+def worker(seed: int, deadline: float, stats: Counter, keys: dict, lock: threading.Lock) -> None:
+    """Регистрирует клиентов и книги до истечения времени"""
+    from sqlalchemy.exc import IntegrityError, OperationalError
+    from database import SessionLocal
+    from repositories import BookRepository, CustomerRepository
+
+    local, customers, books = Counter(), [], []
+    db = SessionLocal()
+    try:
+        customer_repo, book_repo = CustomerRepository(db), BookRepository(db)
+        n = 0
+        while time.perf_counter() < deadline:
+            n += 1
+            try:
+                if n % 2:
+                    customers.append(customer_repo.create_customer({"name": f"Reader {seed}-{n}"}).id)
+                else:
+                    books.append(book_repo.create_with_relations({"title": f"Book {seed}-{n}"}).key)
+            except IntegrityError:
+                db.rollback()
+                local["collisions"] += 1
+            except OperationalError:
+                db.rollback()
+                local["locked"] += 1
+    finally:
+        db.close()
+    with lock:
+        stats.update(local)
+        keys["customers"].extend(customers)
+        keys["books"].extend(books)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=3.0, help="секунд на каждый уровень")
+    parser.add_argument("--database-url", help="база для проверки (иначе временная SQLite)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        from benchmarks.common import use_temporary_database
+        use_temporary_database()
+
+    from database import engine
+    from models import Base
+
+    failed = False
+    print(f"{'threads':>8} {'creates/s':>10} {'customers':>10} {'books':>8} {'collisions':>11} {'locked':>7}")
+    for threads in args.threads:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+        stats, keys, lock = Counter(), {"customers": [], "books": []}, threading.Lock()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        pool = [
+            threading.Thread(target=worker, args=(seed, deadline, stats, keys, lock))
+            for seed in range(threads)
+        ]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        created = len(keys["customers"]) + len(keys["books"])
+        problems = []
+        if stats["collisions"]:
+            problems.append(f"{stats['collisions']} primary key collisions")
+        for table, values in keys.items():
+            if len(set(values)) != len(values):
+                problems.append(f"duplicate {table} keys")
+        if keys["customers"] and min(keys["customers"]) < 1000:
+            problems.append("customer ids below 1000")
+
+        print(f"{threads:>8} {created / elapsed:>10.1f} {len(keys['customers']):>10} {len(keys['books']):>8} "
+              f"{stats['collisions']:>11} {stats['locked']:>7}")
+        for problem in problems:
+            print(f"         ! {problem}")
+        failed = failed or bool(problems)
+
+    if failed:
+        print("\nConcurrent creates collided on a key")
+        return 1
+    print("\nNo key collisions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
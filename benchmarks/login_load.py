@@ -0,0 +1,167 @@
+"""
+Вход сотрудников в начале смены: пропускная способность POST /auth/login
+и задержка каталога во время входов.
+
+Приложение работает в одном event loop с нагрузкой (httpx ASGITransport).
+Для каждого режима проверки пароля сначала измеряется каталог без
+входов, затем --logins параллельных клиентов входят под разными
+учетными записями, пока отдельный клиент читает GET /books и
+GET /books/{key}. Задержка event loop - насколько опаздывает
+asyncio.sleep(0.01).
+
+- executor: bcrypt в auth.password_executor (как в приложении);
+- inline: bcrypt прямо в event loop (для сравнения).
+
+Если в режиме executor event loop задерживается дольше одной проверки
+bcrypt, скрипт завершается с ненулевым кодом.
+
+Запуск: python -m benchmarks.login_load --logins 16 --duration 5
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from benchmarks.common import use_temporary_database, populate
+
+use_temporary_database()
+
+import httpx  # noqa: E402
+import auth  # noqa: E402
+import services.auth_service  # noqa: E402
+from config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS  # noqa: E402
+from database import engine, SessionLocal  # noqa: E402
+from models import Base, StaffUser  # noqa: E402
+from main import app  # noqa: E402
+
+PASSWORD = "shift-start"
+
+
+async def verify_inline(plain_password, hashed_password):
+    """Наивная проверка пароля прямо в event loop"""
+    if hashed_password is None:
+        auth.pwd_context.dummy_verify()
+        return False, None
+    return auth.pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+MODES = {
+    "executor": auth.verify_password_async,
+    "inline": verify_inline,
+}
+
+
+def percentile(samples: list, q: float) -> float:
+    """Перцентиль q (0..100) в мс"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))] * 1000
+
+
+async def loop_lag(stop: asyncio.Event, lags: list) -> None:
+    """Опоздание asyncio.sleep(0.01), с"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - started - 0.01)
+
+
+async def catalog_reader(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list, books: int) -> None:
+    """Последовательно читает страницы и карточки каталога"""
+    n = 0
+    while not stop.is_set():
+        n += 1
+        path = f"/books?page={n % 10 + 1}&limit=20" if n % 2 else f"/books/{n % books + 1}"
+        started = time.perf_counter()
+        response = await client.get(path)
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+
+
+async def login_client(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list, seed: int, users: int) -> None:
+    """Входит снова и снова под учетной записью своего пульта"""
+    n = 0
+    while not stop.is_set():
+        username = f"desk-{(seed + n) % users + 1}"
+        n += 1
+        started = time.perf_counter()
+        response = await client.post("/auth/login", json={"username": username, "password": PASSWORD})
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+
+
+async def run_phase(logins: int, duration: float, users: int, books: int) -> dict:
+    """Каталог (и logins клиентов входа) в течение duration секунд"""
+    stop = asyncio.Event()
+    catalog, login, lags = [], [], []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        tasks = [
+            asyncio.create_task(loop_lag(stop, lags)),
+            asyncio.create_task(catalog_reader(client, stop, catalog, books)),
+        ] + [
+            asyncio.create_task(login_client(client, stop, login, seed, users))
+            for seed in range(logins)
+        ]
+        await asyncio.sleep(duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+    return {"catalog": catalog, "login": login, "lag": lags}
+
+
+def report(mode: str, phase: str, result: dict, duration: float) -> None:
+    catalog, login = result["catalog"], result["login"]
+    print(f"{mode:9} {phase:9} {len(login) / duration:>9.1f} {percentile(login, 50):>9.0f} "
+          f"{percentile(catalog, 50):>9.1f} {percentile(catalog, 95):>9.1f} {max(catalog) * 1000:>9.1f} "
+          f"{max(result['lag']) * 1000:>9.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=16, help="параллельных клиентов входа")
+    parser.add_argument("--users", type=int, default=50, help="учетных записей пультов")
+    parser.add_argument("--duration", type=float, default=5.0, help="секунд на каждую фазу")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        populate(db, books=200, customers=10)
+        # Один хэш на все учетные записи: подготовка не должна занимать минуты
+        password_hash = auth.get_password_hash(PASSWORD)
+        db.add_all([StaffUser(username=f"desk-{i}", password_hash=password_hash) for i in range(1, args.users + 1)])
+        db.commit()
+    finally:
+        db.close()
+
+    started = time.perf_counter()
+    auth.verify_password(PASSWORD, password_hash)
+    bcrypt_ms = (time.perf_counter() - started) * 1000
+    print(f"bcrypt rounds {BCRYPT_ROUNDS}: {bcrypt_ms:.0f} ms per check, {PASSWORD_HASH_WORKERS} hash workers\n")
+
+    print(f"{'mode':9} {'phase':9} {'logins/s':>9} {'login p50':>9} "
+          f"{'books p50':>9} {'books p95':>9} {'books max':>9} {'loop lag':>9}")
+    # Прогрев: первые запросы загружают модули и заполняют кэши
+    asyncio.run(run_phase(0, 1.0, args.users, 200))
+    stalled = False
+    for mode in args.modes:
+        services.auth_service.verify_password_async = MODES[mode]
+        for phase, logins in (("idle", 0), ("logins", args.logins)):
+            result = asyncio.run(run_phase(logins, args.duration, args.users, 200))
+            report(mode, phase, result, args.duration)
+            if mode == "executor" and max(result["lag"]) * 1000 > bcrypt_ms:
+                stalled = True
+    services.auth_service.verify_password_async = auth.verify_password_async
+    print("\nlatencies in ms; loop lag is the worst delay of a 10 ms timer")
+
+    if stalled:
+        print("Logins stalled the event loop for longer than one bcrypt check")
+        return 1
+    print("Logins did not stall the event loop")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
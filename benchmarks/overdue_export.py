@@ -0,0 +1,80 @@
+"""
+Память потоковой выгрузки просрочек (GET /issues/overdue/export).
+
+Выгрузка прогоняется на маленьком и большом наборе просрочек и
+измеряется пик памяти Python (tracemalloc). Пик должен оставаться
+примерно постоянным, иначе скрипт завершается с ненулевым кодом.
+
+Запуск: python -m benchmarks.overdue_export
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import use_temporary_database, populate
+
+use_temporary_database()
+
+from database import engine, SessionLocal, AsyncSessionLocal  # noqa: E402
+from models import Base  # noqa: E402
+from services import OverdueExportService  # noqa: E402
+
+# Половина выдач в populate остается открытой и просроченной
+DATASETS = {
+    "small": {"books": 500, "customers": 100, "issues_per_customer": 10},
+    "large": {"books": 500, "customers": 4000, "issues_per_customer": 10},
+}
+# Допустимый рост пика памяти между наборами
+MAX_GROWTH = 2.0
+
+
+async def export(format: str) -> tuple:
+    """Выгрузить отчет, не сохраняя его; вернуть (байт, строк)"""
+    size = lines = 0
+    async with AsyncSessionLocal() as db:
+        async for chunk in OverdueExportService(db).export(format):
+            size += len(chunk)
+            lines += chunk.count("\n")
+    return size, lines
+
+
+def measure(format: str) -> dict:
+    """Пик памяти и время выгрузки"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    size, lines = asyncio.run(export(format))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"lines": lines, "bytes": size, "peak_kb": peak / 1024, "seconds": elapsed}
+
+
+def main() -> int:
+    results = {}
+    for name, params in DATASETS.items():
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        try:
+            populate(db, **params)
+        finally:
+            db.close()
+        for format in ("ndjson", "csv"):
+            results[name, format] = measure(format)
+    
+    print(f"{'dataset':<8} {'format':<7} {'lines':>8} {'MB':>8} {'peak KB':>9} {'rows/s':>9}")
+    failed = False
+    for (name, format), result in results.items():
+        print(f"{name:<8} {format:<7} {result['lines']:>8} {result['bytes'] / 2**20:>8.2f} "
+              f"{result['peak_kb']:>9.0f} {result['lines'] / result['seconds']:>9.0f}")
+        if name == "large":
+            small = results["small", format]["peak_kb"]
+            if result["peak_kb"] > small * MAX_GROWTH:
+                print(f"  ! peak memory grew {result['peak_kb'] / small:.1f}x with the number of rows")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Подсчет SQL запросов на каждый endpoint чтения.
+
+Каждый endpoint вызывается на маленьком и большом наборе данных.
+Количество запросов не должно зависеть от количества строк в ответе,
+иначе скрипт завершается с ненулевым кодом.
+
+Те же проверки выполняет tests/test_query_counts.py; скрипт выводит
+таблицу для отчета.
+
+Запуск: python -m benchmarks.query_counts
+"""
+import sys
+
+from benchmarks.common import use_temporary_database, count_queries, populate
+
+ENDPOINTS = [
+    "/books?limit=100",
+    "/books/1",
+    "/books/1/availability",
+    "/customers",
+    "/customers/1000",
+    "/customers/search?name=customer",
+    "/issues/customers/1000/current",
+    "/issues/customers/1000/history",
+    "/issues/books/1/history",
+    "/issues/overdue",
+]
+
+DATASETS = {
+    "small": {"books": 10, "customers": 2, "issues_per_customer": 2},
+    "large": {"books": 100, "customers": 20, "issues_per_customer": 4},
+}
+
+
+def load_dataset(name: str) -> None:
+    """Пересоздать схему и заполнить набор данных DATASETS[name]"""
+    from database import engine, SessionLocal
+    from models import Base
+    
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        populate(db, **DATASETS[name])
+    finally:
+        db.close()
+
+
+def measure(client, headers: dict) -> dict:
+    """Выполнить все endpoints и вернуть количество запросов на каждый"""
+    from cache import catalog_cache
+    from database import async_engine
+    
+    counts = {}
+    for path in ENDPOINTS:
+        # Считаются запросы к базе, а не попадания в кэш каталога
+        catalog_cache.clear()
+        with count_queries(async_engine.sync_engine) as counter:
+            response = client.get(path, headers=headers)
+        response.raise_for_status()
+        counts[path] = counter.count
+    return counts
+
+
+def main() -> int:
+    use_temporary_database()
+    from fastapi.testclient import TestClient
+    from auth import create_access_token
+    from main import app
+    
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin'})}"}
+    
+    results = {}
+    for name in DATASETS:
+        load_dataset(name)
+        results[name] = measure(client, headers)
+    
+    failed = False
+    print(f"{'endpoint':40} {'small':>6} {'large':>6}")
+    for path in ENDPOINTS:
+        small, large = results["small"][path], results["large"][path]
+        marker = "" if small == large else "  <- grows with row count"
+        failed = failed or small != large
+        print(f"{path:40} {small:>6} {large:>6}{marker}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
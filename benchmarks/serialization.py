@@ -0,0 +1,124 @@
+"""
+Сборка DTO и сериализация ответа на каждый endpoint чтения.
+
+Для страницы каждого endpoint (данные ORM загружаются один раз)
+измеряется сборка DTO конвертером сервиса и два способа кодирования:
+
+- response_model: FastAPI выгружает DTO в dict, заново проверяет их по
+  response_model и кодирует в JSON (ответ-модель из endpoint);
+- trusted: TrustedJSONResponse кодирует DTO сразу (pydantic-core).
+
+Тела ответов обоих способов должны совпадать, иначе скрипт завершается
+с ненулевым кодом.
+
+Запуск: python -m benchmarks.serialization --rows 500 --repeat 30
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.common import use_temporary_database, populate
+
+use_temporary_database()
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from database import engine, SessionLocal  # noqa: E402
+from models import Base  # noqa: E402
+from main import app  # noqa: E402
+from repositories import BookRepository, CustomerRepository, IssueRepository  # noqa: E402
+from services import BookService, CustomerService, IssueService  # noqa: E402
+from responses import TrustedJSONResponse  # noqa: E402
+from dto import BookListResponseDTO  # noqa: E402
+
+
+def scenarios(db, rows: int) -> list:
+    """(endpoint, строк, сборка DTO страницы) для каждого endpoint"""
+    books = BookRepository(db).search_books(limit=rows, profile="detail")
+    customers, _ = CustomerRepository(db).search_customers(limit=rows)
+    issue_repo = IssueRepository(db)
+    with_book, _ = issue_repo.get_overdue_issues(profile="with_book", limit=rows)
+    with_customer, _ = issue_repo.get_overdue_issues(profile="with_customer", limit=rows)
+
+    book_service, customer_service, issue_service = BookService(db), CustomerService(db), IssueService(db)
+    return [
+        ("/books", len(books), lambda: BookListResponseDTO(
+            items=book_service._convert_to_response_dtos(books),
+            total=len(books), page=1, limit=len(books), total_pages=1)),
+        ("/books/{book_key}", 1,
+         lambda: book_service._convert_to_response_dto(books[0], books[0].current_issue_id is None)),
+        ("/customers", len(customers),
+         lambda: [customer_service._convert_to_response_dto(customer) for customer in customers]),
+        ("/issues/customers/{customer_id}/history", len(with_book),
+         lambda: [issue_service._convert_to_issue_with_book_dto(issue) for issue in with_book]),
+        ("/issues/overdue", len(with_customer),
+         lambda: [issue_service._convert_to_issue_with_customer_dto(issue) for issue in with_customer]),
+    ]
+
+
+def response_field(path: str):
+    """response_model маршрута GET path (как его видит FastAPI)"""
+    for route in app.routes:
+        if getattr(route, "path", None) == path and "GET" in route.methods:
+            return route.response_field
+    raise LookupError(path)
+
+
+async def validated_body(field, content) -> bytes:
+    """Тело ответа, как его строит FastAPI для возвращенной модели"""
+    value = await serialize_response(field=field, response_content=content, is_coroutine=True)
+    return JSONResponse(value).body
+
+
+def timed(function, repeat: int) -> float:
+    """Медианное время вызова, мс"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500, help="строк на странице списка")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    loop = asyncio.new_event_loop()
+    failed = False
+    try:
+        populate(db, books=args.rows, customers=args.rows, issues_per_customer=2)
+        db.expire_on_commit = False
+        print(f"{'endpoint':40} {'rows':>5} {'build':>8} {'model':>8} {'trusted':>8} {'speedup':>8} {'rows/s':>9}")
+        for path, rows, build in scenarios(db, args.rows):
+            field = response_field(path)
+            content = build()
+
+            validated = loop.run_until_complete(validated_body(field, content))
+            if json.loads(validated) != json.loads(TrustedJSONResponse(content).body):
+                print(f"{path}: trusted response differs from the response_model one")
+                failed = True
+
+            build_ms = timed(build, args.repeat)
+            model_ms = timed(lambda: loop.run_until_complete(validated_body(field, content)), args.repeat)
+            trusted_ms = timed(lambda: TrustedJSONResponse(content), args.repeat)
+
+            before, after = build_ms + model_ms, build_ms + trusted_ms
+            print(f"{path:40} {rows:>5} {build_ms:>8.2f} {model_ms:>8.2f} {trusted_ms:>8.2f} "
+                  f"{before / after:>7.1f}x {rows / after * 1000:>9.0f}")
+        print("\nms per page; speedup and rows/s include building the DTOs")
+    finally:
+        loop.close()
+        db.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Запуск воркера: импорт приложения, схема базы, lifespan и первый запрос.
+
+Каждый запуск - отдельный процесс Python (как воркер uvicorn при
+перезапуске). Режимы:
+
+- factory: как сейчас - импорт main без обращений к базе, lifespan
+  прогревает пулы, затем первый и второй GET /books;
+- create_all: то же плюс Base.metadata.create_all при импорте (как
+  было раньше) - сколько времени и SQL запросов стоит чтение схемы.
+
+Выводятся медианы по --runs запускам; SQL запросы считаются по всем
+движкам процесса. База создается миграциями и заполняется один раз.
+
+Запуск: python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import ROOT, migrate, populate
+
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+statements = []
+event.listen(Engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+def phase(name, function):
+    before, phase_started = len(statements), time.perf_counter()
+    function()
+    result[name + "_ms"] = (time.perf_counter() - phase_started) * 1000
+    result[name + "_sql"] = len(statements) - before
+
+result = {}
+phase("import", lambda: __import__("main"))
+import main
+if sys.argv[1] == "create_all":
+    from database import engine
+    from models import Base
+    phase("schema", lambda: Base.metadata.create_all(bind=engine))
+
+from fastapi.testclient import TestClient
+client = TestClient(main.app)
+phase("lifespan", client.__enter__)
+phase("first_request", lambda: client.get("/books").raise_for_status())
+phase("second_request", lambda: client.get("/books?page=2").raise_for_status())
+result["ready_ms"] = (time.perf_counter() - started) * 1000
+client.__exit__(None, None, None)
+print(json.dumps(result))
+"""
+
+COLUMNS = [
+    ("import_ms", "import"), ("schema_ms", "schema"), ("schema_sql", "schema sql"),
+    ("lifespan_ms", "lifespan"), ("first_request_ms", "1st req"), ("second_request_ms", "2nd req"),
+    ("ready_ms", "ready"),
+]
+
+
+def run_child(mode: str) -> dict:
+    """Один запуск воркера в отдельном процессе"""
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD, mode], cwd=ROOT, env=os.environ.copy(),
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", choices=["factory", "create_all"], default=["factory", "create_all"])
+    parser.add_argument("--database-url", help="база для проверки (иначе временная SQLite)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        from benchmarks.common import use_temporary_database
+        use_temporary_database()
+        migrate()
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            populate(db, books=500, customers=50)
+        finally:
+            db.close()
+
+    print(f"{'mode':11}" + "".join(f" {title:>10}" for _, title in COLUMNS))
+    failed = False
+    for mode in args.modes:
+        # Первый запуск прогревает файловый кэш ОС и .pyc
+        run_child(mode)
+        runs = [run_child(mode) for _ in range(args.runs)]
+        medians = {
+            key: statistics.median(run.get(key, 0) for run in runs)
+            for key, _ in COLUMNS
+        }
+        print(f"{mode:11}" + "".join(
+            f" {medians[key]:>10.0f}" if key.endswith("_sql") else f" {medians[key]:>10.1f}"
+            for key, _ in COLUMNS
+        ))
+        if mode == "factory" and any(run["import_sql"] for run in runs):
+            print(f"{'':11} ! importing the application ran {runs[0]['import_sql']} SQL statements")
+            failed = True
+    print("\nms per worker (medians); schema = create_all at import, as before the app factory")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
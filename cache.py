@@ -0,0 +1,176 @@
+"""
+Кэш ответов каталога в памяти процесса (LRU + TTL).
+
+Записи помечаются тегами; запись в базу сбрасывает только записи
+с затронутыми тегами (книга, списки, доступность). Кэш локален для
+процесса: при нескольких воркерах чужие изменения видны через TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from config import CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL
+
+# Любой список книг (новая книга может попасть в любой поиск)
+BOOK_LIST_TAG = "books:list"
+# Списки, отфильтрованные по доступности (меняются при выдаче и возврате)
+AVAILABILITY_TAG = "books:availability"
+
+
+def book_tag(book_key: int) -> str:
+    """Тег записей, содержащих книгу book_key"""
+    return f"book:{book_key}"
+
+
+class TTLCache:
+    """Потокобезопасный LRU кэш с временем жизни записей и тегами"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tag_keys: Dict[str, set] = {}
+        # Счетчик инвалидаций: значение, загруженное до инвалидации,
+        # не попадет в кэш после нее (даже если ее теги не затронуты)
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+    
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any],
+                    tags: Callable[[Any], Iterable[str]]) -> Any:
+        """Вернуть значение из кэша или загрузить его и сохранить с тегами tags(value)"""
+        if not self.enabled:
+            return loader()
+        
+        found, value = self.get(key)
+        if found:
+            return value
+        
+        epoch = self._epoch
+        value = loader()
+        if value is not None:
+            self.set(key, value, tags(value), epoch)
+        return value
+    
+    async def get_or_load_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                                tags: Callable[[Any], Iterable[str]]) -> Any:
+        """get_or_load с асинхронным loader"""
+        if not self.enabled:
+            return await loader()
+        
+        found, value = self.get(key)
+        if found:
+            return value
+        
+        epoch = self._epoch
+        value = await loader()
+        if value is not None:
+            self.set(key, value, tags(value), epoch)
+        return value
+    
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """(найдено, значение) с учетом TTL"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            expires_at, value, tags = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+    
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (),
+            epoch: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        """Сохранить значение; пропускается, если после epoch была инвалидация.
+        
+        ttl сокращает время жизни записи (не больше общего ttl кэша).
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or not self.enabled:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+    
+    def invalidate(self, *tags: str) -> int:
+        """Удалить все записи с любым из тегов; вернуть количество удаленных"""
+        removed = 0
+        with self._lock:
+            self._epoch += 1
+            for tag in tags:
+                for key in self._tag_keys.pop(tag, set()):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+            self.invalidations += removed
+        return removed
+    
+    def clear(self) -> None:
+        """Очистить кэш (статистика сохраняется)"""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._tag_keys.clear()
+    
+    def stats(self) -> dict:
+        """Метрики кэша для /health/cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+    
+    def _remove(self, key: Hashable) -> None:
+        """Удалить запись и ее ссылки из индекса тегов (под блокировкой)"""
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+
+catalog_cache = TTLCache(maxsize=CATALOG_CACHE_SIZE, ttl=CATALOG_CACHE_TTL)
+
+
+def invalidate_books(book_keys: Iterable[int], lists: bool = False, availability: bool = False) -> int:
+    """Сбросить кэш каталога после изменения книг book_keys"""
+    tags = [book_tag(book_key) for book_key in book_keys]
+    if not tags and not lists:
+        return 0
+    if lists:
+        tags.append(BOOK_LIST_TAG)
+    if availability:
+        tags.append(AVAILABILITY_TAG)
+    return catalog_cache.invalidate(*tags)
@@ -4,11 +4,55 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./bookmaster3000.db")
+# URL для асинхронного драйвера (aiosqlite / asyncmy); по умолчанию выводится из DATABASE_URL
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+# Пул соединений (для SQLite pre-ping и recycle не применяются)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Соединений каждого пула, открываемых при старте приложения (0 - не прогревать)
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", "1"))
+
+# Профиль SQLite: WAL, чтобы читатели не ждали писателей
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+# Правила выдачи: сколько книг клиент может держать одновременно
+MAX_ACTIVE_LOANS = int(os.getenv("MAX_ACTIVE_LOANS", "5"))
+
+# Кэш ответов каталога (GET /books, GET /books/{key}); 0 отключает кэш
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "1024"))
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "60"))
+
+# Кэш проверенных JWT (запись живет до exp токена); 0 отключает кэш
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+
+# Сервер (run.py); reload только для разработки - перезапуск на каждое изменение файлов
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+SERVER_RELOAD = os.getenv("SERVER_RELOAD", "false").lower() in ("1", "true", "yes")
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-# Admin credentials
-ADMIN_USERNAME = "admin"
-ADMIN_PASSWORD = "admin123"
+# Пароли сотрудников: стоимость bcrypt и размер пула потоков для хэширования
+# (вход не занимает event loop и пул потоков FastAPI)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Кэш учетных записей для входа; изменения из manage_staff.py видны через TTL
+STAFF_CACHE_SIZE = int(os.getenv("STAFF_CACHE_SIZE", "256"))
+STAFF_CACHE_TTL = float(os.getenv("STAFF_CACHE_TTL", "60"))
+
+# Первая учетная запись администратора (создается init_db.py, если ее нет)
+ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
 
@@ -1,14 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from services import AuthService
 from dto import UserLoginDTO, TokenDTO, UserResponseDTO
-from database import get_db
+from database import get_async_db
 from services.auth_service import verify_token
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
-def get_auth_service(db: Session = Depends(get_db)) -> AuthService:
+def get_auth_service(db: AsyncSession = Depends(get_async_db)) -> AuthService:
     """Получить сервис аутентификации"""
     return AuthService(db)
 
@@ -18,8 +18,8 @@ async def login(
     user_credentials: UserLoginDTO,
     auth_service: AuthService = Depends(get_auth_service)
 ):
-    """Войти в систему"""
-    token = auth_service.login(user_credentials)
+    """Войти в систему (пароль проверяется вне event loop)"""
+    token = await auth_service.login(user_credentials)
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
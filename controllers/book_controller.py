@@ -1,74 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from services import BookService
+from services import AsyncService, BookService
 from dto import (
     BookCreateDTO, BookUpdateDTO, BookResponseDTO, BookSearchDTO, 
     BookListResponseDTO, TokenDTO
 )
-from database import get_db
+from database import get_async_db
 from auth import verify_token
+from etag import etag_matches, not_modified
+from responses import TrustedJSONResponse
 
 router = APIRouter(prefix="/books", tags=["books"])
 
 
-def get_book_service(db: Session = Depends(get_db)) -> BookService:
+def get_book_service(db: AsyncSession = Depends(get_async_db)) -> AsyncService[BookService]:
     """Получить сервис книг"""
-    return BookService(db)
+    return AsyncService(db, BookService)
 
 
 @router.get("", response_model=BookListResponseDTO)
 async def get_books(
+    request: Request,
+    q: Optional[str] = Query(None),
     title: Optional[str] = Query(None),
     author: Optional[str] = Query(None),
     subject: Optional[str] = Query(None),
+    sort: Optional[str] = Query(None),
+    available: Optional[bool] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
-    book_service: BookService = Depends(get_book_service)
+    cursor: Optional[str] = Query(None),
+    book_service: AsyncService[BookService] = Depends(get_book_service)
 ):
-    """Получить список книг с поиском и пагинацией"""
+    """Получить список книг с поиском и пагинацией (page или cursor).
+    
+    Поддерживает ETag / If-None-Match (304 без загрузки связей книг).
+    """
     search_params = BookSearchDTO(
+        q=q,
         title=title,
         author=author,
         subject=subject,
+        sort=sort,
+        available=available,
         skip=(page - 1) * limit,
-        limit=limit
+        limit=limit,
+        cursor=cursor
     )
     
-    return book_service.get_books(search_params)
+    try:
+        if request.headers.get("if-none-match"):
+            etag = await book_service.get_books_etag(search_params)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        page = await book_service.get_books(search_params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return TrustedJSONResponse(page, headers={"ETag": BookService.books_page_etag(page)})
 
 
 @router.get("/{book_key}", response_model=BookResponseDTO)
 async def get_book(
     book_key: int,
-    book_service: BookService = Depends(get_book_service)
+    request: Request,
+    book_service: AsyncService[BookService] = Depends(get_book_service)
 ):
-    """Получить книгу по ключу"""
-    book = book_service.get_book(book_key)
+    """Получить книгу по ключу (ETag / If-None-Match)"""
+    if request.headers.get("if-none-match"):
+        etag = await book_service.get_book_etag(book_key)
+        if etag and etag_matches(request, etag):
+            return not_modified(etag)
+    
+    book = await book_service.get_book(book_key)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
-    return book
+    return TrustedJSONResponse(book, headers={"ETag": BookService.book_etag(book)})
 
 
 @router.post("", response_model=BookResponseDTO)
 async def create_book(
     book: BookCreateDTO,
-    book_service: BookService = Depends(get_book_service),
+    book_service: AsyncService[BookService] = Depends(get_book_service),
     current_user: str = Depends(verify_token)
 ):
     """Создать новую книгу (требует аутентификации)"""
-    return book_service.create_book(book)
+    return await book_service.create_book(book)
 
 
 @router.put("/{book_key}", response_model=BookResponseDTO)
 async def update_book(
     book_key: int,
     book: BookUpdateDTO,
-    book_service: BookService = Depends(get_book_service),
+    book_service: AsyncService[BookService] = Depends(get_book_service),
     current_user: str = Depends(verify_token)
 ):
     """Обновить книгу (требует аутентификации)"""
-    updated_book = book_service.update_book(book_key, book)
+    updated_book = await book_service.update_book(book_key, book)
     if not updated_book:
         raise HTTPException(status_code=404, detail="Book not found")
     return updated_book
@@ -77,11 +106,11 @@ async def update_book(
 @router.delete("/{book_key}")
 async def delete_book(
     book_key: int,
-    book_service: BookService = Depends(get_book_service),
+    book_service: AsyncService[BookService] = Depends(get_book_service),
     current_user: str = Depends(verify_token)
 ):
     """Удалить книгу (требует аутентификации)"""
-    success = book_service.delete_book(book_key)
+    success = await book_service.delete_book(book_key)
     if not success:
         raise HTTPException(status_code=404, detail="Book not found")
     return {"message": "Book deleted"}
@@ -90,18 +119,25 @@ async def delete_book(
 @router.get("/{book_key}/availability")
 async def check_book_availability(
     book_key: int,
-    book_service: BookService = Depends(get_book_service)
+    request: Request,
+    response: Response,
+    book_service: AsyncService[BookService] = Depends(get_book_service)
 ):
-    """Проверить доступность книги"""
-    book = book_service.get_book(book_key)
+    """Проверить доступность книги (ETag / If-None-Match)"""
+    if request.headers.get("if-none-match"):
+        etag = await book_service.get_book_etag(book_key, representation="availability")
+        if etag and etag_matches(request, etag):
+            return not_modified(etag)
+    
+    book = await book_service.get_book(book_key)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     
-    available = book_service.check_book_availability(book_key)
+    response.headers["ETag"] = BookService.book_etag(book, representation="availability")
     return {
         "book_key": book_key,
         "title": book.title,
-        "is_available": available
+        "is_available": book.is_available
     }
 
 
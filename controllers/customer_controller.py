@@ -1,70 +1,117 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
-from services import CustomerService
+from services import AsyncService, CustomerService
 from dto import (
     CustomerCreateDTO, CustomerUpdateDTO, CustomerResponseDTO, 
-    CustomerSearchDTO
+    CustomerSearchDTO, CustomerLookupDTO, CustomerListResponseDTO
 )
-from database import get_db
+from database import get_async_db
 from auth import verify_token
+from etag import etag_matches, not_modified
+from responses import TrustedJSONResponse, cursor_page_response
 
 router = APIRouter(prefix="/customers", tags=["customers"])
 
 
-def get_customer_service(db: Session = Depends(get_db)) -> CustomerService:
+def get_customer_service(db: AsyncSession = Depends(get_async_db)) -> AsyncService[CustomerService]:
     """Получить сервис клиентов"""
-    return CustomerService(db)
+    return AsyncService(db, CustomerService)
 
 
 @router.get("", response_model=List[CustomerResponseDTO])
 async def get_customers(
+    request: Request,
     customer_id: Optional[int] = Query(None),
     name: Optional[str] = Query(None),
-    customer_service: CustomerService = Depends(get_customer_service),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    customer_service: AsyncService[CustomerService] = Depends(get_customer_service),
     current_user: str = Depends(verify_token)
 ):
-    """Получить список клиентов с поиском (требует аутентификации)"""
+    """Получить список клиентов с поиском (требует аутентификации).
+    
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    Поддерживает ETag / If-None-Match.
+    """
     search_params = CustomerSearchDTO(
         customer_id=customer_id,
-        name=name
+        name=name,
+        limit=limit,
+        cursor=cursor
     )
     
-    return customer_service.get_customers(search_params)
+    try:
+        if request.headers.get("if-none-match"):
+            etag = await customer_service.get_customers_etag(search_params)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        page = await customer_service.get_customers(search_params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return cursor_page_response(page, {"ETag": CustomerService.customers_page_etag(page)})
+
+
+@router.get("/search", response_model=CustomerListResponseDTO)
+async def lookup_customers(
+    name: Optional[str] = Query(None, description="Начало имени (без учета регистра)"),
+    email: Optional[str] = Query(None),
+    phone: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    customer_service: AsyncService[CustomerService] = Depends(get_customer_service),
+    current_user: str = Depends(verify_token)
+):
+    """Поиск клиента по началу имени, email или телефону с общим количеством (требует аутентификации)"""
+    params = CustomerLookupDTO(
+        name=name,
+        email=email,
+        phone=phone,
+        skip=(page - 1) * limit,
+        limit=limit
+    )
+    return TrustedJSONResponse(await customer_service.lookup_customers(params))
 
 
 @router.get("/{customer_id}", response_model=CustomerResponseDTO)
 async def get_customer(
     customer_id: int,
-    customer_service: CustomerService = Depends(get_customer_service),
+    request: Request,
+    customer_service: AsyncService[CustomerService] = Depends(get_customer_service),
     current_user: str = Depends(verify_token)
 ):
-    """Получить клиента по ID (требует аутентификации)"""
-    customer = customer_service.get_customer(customer_id)
+    """Получить клиента по ID (требует аутентификации, ETag / If-None-Match)"""
+    if request.headers.get("if-none-match"):
+        etag = await customer_service.get_customer_etag(customer_id)
+        if etag and etag_matches(request, etag):
+            return not_modified(etag)
+    
+    customer = await customer_service.get_customer(customer_id)
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
-    return customer
+    return TrustedJSONResponse(customer, headers={"ETag": CustomerService.customer_etag(customer)})
 
 
 @router.post("", response_model=CustomerResponseDTO)
 async def create_customer(
     customer: CustomerCreateDTO,
-    customer_service: CustomerService = Depends(get_customer_service),
+    customer_service: AsyncService[CustomerService] = Depends(get_customer_service),
     current_user: str = Depends(verify_token)
 ):
     """Создать нового клиента (требует аутентификации)"""
-    return customer_service.create_customer(customer)
+    return await customer_service.create_customer(customer)
 
 
 @router.put("/{customer_id}", response_model=CustomerResponseDTO)
 async def update_customer(
     customer_id: int,
     customer: CustomerUpdateDTO,
-    customer_service: CustomerService = Depends(get_customer_service),
+    customer_service: AsyncService[CustomerService] = Depends(get_customer_service),
     current_user: str = Depends(verify_token)
 ):
     """Обновить клиента (требует аутентификации)"""
-    updated_customer = customer_service.update_customer(customer_id, customer)
+    updated_customer = await customer_service.update_customer(customer_id, customer)
     if not updated_customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     return updated_customer
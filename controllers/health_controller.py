@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from database import get_pool_statistics
+from cache import catalog_cache
+from auth import token_cache, staff_cache
+from startup import startup_timings
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("")
+async def health_check():
+    """Проверка здоровья API"""
+    return {"status": "healthy"}
+
+
+@router.get("/db")
+async def database_health():
+    """Статистика пула соединений"""
+    return {"pools": get_pool_statistics()}
+
+
+@router.get("/cache")
+async def cache_health():
+    """Метрики кэша каталога, проверенных токенов и учетных записей"""
+    return {"catalog": catalog_cache.stats(), "tokens": token_cache.stats(), "staff": staff_cache.stats()}
+
+
+@router.get("/startup")
+async def startup_health():
+    """Длительность запуска процесса и первого запроса"""
+    return startup_timings.snapshot()
@@ -1,84 +1,172 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from services import IssueService
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import List, Optional
+from services import AsyncService, IssueService, OverdueExportService
+from repositories import CheckoutConflictError
 from dto import (
     IssueCreateDTO, IssueWithBookDTO, IssueWithCustomerDTO,
-    IssueRenewResponseDTO, IssueReturnResponseDTO
+    IssueRenewResponseDTO, IssueReturnResponseDTO,
+    IssueBatchCreateDTO, IssueBatchResponseDTO,
+    IssueBatchReturnDTO, IssueBatchReturnResponseDTO
 )
-from database import get_db
+from database import get_async_db, AsyncSessionLocal
 from auth import verify_token
+from responses import TrustedJSONResponse, cursor_page_response
 
 router = APIRouter(prefix="/issues", tags=["circulation"])
 
 
-def get_issue_service(db: Session = Depends(get_db)) -> IssueService:
+def get_issue_service(db: AsyncSession = Depends(get_async_db)) -> AsyncService[IssueService]:
     """Получить сервис выдач"""
-    return IssueService(db)
+    return AsyncService(db, IssueService)
 
 
 @router.get("/customers/{customer_id}/current", response_model=List[IssueWithBookDTO])
 async def get_current_issues(
     customer_id: int,
-    issue_service: IssueService = Depends(get_issue_service),
+    issue_service: AsyncService[IssueService] = Depends(get_issue_service),
     current_user: str = Depends(verify_token)
 ):
     """Получить текущие выдачи клиента (требует аутентификации)"""
-    return issue_service.get_current_issues_by_customer(customer_id)
+    return TrustedJSONResponse(await issue_service.get_current_issues_by_customer(customer_id))
 
 
 @router.get("/customers/{customer_id}/history", response_model=List[IssueWithBookDTO])
 async def get_issue_history(
     customer_id: int,
-    issue_service: IssueService = Depends(get_issue_service),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    issue_service: AsyncService[IssueService] = Depends(get_issue_service),
     current_user: str = Depends(verify_token)
 ):
-    """Получить историю выдач клиента (требует аутентификации)"""
-    return issue_service.get_issue_history_by_customer(customer_id)
+    """Получить историю выдач клиента (требует аутентификации).
+    
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    """
+    try:
+        page = await issue_service.get_issue_history_by_customer(customer_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return cursor_page_response(page)
 
 
 @router.get("/books/{book_key}/history", response_model=List[IssueWithCustomerDTO])
 async def get_book_history(
     book_key: int,
-    issue_service: IssueService = Depends(get_issue_service),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    issue_service: AsyncService[IssueService] = Depends(get_issue_service),
     current_user: str = Depends(verify_token)
 ):
-    """Получить историю выдачи книги (требует аутентификации)"""
-    return issue_service.get_book_history(book_key)
+    """Получить историю выдачи книги (требует аутентификации).
+    
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    """
+    try:
+        page = await issue_service.get_book_history(book_key, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return cursor_page_response(page)
 
 
 @router.get("/overdue", response_model=List[IssueWithCustomerDTO])
 async def get_overdue_issues(
-    issue_service: IssueService = Depends(get_issue_service),
+    sort: str = Query("due", description="Сортировка: due, issued, customer"),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    issue_service: AsyncService[IssueService] = Depends(get_issue_service),
+    current_user: str = Depends(verify_token)
+):
+    """Получить просроченные выдачи (требует аутентификации).
+    
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    """
+    try:
+        page = await issue_service.get_overdue_issues(sort=sort, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return cursor_page_response(page)
+
+
+@router.get("/overdue/export")
+async def export_overdue_issues(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
     current_user: str = Depends(verify_token)
 ):
-    """Получить просроченные выдачи (требует аутентификации)"""
-    return issue_service.get_overdue_issues()
+    """Выгрузить все просроченные выдачи потоком NDJSON или CSV (требует аутентификации)"""
+    async def body():
+        # Своя сессия: ответ читается из базы, пока отдается клиенту
+        async with AsyncSessionLocal() as db:
+            async for chunk in OverdueExportService(db).export(format):
+                yield chunk
+    
+    filename = f"overdue-{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        body(),
+        media_type=OverdueExportService.media_types[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.post("", response_model=dict)
 async def create_issue(
     issue: IssueCreateDTO,
-    issue_service: IssueService = Depends(get_issue_service),
+    issue_service: AsyncService[IssueService] = Depends(get_issue_service),
     current_user: str = Depends(verify_token)
 ):
     """Создать новую выдачу (требует аутентификации)"""
     try:
-        created_issue = issue_service.create_issue(issue)
+        created_issue = await issue_service.create_issue(issue)
         return {"message": "Book issued successfully", "issue_id": created_issue.id}
+    except CheckoutConflictError as e:
+        # Книга занята параллельной выдачей - клиент может повторить запрос
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/batch", response_model=IssueBatchResponseDTO)
+async def create_issues(
+    batch: IssueBatchCreateDTO,
+    issue_service: AsyncService[IssueService] = Depends(get_issue_service),
+    current_user: str = Depends(verify_token)
+):
+    """Выдать клиенту несколько книг за один запрос (требует аутентификации)"""
+    try:
+        return await issue_service.create_issues(batch)
+    except CheckoutConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/batch/return", response_model=IssueBatchReturnResponseDTO)
+async def return_books(
+    batch: IssueBatchReturnDTO,
+    issue_service: AsyncService[IssueService] = Depends(get_issue_service),
+    current_user: str = Depends(verify_token)
+):
+    """Вернуть пачку книг по id выдач или ключам книг (требует аутентификации)"""
+    try:
+        return await issue_service.return_books(batch)
+    except CheckoutConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
 @router.post("/{issue_id}/return", response_model=IssueReturnResponseDTO)
 async def return_book(
     issue_id: int,
-    issue_service: IssueService = Depends(get_issue_service),
+    issue_service: AsyncService[IssueService] = Depends(get_issue_service),
     current_user: str = Depends(verify_token)
 ):
     """Вернуть книгу (требует аутентификации)"""
     try:
-        return issue_service.return_book(issue_id)
+        return await issue_service.return_book(issue_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -86,12 +174,12 @@ async def return_book(
 @router.post("/{issue_id}/renew", response_model=IssueRenewResponseDTO)
 async def renew_issue(
     issue_id: int,
-    issue_service: IssueService = Depends(get_issue_service),
+    issue_service: AsyncService[IssueService] = Depends(get_issue_service),
     current_user: str = Depends(verify_token)
 ):
     """Продлить выдачу (требует аутентификации)"""
     try:
-        return issue_service.renew_issue(issue_id)
+        return await issue_service.renew_issue(issue_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -1,9 +1,10 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, update
 from datetime import date, datetime, timedelta
 from typing import List, Optional
 from models import Book, Author, BookSubject, BookCover, Customer, Issue
 from schemas import BookCreate, AuthorCreate, CustomerCreate, IssueCreate
+from repositories import IssueRepository
 
 # Book CRUD operations
 def get_books(db: Session, skip: int = 0, limit: int = 50):
@@ -13,11 +14,8 @@ def get_book(db: Session, book_key: int):
     return db.query(Book).filter(Book.key == book_key).first()
 
 def create_book(db: Session, payload: BookCreate) -> Book:
-    # Determine next key if not provided (for simplicity use max+1)
-    max_key = db.query(func.max(Book.key)).scalar() or 0
-    new_key = max_key + 1
+    # Key is assigned by the database (autoincrement)
     db_book = Book(
-        key=new_key,
         title=payload.title,
         subtitle=payload.subtitle,
         first_publish_date=payload.first_publish_date,
@@ -50,6 +48,7 @@ def update_book(db: Session, book_key: int, payload: BookCreate) -> Optional[Boo
     db_book.subtitle = payload.subtitle
     db_book.first_publish_date = payload.first_publish_date
     db_book.description = payload.description
+    db_book.version = Book.version + 1
 
     # Replace authors
     if payload.authors_keys is not None:
@@ -138,12 +137,8 @@ def search_customers(db: Session, customer_id: Optional[int] = None, name: Optio
     return query.all()
 
 def create_customer(db: Session, customer: CustomerCreate):
-    # Generate customer ID starting from C1000
-    last_customer = db.query(Customer).order_by(Customer.id.desc()).first()
-    new_id = 1000 if not last_customer else last_customer.id + 1
-    
+    # Customer IDs are assigned by the database (autoincrement from 1000)
     db_customer = Customer(
-        id=new_id,
         name=customer.name,
         address=customer.address,
         zip_code=customer.zip_code,
@@ -161,6 +156,7 @@ def update_customer(db: Session, customer_id: int, customer: CustomerCreate):
     if db_customer:
         for key, value in customer.dict().items():
             setattr(db_customer, key, value)
+        db_customer.version = Customer.version + 1
         db.commit()
         db.refresh(db_customer)
     return db_customer
@@ -198,41 +194,18 @@ def get_overdue_issues(db: Session):
     ).order_by(Issue.return_until.asc()).all()
 
 def create_issue(db: Session, issue: IssueCreate):
-    # Check if customer has more than 5 active issues
-    active_issues = get_current_issues_by_customer(db, issue.customer_id)
-    if len(active_issues) >= 5:
-        raise ValueError("Customer has reached the maximum limit of 5 active issues")
-    
-    # Check if book is available
-    book_issues = db.query(Issue).filter(
-        and_(
-            Issue.book_key == issue.book_key,
-            Issue.return_date.is_(None)
-        )
-    ).first()
-    
-    if book_issues:
-        raise ValueError("Book is already checked out")
-    
-    today = date.today()
-    return_date = today + timedelta(days=21)
-    
-    db_issue = Issue(
-        book_key=issue.book_key,
-        customer_id=issue.customer_id,
-        date_of_issue=today,
-        return_until=return_date,
-        renewed=False
-    )
-    db.add(db_issue)
-    db.commit()
-    db.refresh(db_issue)
-    return db_issue
+    # Limit and availability are checked atomically by the repository
+    return IssueRepository(db).create_issue(issue.book_key, issue.customer_id)
 
 def return_book(db: Session, issue_id: int):
     db_issue = db.query(Issue).filter(Issue.id == issue_id).first()
     if db_issue:
         db_issue.return_date = date.today()
+        db.execute(
+            update(Book)
+            .where(and_(Book.key == db_issue.book_key, Book.current_issue_id == db_issue.id))
+            .values(current_issue_id=None, version=Book.version + 1)
+        )
         db.commit()
         db.refresh(db_issue)
     return db_issue
@@ -252,11 +225,6 @@ def renew_issue(db: Session, issue_id: int):
     return db_issue
 
 def is_book_available(db: Session, book_key: int):
-    active_issue = db.query(Issue).filter(
-        and_(
-            Issue.book_key == book_key,
-            Issue.return_date.is_(None)
-        )
-    ).first()
-    return active_issue is None
+    current_issue_id = db.query(Book.current_issue_id).filter(Book.key == book_key).scalar()
+    return current_issue_id is None
 
@@ -1,11 +1,193 @@
-from sqlalchemy import create_engine, MetaData
+import threading
+import time
+from sqlalchemy import create_engine, event, MetaData
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from config import DATABASE_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from config import (
+    DATABASE_URL, ASYNC_DATABASE_URL,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_POOL_WARMUP,
+    SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE_KB, SQLITE_BUSY_TIMEOUT_MS
+)
 
-engine = create_engine(DATABASE_URL)
+# Асинхронные драйверы для синхронных URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+asyncmy",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Получить URL асинхронного драйвера для синхронного URL базы данных"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+class PoolStatistics:
+    """Статистика пула: выдачи соединений и время ожидания свободного соединения"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+    
+    def record_checkout(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+    
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+    
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+            }
+
+
+class _TimedPoolMixin:
+    """Примесь к пулу, измеряющая ожидание при выдаче соединения"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statistics = PoolStatistics()
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.statistics.record_timeout()
+            raise
+        self.statistics.record_checkout(time.perf_counter() - started)
+        return connection
+    
+    def _do_return_conn(self, record):
+        self.statistics.record_checkin()
+        super()._do_return_conn(record)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool со статистикой ожидания"""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool со статистикой ожидания"""
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Параметры create_engine для URL: пул из config.py"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # База в памяти живет в одном соединении - пул не настраивается
+        return {}
+    
+    options = {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+    if parsed.get_backend_name() != "sqlite":
+        options["pool_recycle"] = DB_POOL_RECYCLE
+        options["pool_pre_ping"] = DB_POOL_PRE_PING
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Настроить новое соединение SQLite (WAL, synchronous, mmap, кэш, busy_timeout)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+        # Отрицательное значение cache_size задается в килобайтах
+        cursor.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}")
+    finally:
+        cursor.close()
+
+
+def configure_engine(sync_engine: Engine) -> Engine:
+    """Подключить профиль SQLite к движку"""
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", apply_sqlite_pragmas)
+    return sync_engine
+
+
+def get_pool_statistics() -> dict:
+    """Статистика пулов синхронного и асинхронного движков"""
+    result = {}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        stats = {"status": pool.status()}
+        if isinstance(pool, _TimedPoolMixin):
+            stats.update(pool.statistics.snapshot())
+            stats.update({"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()})
+        result[name] = stats
+    return result
+
+
+def warm_up_pool(sync_engine: Engine, connections: int = DB_POOL_WARMUP) -> None:
+    """Открыть соединения пула заранее: подключение и PRAGMA не достаются первым запросам"""
+    opened = []
+    try:
+        for _ in range(min(connections, DB_POOL_SIZE)):
+            connection = sync_engine.connect()
+            connection.exec_driver_sql("SELECT 1")
+            opened.append(connection)
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+async def warm_up_async_pool(connections: int = DB_POOL_WARMUP) -> None:
+    """warm_up_pool для асинхронного движка"""
+    opened = []
+    try:
+        for _ in range(min(connections, DB_POOL_SIZE)):
+            connection = await async_engine.connect()
+            opened.append(connection)
+            await connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in opened:
+            await connection.close()
+
+
+async def dispose_engines() -> None:
+    """Закрыть соединения всех пулов (остановка приложения)"""
+    await async_engine.dispose()
+    engine.dispose()
+
+
+engine = configure_engine(create_engine(DATABASE_URL, **engine_options(DATABASE_URL)))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Асинхронный путь для FastAPI: запросы к БД не блокируют event loop
+_async_url = ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+async_engine = create_async_engine(_async_url, **engine_options(_async_url, is_async=True))
+configure_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -15,3 +197,7 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
@@ -1,5 +1,5 @@
 # DTO package
-from .base import BaseDTO, PaginationDTO, SearchDTO
+from .base import BaseDTO, PaginationDTO, SearchDTO, CursorPageDTO
 from .book_dto import (
     BookBaseDTO, BookCreateDTO, BookUpdateDTO, BookResponseDTO,
     BookSearchDTO, BookListResponseDTO,
@@ -9,10 +9,13 @@ from .book_dto import (
 )
 from .customer_dto import (
     CustomerBaseDTO, CustomerCreateDTO, CustomerUpdateDTO, CustomerResponseDTO,
-    CustomerSearchDTO, CustomerListResponseDTO
+    CustomerSearchDTO, CustomerLookupDTO, CustomerListResponseDTO
 )
 from .issue_dto import (
     IssueBaseDTO, IssueCreateDTO, IssueResponseDTO,
+    IssueBookDTO, IssueBookDetailDTO, IssueCustomerDTO,
+    IssueBatchCreateDTO, IssueBatchItemDTO, IssueBatchResponseDTO,
+    IssueBatchReturnDTO, IssueBatchReturnItemDTO, IssueBatchReturnResponseDTO,
     IssueWithBookDTO, IssueWithCustomerDTO,
     IssueReturnDTO, IssueRenewDTO,
     IssueRenewResponseDTO, IssueReturnResponseDTO
@@ -23,7 +26,7 @@ from .auth_dto import (
 
 __all__ = [
     # Base
-    "BaseDTO", "PaginationDTO", "SearchDTO",
+    "BaseDTO", "PaginationDTO", "SearchDTO", "CursorPageDTO",
     
     # Book DTOs
     "BookBaseDTO", "BookCreateDTO", "BookUpdateDTO", "BookResponseDTO",
@@ -34,10 +37,13 @@ __all__ = [
     
     # Customer DTOs
     "CustomerBaseDTO", "CustomerCreateDTO", "CustomerUpdateDTO", "CustomerResponseDTO",
-    "CustomerSearchDTO", "CustomerListResponseDTO",
+    "CustomerSearchDTO", "CustomerLookupDTO", "CustomerListResponseDTO",
     
     # Issue DTOs
     "IssueBaseDTO", "IssueCreateDTO", "IssueResponseDTO",
+    "IssueBookDTO", "IssueBookDetailDTO", "IssueCustomerDTO",
+    "IssueBatchCreateDTO", "IssueBatchItemDTO", "IssueBatchResponseDTO",
+    "IssueBatchReturnDTO", "IssueBatchReturnItemDTO", "IssueBatchReturnResponseDTO",
     "IssueWithBookDTO", "IssueWithCustomerDTO",
     "IssueReturnDTO", "IssueRenewDTO",
     "IssueRenewResponseDTO", "IssueReturnResponseDTO",
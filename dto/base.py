@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Generic, List, Optional, TypeVar
 from datetime import date, datetime
 
 
@@ -21,7 +21,14 @@ class SearchDTO(BaseModel):
     """Базовый DTO для поиска"""
     skip: int = 0
     limit: int = 50
+    cursor: Optional[str] = None  # Курсор keyset-пагинации (вместо skip)
 
 
+ItemT = TypeVar("ItemT")
 
 
+class CursorPageDTO(BaseModel, Generic[ItemT]):
+    """DTO страницы keyset-пагинации"""
+    items: List[ItemT]
+    next_cursor: Optional[str] = None
+
@@ -30,22 +30,28 @@ class BookResponseDTO(BookBaseDTO):
     subjects: List["BookSubjectResponseDTO"] = Field(default_factory=list)
     covers: List["BookCoverResponseDTO"] = Field(default_factory=list)
     is_available: bool = True
+    version: int = 1  # Версия строки (основа ETag)
 
 
 class BookSearchDTO(SearchDTO):
     """DTO для поиска книг"""
+    q: Optional[str] = None  # Полнотекстовый поиск по всем полям
     title: Optional[str] = None
     author: Optional[str] = None
     subject: Optional[str] = None
+    sort: Optional[str] = None  # relevance, key или title
+    available: Optional[bool] = None  # Только доступные (True) или только выданные (False)
 
 
 class BookListResponseDTO(BaseModel):
     """DTO для списка книг с пагинацией"""
     items: List[BookResponseDTO]
-    total: int
-    page: int
+    # При keyset-пагинации (cursor) общее количество и номер страницы не считаются
+    total: Optional[int] = None
+    page: Optional[int] = None
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 # Author DTOs
@@ -104,6 +110,7 @@ class BookSubjectResponseDTO(BookSubjectBaseDTO):
 
 # Update forward references
 BookResponseDTO.model_rebuild()
+BookListResponseDTO.model_rebuild()
 
 
 
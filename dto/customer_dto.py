@@ -26,6 +26,7 @@ class CustomerUpdateDTO(CustomerBaseDTO):
 class CustomerResponseDTO(CustomerBaseDTO):
     """DTO для ответа с клиентом"""
     id: int
+    version: int = 1  # Версия строки (основа ETag)
     issues: List[dict] = []  # Используем dict вместо IssueResponseDTO для избежания циклических импортов
 
 
@@ -35,6 +36,14 @@ class CustomerSearchDTO(SearchDTO):
     name: Optional[str] = None
 
 
+class CustomerLookupDTO(SearchDTO):
+    """DTO для поиска клиента по началу имени, email или телефону"""
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    limit: int = 20
+
+
 class CustomerListResponseDTO(BaseModel):
     """DTO для списка клиентов"""
     items: List[CustomerResponseDTO]
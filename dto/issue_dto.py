@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 from .base import BaseDTO
 
 
@@ -19,19 +19,91 @@ class IssueCreateDTO(BaseModel):
     customer_id: int
 
 
+class IssueBatchCreateDTO(BaseModel):
+    """DTO для выдачи нескольких книг одному клиенту"""
+    customer_id: int
+    book_keys: List[int] = Field(min_length=1, max_length=100)
+
+
+class IssueBatchItemDTO(BaseModel):
+    """Результат выдачи одной книги из пачки"""
+    book_key: int
+    issued: bool
+    issue_id: Optional[int] = None
+    return_until: Optional[date] = None
+    error: Optional[str] = None
+
+
+class IssueBatchResponseDTO(BaseModel):
+    """DTO для ответа при выдаче нескольких книг"""
+    customer_id: int
+    issued: int
+    failed: int
+    items: List[IssueBatchItemDTO]
+
+
+class IssueBatchReturnDTO(BaseModel):
+    """DTO для возврата пачки книг (по id выдач и/или ключам книг)"""
+    issue_ids: List[int] = Field(default_factory=list, max_length=5000)
+    book_keys: List[int] = Field(default_factory=list, max_length=5000)
+    
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        if not self.issue_ids and not self.book_keys:
+            raise ValueError("issue_ids or book_keys must be provided")
+        return self
+
+
+class IssueBatchReturnItemDTO(BaseModel):
+    """Результат возврата одной позиции из пачки"""
+    issue_id: Optional[int] = None
+    book_key: Optional[int] = None
+    customer_id: Optional[int] = None
+    returned: bool
+    return_until: Optional[date] = None
+    is_overdue: bool = False
+    days_overdue: int = 0
+    error: Optional[str] = None
+
+
+class IssueBatchReturnResponseDTO(BaseModel):
+    """DTO для ответа при возврате пачки книг"""
+    returned: int
+    overdue: int
+    failed: int
+    items: List[IssueBatchReturnItemDTO]
+
+
+class IssueBookDTO(BaseModel):
+    """Краткие данные книги в выдаче"""
+    key: int
+    title: str
+
+
+class IssueBookDetailDTO(IssueBookDTO):
+    """Данные книги в карточке выдачи"""
+    subtitle: Optional[str] = None
+
+
+class IssueCustomerDTO(BaseModel):
+    """Краткие данные клиента в выдаче"""
+    id: int
+    name: str
+
+
 class IssueResponseDTO(IssueBaseDTO):
     """DTO для ответа с выдачей"""
     id: int
     return_date: Optional[date] = None
     created_at: datetime
-    book: dict  # Используем dict вместо BookResponseDTO для избежания циклических импортов
-    customer: dict  # Используем dict вместо CustomerResponseDTO для избежания циклических импортов
+    book: IssueBookDetailDTO
+    customer: IssueCustomerDTO
 
 
 class IssueWithBookDTO(BaseModel):
     """DTO для выдачи с информацией о книге"""
     id: int
-    book: dict  # Book info
+    book: IssueBookDTO
     date_of_issue: date
     return_until: date
     return_date: Optional[date] = None
@@ -43,7 +115,7 @@ class IssueWithBookDTO(BaseModel):
 class IssueWithCustomerDTO(BaseModel):
     """DTO для выдачи с информацией о клиенте"""
     id: int
-    customer: dict  # Customer info
+    customer: IssueCustomerDTO
     date_of_issue: date
     return_until: date
     return_date: Optional[date] = None
@@ -69,7 +141,3 @@ class IssueRenewResponseDTO(BaseModel):
 class IssueReturnResponseDTO(BaseModel):
     """DTO для ответа при возврате книги"""
     message: str
-
-
-# Forward references больше не нужны, так как используем dict
-
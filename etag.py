@@ -0,0 +1,34 @@
+"""
+Условные GET-запросы: сильные ETag и ответ 304 по If-None-Match.
+
+ETag строится из ключей и версий строк (books.version, customers.version),
+поэтому проверить его можно легким запросом версий, без загрузки связей
+и сборки DTO.
+"""
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    """Сильный ETag из частей представления"""
+    payload = json.dumps(parts, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha1(payload.encode()).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Совпадает ли ETag с одним из значений If-None-Match"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Для If-None-Match допускается слабое сравнение: префикс W/ не учитывается
+    candidates = (value.strip() for value in header.split(","))
+    return any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    """Ответ 304 без тела"""
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Импорт каталога из дампов Open Library (https://openlibrary.org/developers/dumps)
+
+    python import_openlibrary.py ol_dump_authors_latest.txt.gz ol_dump_works_latest.txt.gz
+
+Файлы читаются потоково (.txt, .txt.gz, .jsonl); из дампа берутся работы
+(books, темы, обложки, авторы книг) и авторы. Ключи Open Library
+хранятся отдельно (/works/OL45883W -> books.ol_key 45883), ключи книг и
+авторов назначает база. Повторный импорт обновляет книги и авторов по
+ol_key (индексы при этом не откладываются); книги и авторы, созданные в
+библиотеке, не затрагиваются. Авторов передавайте первыми: связь с еще
+не загруженным автором держится в памяти до его записи.
+
+Схема базы должна быть создана: python init_db.py
+"""
+import argparse
+import sys
+import time
+from database import SessionLocal
+from services import CatalogImportService
+
+
+class ProgressReporter:
+    """Строка прогресса не чаще раза в секунду"""
+    
+    def __init__(self):
+        self.started = self.last = time.perf_counter()
+    
+    def __call__(self, stats) -> None:
+        now = time.perf_counter()
+        if now - self.last < 1:
+            return
+        self.last = now
+        elapsed = now - self.started
+        print(f"  {stats['records']:>10} records {stats['works']:>10} works {stats['authors']:>10} authors "
+              f"{stats['rows'] / elapsed:>9.0f} rows/s", flush=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="дампы по порядку (авторы, затем работы)")
+    parser.add_argument("--batch-size", type=int, default=2000, help="записей в одной транзакции")
+    parser.add_argument("--keep-indexes", action="store_true", help="не откладывать построение индексов")
+    parser.add_argument("--skip-search-index", action="store_true", help="не обновлять полнотекстовый индекс")
+    args = parser.parse_args()
+    if not 1 <= args.batch_size <= 10000:
+        parser.error("--batch-size must be between 1 and 10000")
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        stats = CatalogImportService(db, batch_size=args.batch_size).import_files(
+            args.files,
+            defer_indexes=not args.keep_indexes,
+            update_search=not args.skip_search_index,
+            progress=ProgressReporter()
+        )
+    except (OSError, ValueError) as e:
+        print(f"❌ Import failed: {e}")
+        return 1
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ Imported {stats['works']} works and {stats['authors']} authors "
+          f"({stats['subjects']} subjects, {stats['covers']} covers, {stats['book_authors']} author links)")
+    print(f"   {stats['records']} records read, {stats['skipped_other']} of other types, "
+          f"{stats['skipped_invalid']} invalid, {stats['skipped_links']} author links to unknown authors")
+    print(f"   load {stats['load_seconds']:.1f} s ({stats['rows'] / max(stats['load_seconds'], 1e-9):.0f} rows/s), "
+          f"deferred indexes {stats['index_seconds']:.1f} s, search index rebuild {stats['search_index_seconds']:.1f} s, "
+          f"total {elapsed:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,23 +5,43 @@ This script creates the database tables and can be run independently
 """
 import sys
 import os
+from alembic import command
+from alembic.config import Config
 from sqlalchemy import create_engine
 from sqlalchemy.exc import OperationalError
-from models import Base
-from config import DATABASE_URL
+from sqlalchemy.orm import Session
+from repositories import BookSearchIndex, IssueRepository
+from services import StaffService
+from config import DATABASE_URL, ADMIN_USERNAME, ADMIN_PASSWORD
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+def migrate():
+    """Применить миграции alembic до последней ревизии"""
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "migrations"))
+    command.upgrade(config, "head")
 
 def create_database():
     """Create database tables"""
     try:
         print("🔄 Creating database tables...")
         
-        # Create engine
-        engine = create_engine(DATABASE_URL)
-        
-        # Create all tables
-        Base.metadata.create_all(bind=engine)
+        # Создать или обновить схему миграциями (старые базы догоняются до head)
+        migrate()
         
         print("✅ Database tables created successfully!")
+        
+        engine = create_engine(DATABASE_URL)
+        
+        # Заполнить индекс выдач и полнотекстовый индекс для уже существующих данных
+        with Session(engine) as db:
+            IssueRepository(db).sync_active_loans()
+            indexed = BookSearchIndex(db).rebuild()
+            admin_created = StaffService(db).ensure_user(ADMIN_USERNAME, ADMIN_PASSWORD)
+        print(f"✅ Full-text index rebuilt ({indexed} books)")
+        if admin_created:
+            print(f"✅ Staff user '{ADMIN_USERNAME}' created")
         return True
         
     except OperationalError as e:
@@ -1,38 +1,63 @@
+import time
+
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine
-from models import Base
-from controllers import auth_router, book_router, customer_router, issue_router
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="Bookmaster3000 API", version="1.0.0")
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],  # React dev server
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth_router)
-app.include_router(book_router)
-app.include_router(customer_router)
-app.include_router(issue_router)
-
-@app.get("/")
-async def root():
-    """Корневой endpoint"""
-    return {"message": "Bookmaster3000 API", "version": "1.0.0"}
-
-@app.get("/health")
-async def health_check():
-    """Проверка здоровья API"""
-    return {"status": "healthy"}
+from starlette.concurrency import run_in_threadpool
+from database import engine, warm_up_pool, warm_up_async_pool, dispose_engines
+from controllers import auth_router, book_router, customer_router, issue_router, health_router
+from startup import startup_timings, FirstRequestTimer
+
+# Схема базы создается и обновляется миграциями (python init_db.py / alembic upgrade head),
+# а не при импорте: запуск воркера не читает схему базы.
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Запуск: прогрев пулов соединений; остановка: закрытие соединений"""
+    with startup_timings.measure("pool_warmup"):
+        await run_in_threadpool(warm_up_pool, engine)
+        await warm_up_async_pool()
+    startup_timings.mark_ready()
+    yield
+    await dispose_engines()
+
+
+def create_app() -> FastAPI:
+    """Собрать приложение (без обращений к базе)"""
+    app = FastAPI(title="Bookmaster3000 API", version="1.0.0", lifespan=lifespan)
+    
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000"],  # React dev server
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],  # Курсор keyset-пагинации и версия ответа
+    )
+    app.add_middleware(FirstRequestTimer)
+    
+    # Include routers
+    app.include_router(auth_router)
+    app.include_router(book_router)
+    app.include_router(customer_router)
+    app.include_router(issue_router)
+    app.include_router(health_router)
+    
+    @app.get("/")
+    async def root():
+        """Корневой endpoint"""
+        return {"message": "Bookmaster3000 API", "version": "1.0.0"}
+    
+    return app
+
+
+with startup_timings.measure("create_app"):
+    app = create_app()
+startup_timings.record("import", time.perf_counter() - _import_started)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Учетные записи сотрудников Bookmaster3000 (пульты выдачи)
+
+    python manage_staff.py list
+    python manage_staff.py add desk-1        # пароль запрашивается
+    python manage_staff.py passwd desk-1
+    python manage_staff.py disable desk-1
+    python manage_staff.py enable desk-1
+
+Запущенный сервер увидит изменения не позже чем через STAFF_CACHE_TTL секунд.
+"""
+import argparse
+import getpass
+import sys
+from database import SessionLocal
+from services import StaffService
+
+
+def read_password() -> str:
+    """Запросить пароль дважды"""
+    password = getpass.getpass("Password: ")
+    if not password:
+        raise ValueError("Password must not be empty")
+    if getpass.getpass("Repeat password: ") != password:
+        raise ValueError("Passwords do not match")
+    return password
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["list", "add", "passwd", "disable", "enable"])
+    parser.add_argument("username", nargs="?")
+    args = parser.parse_args()
+    if args.command != "list" and not args.username:
+        parser.error(f"{args.command} requires a username")
+
+    db = SessionLocal()
+    try:
+        service = StaffService(db)
+        if args.command == "list":
+            for user in service.list_users():
+                print(f"{user.username:32} {'active' if user.is_active else 'disabled'}")
+        elif args.command == "add":
+            service.create_user(args.username, read_password())
+        elif args.command == "passwd":
+            service.set_password(args.username, read_password())
+        else:
+            service.set_active(args.username, args.command == "enable")
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Вспомогательные функции для миграций.
+
+Базы, созданные до появления миграций, создавались через
+Base.metadata.create_all и могут уже содержать часть объектов,
+поэтому миграции проверяют наличие таблиц, колонок и индексов.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+def has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def has_column(table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def has_index(table: str, index: str) -> bool:
+    return index in {i["name"] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def create_index(name: str, table: str, columns: list, **kwargs) -> None:
+    if not has_index(table, name):
+        op.create_index(name, table, columns, **kwargs)
+
+
+def drop_index(name: str, table: str) -> None:
+    if has_index(table, name):
+        op.drop_index(name, table_name=table)
+
+
+def dialect_name() -> str:
+    return op.get_bind().dialect.name
+
+
+def has_autoincrement(table: str) -> bool:
+    """Таблица SQLite объявлена с AUTOINCREMENT.
+    
+    Отражение схемы этот признак не читает: batch_alter_table с
+    recreate для таких таблиц должен передавать
+    table_kwargs={"sqlite_autoincrement": True}.
+    """
+    sql = op.get_bind().execute(
+        sa.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table}
+    ).scalar()
+    return "AUTOINCREMENT" in (sql or "").upper()
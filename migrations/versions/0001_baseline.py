@@ -0,0 +1,106 @@
+"""Исходная схема (до появления миграций)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema_helpers import has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Существующие базы (bookmaster3000.db) уже содержат эти таблицы
+    if has_table("books"):
+        return
+    
+    op.create_table(
+        "books",
+        sa.Column("key", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("subtitle", sa.String(255)),
+        sa.Column("first_publish_date", sa.Date()),
+        sa.Column("description", sa.Text()),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index("ix_books_key", "books", ["key"])
+    
+    op.create_table(
+        "authors",
+        sa.Column("key", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("biography", sa.Text()),
+        sa.Column("birth_date", sa.Date()),
+        sa.Column("death_date", sa.Date()),
+        sa.Column("wikipedia", sa.String(500)),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index("ix_authors_key", "authors", ["key"])
+    
+    op.create_table(
+        "customers",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("address", sa.String(500)),
+        sa.Column("zip_code", sa.String(20)),
+        sa.Column("city", sa.String(100)),
+        sa.Column("phone", sa.String(50)),
+        sa.Column("email", sa.String(255)),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_customers_id", "customers", ["id"])
+    
+    op.create_table(
+        "book_authors",
+        sa.Column("book_key", sa.Integer(), sa.ForeignKey("books.key"), nullable=False),
+        sa.Column("author_key", sa.Integer(), sa.ForeignKey("authors.key"), nullable=False),
+        sa.PrimaryKeyConstraint("book_key", "author_key"),
+    )
+    
+    op.create_table(
+        "book_covers",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("cover_file", sa.String(255), nullable=False),
+        sa.Column("book_key", sa.Integer(), sa.ForeignKey("books.key")),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_book_covers_id", "book_covers", ["id"])
+    
+    op.create_table(
+        "book_subjects",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("subject", sa.String(255), nullable=False),
+        sa.Column("book_key", sa.Integer(), sa.ForeignKey("books.key")),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_book_subjects_id", "book_subjects", ["id"])
+    
+    op.create_table(
+        "issues",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("book_key", sa.Integer(), sa.ForeignKey("books.key")),
+        sa.Column("customer_id", sa.Integer(), sa.ForeignKey("customers.id")),
+        sa.Column("date_of_issue", sa.Date(), nullable=False),
+        sa.Column("return_until", sa.Date(), nullable=False),
+        sa.Column("return_date", sa.Date()),
+        sa.Column("renewed", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_issues_id", "issues", ["id"])
+
+
+def downgrade() -> None:
+    for table in ("issues", "book_subjects", "book_covers", "book_authors", "customers", "authors", "books"):
+        op.drop_table(table)
@@ -0,0 +1,88 @@
+"""Полнотекстовый индекс книг, books.current_issue_id, индекс по названию
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema_helpers import create_index, dialect_name, drop_index, has_column
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = dialect_name()
+    
+    create_index("ix_books_title", "books", ["title"])
+    
+    # Текущая выдача книги (NULL - книга доступна)
+    if not has_column("books", "current_issue_id"):
+        # В SQLite batch-режим пересоздает таблицу, чтобы добавить внешний ключ
+        with op.batch_alter_table("books") as batch:
+            batch.add_column(sa.Column("current_issue_id", sa.Integer()))
+            batch.create_foreign_key("fk_books_current_issue_id", "issues", ["current_issue_id"], ["id"])
+    create_index("ix_books_current_issue_id", "books", ["current_issue_id"])
+    books = sa.table("books", sa.column("key"), sa.column("current_issue_id"))
+    issues = sa.table("issues", sa.column("id"), sa.column("book_key"), sa.column("return_date"))
+    open_issue = sa.select(sa.func.max(issues.c.id)).where(
+        issues.c.book_key == books.c.key,
+        issues.c.return_date.is_(None)
+    ).scalar_subquery()
+    op.execute(books.update().values(current_issue_id=open_issue))
+    
+    # Полнотекстовый индекс
+    if dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+            "title, subtitle, description, authors, subjects, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute("DELETE FROM books_fts")
+        op.execute(
+            "INSERT INTO books_fts (rowid, title, subtitle, description, authors, subjects) "
+            "SELECT b.\"key\", b.title, b.subtitle, b.description, "
+            "(SELECT group_concat(a.name, ' ') FROM book_authors ba "
+            " JOIN authors a ON a.\"key\" = ba.author_key WHERE ba.book_key = b.\"key\"), "
+            "(SELECT group_concat(s.subject, ' ') FROM book_subjects s WHERE s.book_key = b.\"key\") "
+            "FROM books b"
+        )
+    elif dialect == "mysql":
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS books_fts ("
+            "book_key INTEGER NOT NULL PRIMARY KEY, "
+            "title VARCHAR(255), subtitle VARCHAR(255), description TEXT, "
+            "authors TEXT, subjects TEXT, "
+            "FULLTEXT INDEX ft_books_fts_all (title, subtitle, description, authors, subjects), "
+            "FULLTEXT INDEX ft_books_fts_title (title), "
+            "FULLTEXT INDEX ft_books_fts_authors (authors), "
+            "FULLTEXT INDEX ft_books_fts_subjects (subjects)"
+            ") ENGINE=InnoDB"
+        )
+        op.execute("DELETE FROM books_fts")
+        op.execute(
+            "INSERT INTO books_fts (book_key, title, subtitle, description, authors, subjects) "
+            "SELECT b.`key`, b.title, b.subtitle, b.description, "
+            "(SELECT GROUP_CONCAT(a.name SEPARATOR ' ') FROM book_authors ba "
+            " JOIN authors a ON a.`key` = ba.author_key WHERE ba.book_key = b.`key`), "
+            "(SELECT GROUP_CONCAT(s.subject SEPARATOR ' ') FROM book_subjects s WHERE s.book_key = b.`key`) "
+            "FROM books b"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS books_fts")
+    drop_index("ix_books_current_issue_id", "books")
+    with op.batch_alter_table("books") as batch:
+        batch.drop_constraint("fk_books_current_issue_id", type_="foreignkey")
+        batch.drop_column("current_issue_id")
+    drop_index("ix_books_title", "books")
@@ -0,0 +1,43 @@
+"""Индексы для частых запросов выдач, тем, обложек и клиентов
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema_helpers import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    # Текущие выдачи и история клиента
+    ("ix_issues_customer_return", "issues", ["customer_id", "return_date", "return_until"]),
+    # История выдачи книги
+    ("ix_issues_book_issued", "issues", ["book_key", "date_of_issue"]),
+    # Просроченные выдачи
+    ("ix_issues_open_due", "issues", ["return_date", "return_until"]),
+    ("ix_book_subjects_book_key", "book_subjects", ["book_key"]),
+    ("ix_book_covers_book_key", "book_covers", ["book_key"]),
+    ("ix_book_authors_author_key", "book_authors", ["author_key"]),
+    ("ix_customers_name", "customers", ["name"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        drop_index(name, table)
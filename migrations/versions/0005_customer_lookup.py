@@ -0,0 +1,52 @@
+"""Нормализованное имя клиента, индексы для поиска клиентов
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema_helpers import create_index, drop_index, has_column
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def normalize_name(name: str) -> str:
+    # Копия models.normalize_name: миграция не должна зависеть от моделей
+    return " ".join(name.split()).casefold()
+
+
+def upgrade() -> None:
+    if not has_column("customers", "name_normalized"):
+        op.add_column("customers", sa.Column("name_normalized", sa.String(255)))
+    
+    # casefold не выражается в SQL одинаково для всех СУБД - заполняем из Python
+    customers = sa.table("customers", sa.column("id"), sa.column("name"), sa.column("name_normalized"))
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(customers.c.id, customers.c.name)).fetchall()
+    if rows:
+        bind.execute(
+            customers.update().where(customers.c.id == sa.bindparam("customer_id")),
+            [{"customer_id": id, "name_normalized": normalize_name(name)} for id, name in rows]
+        )
+    
+    create_index("ix_customers_name_normalized", "customers", ["name_normalized"])
+    create_index("ix_customers_email", "customers", ["email"])
+    create_index("ix_customers_phone", "customers", ["phone"])
+
+
+def downgrade() -> None:
+    drop_index("ix_customers_phone", "customers")
+    drop_index("ix_customers_email", "customers")
+    drop_index("ix_customers_name_normalized", "customers")
+    with op.batch_alter_table("customers") as batch:
+        batch.drop_column("name_normalized")
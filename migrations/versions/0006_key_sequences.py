@@ -0,0 +1,35 @@
+"""Счетчики ключей (hi/lo) для номеров клиентов
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema_helpers import has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Строка счетчика создается при первом резервировании блока
+    if not has_table("key_sequences"):
+        op.create_table(
+            "key_sequences",
+            sa.Column("name", sa.String(64), nullable=False),
+            sa.Column("next_value", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("name"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("key_sequences")
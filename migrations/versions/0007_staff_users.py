@@ -0,0 +1,40 @@
+"""Учетные записи сотрудников с хэшами паролей
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema_helpers import create_index, has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Администратор из config.py создается init_db.py (хэш считается приложением)
+    if not has_table("staff_users"):
+        op.create_table(
+            "staff_users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("username", sa.String(64), nullable=False),
+            sa.Column("password_hash", sa.String(255), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=False, server_default="1"),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    create_index("ix_staff_users_id", "staff_users", ["id"])
+    create_index("ix_staff_users_username", "staff_users", ["username"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("staff_users")
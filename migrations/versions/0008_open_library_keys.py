@@ -0,0 +1,39 @@
+"""Ключи Open Library отдельно от ключей книг и авторов
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema_helpers import create_index, drop_index, has_autoincrement, has_column
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("books", "authors")
+
+
+def upgrade() -> None:
+    # Строки, загруженные прежним импортом, не отличить от созданных в
+    # библиотеке: ol_key остается NULL, повторный импорт добавит их заново
+    for table in TABLES:
+        if not has_column(table, "ol_key"):
+            op.add_column(table, sa.Column("ol_key", sa.Integer()))
+        create_index(f"ix_{table}_ol_key", table, ["ol_key"], unique=True)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        drop_index(f"ix_{table}_ol_key", table)
+        # Пересборка SQLite не читает AUTOINCREMENT из схемы - передаем явно
+        with op.batch_alter_table(table, table_kwargs={"sqlite_autoincrement": has_autoincrement(table)}) as batch:
+            batch.drop_column("ol_key")
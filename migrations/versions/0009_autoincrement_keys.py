@@ -0,0 +1,58 @@
+"""Ключи книг и клиентов без повторного использования, номера клиентов с 1000
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema_helpers import dialect_name, has_autoincrement, has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("books", "customers")
+
+
+def upgrade() -> None:
+    # Счетчики блоков ключей (hi/lo, ревизия 0006) больше не используются
+    if has_table("key_sequences"):
+        op.drop_table("key_sequences")
+    
+    if dialect_name() == "sqlite":
+        # INTEGER PRIMARY KEY без AUTOINCREMENT повторно выдает ключ удаленной последней строки
+        for table in TABLES:
+            if not has_autoincrement(table):
+                with op.batch_alter_table(table, recreate="always", table_kwargs={"sqlite_autoincrement": True}):
+                    pass
+        # Следующий номер клиента - не меньше 1000
+        op.execute(
+            "INSERT INTO sqlite_sequence (name, seq) SELECT 'customers', 999 "
+            "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'customers')"
+        )
+        op.execute("UPDATE sqlite_sequence SET seq = 999 WHERE name = 'customers' AND seq < 999")
+    elif dialect_name() == "mysql":
+        # MySQL не опускает счетчик ниже MAX(id) + 1
+        op.execute("ALTER TABLE customers AUTO_INCREMENT = 1000")
+
+
+def downgrade() -> None:
+    if dialect_name() == "sqlite":
+        for table in TABLES:
+            with op.batch_alter_table(table, recreate="always"):
+                pass
+    if not has_table("key_sequences"):
+        op.create_table(
+            "key_sequences",
+            sa.Column("name", sa.String(64), nullable=False),
+            sa.Column("next_value", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("name"),
+        )
@@ -1,37 +1,59 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date, Text, ForeignKey, Boolean, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Date, Text, ForeignKey, Boolean, Table, Index, DDL, event
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from database import Base
 
+
+def normalize_name(name: str) -> str:
+    """Имя для поиска: без регистра и лишних пробелов"""
+    return " ".join(name.split()).casefold()
+
+
 # Association table for many-to-many relationship between books and authors
 book_authors = Table(
     'book_authors',
     Base.metadata,
     Column('book_key', Integer, ForeignKey('books.key'), primary_key=True),
-    Column('author_key', Integer, ForeignKey('authors.key'), primary_key=True)
+    Column('author_key', Integer, ForeignKey('authors.key'), primary_key=True),
+    # Обратный поиск: книги автора
+    Index('ix_book_authors_author_key', 'author_key')
 )
 
 class Book(Base):
     __tablename__ = "books"
+    # SQLite: ключ удаленной книги не выдается снова (ETag "ключ + версия" остается однозначным)
+    __table_args__ = {"sqlite_autoincrement": True}
     
     key = Column(Integer, primary_key=True, index=True)
-    title = Column(String(255), nullable=False)
+    title = Column(String(255), nullable=False, index=True)
     subtitle = Column(String(255))
     first_publish_date = Column(Date)
     description = Column(Text)
+    # Текущая (не возвращенная) выдача; NULL - книга доступна.
+    # Поддерживается IssueRepository.create_issue / return_book.
+    current_issue_id = Column(
+        Integer,
+        ForeignKey("issues.id", use_alter=True, name="fk_books_current_issue_id"),
+        index=True
+    )
+    # Версия строки для ETag: растет при изменении книги, выдаче и возврате
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Номер работы Open Library (/works/OL45883W -> 45883) у импортированных книг,
+    # NULL у созданных в библиотеке; ключ книги назначает база
+    ol_key = Column(Integer, unique=True, index=True)
     
     # Relationships
     authors = relationship("Author", secondary=book_authors, back_populates="books")
     covers = relationship("BookCover", back_populates="book")
     subjects = relationship("BookSubject", back_populates="book")
-    issues = relationship("Issue", back_populates="book")
+    issues = relationship("Issue", back_populates="book", foreign_keys="Issue.book_key")
 
 class BookCover(Base):
     __tablename__ = "book_covers"
     
     id = Column(Integer, primary_key=True, index=True)
     cover_file = Column(String(255), nullable=False)
-    book_key = Column(Integer, ForeignKey("books.key"))
+    book_key = Column(Integer, ForeignKey("books.key"), index=True)
     
     # Relationship
     book = relationship("Book", back_populates="covers")
@@ -41,7 +63,7 @@ class BookSubject(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     subject = Column(String(255), nullable=False)
-    book_key = Column(Integer, ForeignKey("books.key"))
+    book_key = Column(Integer, ForeignKey("books.key"), index=True)
     
     # Relationship
     book = relationship("Book", back_populates="subjects")
@@ -55,26 +77,57 @@ class Author(Base):
     birth_date = Column(Date)
     death_date = Column(Date)
     wikipedia = Column(String(500))
+    # Номер автора Open Library (/authors/OL1A -> 1) у импортированных авторов
+    ol_key = Column(Integer, unique=True, index=True)
     
     # Relationships
     books = relationship("Book", secondary=book_authors, back_populates="authors")
 
 class Customer(Base):
     __tablename__ = "customers"
+    # Номера клиентов выдает база, начиная с 1000 (для SQLite - см. событие ниже)
+    __table_args__ = {"sqlite_autoincrement": True, "mysql_auto_increment": "1000"}
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), nullable=False)
+    name = Column(String(255), nullable=False, index=True)
+    # normalize_name(name) - поиск по началу имени диапазоном по индексу
+    name_normalized = Column(String(255), index=True)
     address = Column(String(500))
     zip_code = Column(String(20))
     city = Column(String(100))
-    phone = Column(String(50))
-    email = Column(String(255))
+    phone = Column(String(50), index=True)
+    email = Column(String(255), index=True)
+    # Версия строки для ETag: растет при изменении клиента
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relationships
     issues = relationship("Issue", back_populates="customer")
+    
+    @validates("name")
+    def _set_name_normalized(self, key, name):
+        self.name_normalized = normalize_name(name) if name is not None else None
+        return name
+
+class StaffUser(Base):
+    # Учетные записи сотрудников (пульты выдачи); пароль хранится хэшем bcrypt
+    __tablename__ = "staff_users"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    username = Column(String(64), nullable=False, unique=True, index=True)
+    password_hash = Column(String(255), nullable=False)
+    is_active = Column(Boolean, nullable=False, default=True, server_default="1")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class Issue(Base):
     __tablename__ = "issues"
+    __table_args__ = (
+        # Текущие выдачи клиента (return_date IS NULL, сортировка по return_until) и его история
+        Index("ix_issues_customer_return", "customer_id", "return_date", "return_until"),
+        # История выдачи книги
+        Index("ix_issues_book_issued", "book_key", "date_of_issue"),
+        # Просроченные выдачи: return_date IS NULL AND return_until < today
+        Index("ix_issues_open_due", "return_date", "return_until"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     book_key = Column(Integer, ForeignKey("books.key"))
@@ -86,6 +139,37 @@ class Issue(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    book = relationship("Book", back_populates="issues")
+    book = relationship("Book", back_populates="issues", foreign_keys=[book_key])
     customer = relationship("Customer", back_populates="issues")
 
+# SQLite: счетчик AUTOINCREMENT клиентов начинается так, чтобы первый номер был 1000
+event.listen(Customer.__table__, "after_create", DDL(
+    "INSERT INTO sqlite_sequence (name, seq) VALUES ('customers', 999)"
+).execute_if(dialect="sqlite"))
+
+# Полнотекстовый индекс книг: название, подзаголовок, описание, авторы и темы.
+# В SQLite это виртуальная таблица FTS5 (rowid = books.key),
+# в MySQL - обычная таблица с FULLTEXT индексами.
+# Таблица поддерживается BookSearchIndex (repositories/book_search_index.py).
+
+event.listen(Base.metadata, "after_create", DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+    "title, subtitle, description, authors, subjects, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+).execute_if(dialect="sqlite"))
+
+event.listen(Base.metadata, "after_create", DDL(
+    "CREATE TABLE IF NOT EXISTS books_fts ("
+    "book_key INTEGER NOT NULL PRIMARY KEY, "
+    "title VARCHAR(255), subtitle VARCHAR(255), description TEXT, "
+    "authors TEXT, subjects TEXT, "
+    "FULLTEXT INDEX ft_books_fts_all (title, subtitle, description, authors, subjects), "
+    "FULLTEXT INDEX ft_books_fts_title (title), "
+    "FULLTEXT INDEX ft_books_fts_authors (authors), "
+    "FULLTEXT INDEX ft_books_fts_subjects (subjects)"
+    ") ENGINE=InnoDB"
+).execute_if(dialect="mysql"))
+
+event.listen(Base.metadata, "before_drop", DDL(
+    "DROP TABLE IF EXISTS books_fts"
+).execute_if(dialect=("sqlite", "mysql")))
@@ -1,14 +1,27 @@
 # Repositories package
 from .base_repository import BaseRepository
+from .async_base_repository import AsyncBaseRepository
 from .book_repository import BookRepository
+from .book_search_index import BookSearchIndex
 from .author_repository import AuthorRepository
 from .customer_repository import CustomerRepository
-from .issue_repository import IssueRepository
+from .issue_repository import IssueRepository, CheckoutConflictError
+from .async_issue_repository import AsyncIssueRepository
+from .staff_user_repository import StaffUserRepository
+from .async_staff_user_repository import AsyncStaffUserRepository
+from .catalog_bulk_repository import CatalogBulkRepository
 
 __all__ = [
     "BaseRepository",
+    "AsyncBaseRepository",
     "BookRepository",
+    "BookSearchIndex",
     "AuthorRepository", 
     "CustomerRepository",
-    "IssueRepository"
+    "IssueRepository",
+    "AsyncIssueRepository",
+    "StaffUserRepository",
+    "AsyncStaffUserRepository",
+    "CatalogBulkRepository",
+    "CheckoutConflictError"
 ]
@@ -0,0 +1,60 @@
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import TypeVar, Generic, Type, Optional, List, Any
+
+T = TypeVar('T')
+
+
+class AsyncBaseRepository(Generic[T]):
+    """Базовый асинхронный репозиторий (AsyncSession)"""
+    
+    def __init__(self, db: AsyncSession, model: Type[T]):
+        self.db = db
+        self.model = model
+    
+    async def get_by_id(self, id: Any) -> Optional[T]:
+        """Получить объект по ID"""
+        return await self.db.scalar(select(self.model).where(self.model.id == id))
+    
+    async def get_by_key(self, key: Any) -> Optional[T]:
+        """Получить объект по ключу (для моделей с key полем)"""
+        return await self.db.scalar(select(self.model).where(self.model.key == key))
+    
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[T]:
+        """Получить все объекты с пагинацией"""
+        result = await self.db.scalars(select(self.model).offset(skip).limit(limit))
+        return list(result)
+    
+    async def count(self) -> int:
+        """Получить общее количество объектов"""
+        return await self.db.scalar(select(func.count()).select_from(self.model))
+    
+    async def create(self, obj_in: dict) -> T:
+        """Создать новый объект"""
+        db_obj = self.model(**obj_in)
+        self.db.add(db_obj)
+        await self.db.commit()
+        await self.db.refresh(db_obj)
+        return db_obj
+    
+    async def update(self, db_obj: T, obj_in: dict) -> T:
+        """Обновить существующий объект"""
+        for field, value in obj_in.items():
+            setattr(db_obj, field, value)
+        if hasattr(self.model, "version"):
+            db_obj.version = self.model.version + 1
+        await self.db.commit()
+        await self.db.refresh(db_obj)
+        return db_obj
+    
+    async def delete(self, id: Any) -> bool:
+        """Удалить объект по ID"""
+        result = await self.db.execute(delete(self.model).where(self.model.id == id))
+        await self.db.commit()
+        return result.rowcount > 0
+    
+    async def delete_by_key(self, key: Any) -> bool:
+        """Удалить объект по ключу"""
+        result = await self.db.execute(delete(self.model).where(self.model.key == key))
+        await self.db.commit()
+        return result.rowcount > 0
@@ -0,0 +1,20 @@
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, Sequence
+from models import Issue
+from .async_base_repository import AsyncBaseRepository
+from .issue_repository import IssueRepository
+
+
+class AsyncIssueRepository(AsyncBaseRepository[Issue]):
+    """Асинхронный репозиторий выдач (потоковые выборки)"""
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Issue)
+    
+    async def stream_overdue_report(self, batch_size: int = 500) -> AsyncIterator[Sequence[Row]]:
+        """Отчет о просрочках пачками по batch_size строк (серверный курсор)"""
+        statement = IssueRepository.overdue_report_statement().execution_options(yield_per=batch_size)
+        result = await self.db.stream(statement)
+        async for partition in result.partitions():
+            yield partition
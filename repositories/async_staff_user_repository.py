@@ -0,0 +1,31 @@
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from models import StaffUser
+from .async_base_repository import AsyncBaseRepository
+
+
+class AsyncStaffUserRepository(AsyncBaseRepository[StaffUser]):
+    """Асинхронный репозиторий учетных записей (вход в систему)"""
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, StaffUser)
+    
+    async def get_credentials(self, username: str) -> Optional[Row]:
+        """(id, username, password_hash, is_active) по имени.
+        
+        Возвращается строка, а не объект ORM: ее можно хранить в кэше между сессиями.
+        """
+        result = await self.db.execute(
+            select(StaffUser.id, StaffUser.username, StaffUser.password_hash, StaffUser.is_active)
+            .where(StaffUser.username == username)
+        )
+        return result.first()
+    
+    async def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        """Заменить хэш пароля (пересчет устаревшего хэша при входе)"""
+        await self.db.execute(
+            update(StaffUser).where(StaffUser.id == user_id).values(password_hash=password_hash)
+        )
+        await self.db.commit()
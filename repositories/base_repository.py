@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
-from typing import TypeVar, Generic, Type, Optional, List, Any
+from sqlalchemy.orm import Query
+from typing import TypeVar, Generic, Type, Optional, List, Any, Dict, Tuple
 from sqlalchemy import func
+from .pagination import SortSpec, decode_cursor, encode_cursor, keyset_filter, order_clauses
 
 T = TypeVar('T')
 
@@ -8,17 +10,64 @@ T = TypeVar('T')
 class BaseRepository(Generic[T]):
     """Базовый репозиторий для работы с базой данных"""
     
+    # Именованные профили загрузки связей: имя -> опции selectinload/joinedload
+    load_profiles: Dict[str, Tuple] = {}
+    
     def __init__(self, db: Session, model: Type[T]):
         self.db = db
         self.model = model
     
-    def get_by_id(self, id: Any) -> Optional[T]:
+    def _apply_profile(self, query: Query, profile: Optional[str] = None) -> Query:
+        """Применить профиль загрузки к запросу"""
+        if profile is None:
+            return query
+        if profile not in self.load_profiles:
+            raise ValueError(f"Unknown loading profile: {profile}")
+        return query.options(*self.load_profiles[profile])
+    
+    def _paginate(self, query: Query, sort: SortSpec, cursor: Optional[str] = None,
+                  limit: int = 100, tag: str = "") -> Tuple[List[T], Optional[str]]:
+        """Keyset-пагинация: страница объектов и курсор следующей страницы.
+        
+        Если запрос выбирает несколько колонок (with_entities), элементы
+        страницы - кортежи этих колонок.
+        """
+        if cursor:
+            query = query.filter(keyset_filter(sort, decode_cursor(cursor, tag, len(sort))))
+        
+        # Значения ключей сортировки выбираются вместе со строками для следующего курсора
+        width = len(query.column_descriptions)
+        sort_columns = [expr.label(f"sort_{i}") for i, (expr, _) in enumerate(sort)]
+        rows = query.add_columns(*sort_columns).order_by(*order_clauses(sort)).limit(limit + 1).all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(tuple(rows[limit - 1])[width:], tag)
+        return [self._row_item(row, width) for row in rows[:limit]], next_cursor
+    
+    def _row_item(self, row: Any, width: int) -> Any:
+        """Элемент страницы: объект или кортеж выбранных колонок (без ключей сортировки)"""
+        return row[0] if width == 1 else tuple(row[:width])
+    
+    def get_by_id(self, id: Any, profile: Optional[str] = None) -> Optional[T]:
         """Получить объект по ID"""
-        return self.db.query(self.model).filter(self.model.id == id).first()
+        query = self._apply_profile(self.db.query(self.model), profile)
+        return query.filter(self.model.id == id).first()
+    
+    def get_version(self, id: Any) -> Optional[int]:
+        """Получить только версию строки по первичному ключу (для ETag)"""
+        primary_key = self.model.__mapper__.primary_key[0]
+        return self.db.query(self.model.version).filter(primary_key == id).scalar()
+    
+    def _bump_version(self, db_obj: T) -> None:
+        """Увеличить версию строки при сохранении (если у модели есть version)"""
+        if hasattr(self.model, "version"):
+            db_obj.version = self.model.version + 1
     
-    def get_by_key(self, key: Any) -> Optional[T]:
+    def get_by_key(self, key: Any, profile: Optional[str] = None) -> Optional[T]:
         """Получить объект по ключу (для моделей с key полем)"""
-        return self.db.query(self.model).filter(self.model.key == key).first()
+        query = self._apply_profile(self.db.query(self.model), profile)
+        return query.filter(self.model.key == key).first()
     
     def get_all(self, skip: int = 0, limit: int = 100) -> List[T]:
         """Получить все объекты с пагинацией"""
@@ -40,6 +89,7 @@ class BaseRepository(Generic[T]):
         """Обновить существующий объект"""
         for field, value in obj_in.items():
             setattr(db_obj, field, value)
+        self._bump_version(db_obj)
         self.db.commit()
         self.db.refresh(db_obj)
         return db_obj
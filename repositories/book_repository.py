@@ -1,57 +1,170 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from typing import List, Optional
-from models import Book, Author, BookSubject, BookCover, Issue
+from sqlalchemy.orm import Session, Query, selectinload
+from sqlalchemy import or_, func
+from typing import List, Optional, Tuple
+from models import Book, Author, BookSubject, BookCover
 from .base_repository import BaseRepository
+from .book_search_index import BookSearchIndex
+from .pagination import SortSpec, encode_cursor, order_clauses
+
+
+# Допустимые варианты сортировки каталога
+BOOK_SORT_OPTIONS = ("relevance", "key", "title")
 
 
 class BookRepository(BaseRepository[Book]):
     """Репозиторий для работы с книгами"""
     
+    load_profiles = {
+        # Всё, что нужно для BookResponseDTO
+        "detail": (
+            selectinload(Book.authors),
+            selectinload(Book.subjects),
+            selectinload(Book.covers),
+        ),
+    }
+    
     def __init__(self, db: Session):
         super().__init__(db, Book)
+        self.search_index = BookSearchIndex(db)
     
     def search_books(self, title: Optional[str] = None, author: Optional[str] = None, 
-                    subject: Optional[str] = None, skip: int = 0, limit: int = 50) -> List[Book]:
-        """Поиск книг по различным критериям"""
-        query = self.db.query(Book)
-        
-        if title:
-            query = query.filter(Book.title.contains(title))
-        
-        if author:
-            query = query.join(Book.authors).filter(Author.name.contains(author))
-        
-        if subject:
-            query = query.join(Book.subjects).filter(BookSubject.subject.contains(subject))
-        
-        return query.offset(skip).limit(limit).all()
+                    subject: Optional[str] = None, skip: int = 0, limit: int = 50,
+                    profile: Optional[str] = None, q: Optional[str] = None,
+                    sort: Optional[str] = None, available: Optional[bool] = None) -> List[Book]:
+        """Поиск книг по различным критериям (результаты упорядочены по релевантности)"""
+        query, sort_spec, sort = self._search_query(q=q, title=title, author=author, subject=subject, sort=sort, available=available)
+        query = self._apply_profile(query, profile)
+        
+        return query.order_by(*order_clauses(sort_spec)).offset(skip).limit(limit).all()
+    
+    def search_books_with_total(self, title: Optional[str] = None, author: Optional[str] = None,
+                                subject: Optional[str] = None, skip: int = 0, limit: int = 50,
+                                profile: Optional[str] = None, q: Optional[str] = None,
+                                sort: Optional[str] = None,
+                                available: Optional[bool] = None,
+                                columns: Optional[tuple] = None) -> Tuple[List[Book], int, Optional[str]]:
+        """Поиск книг вместе с общим количеством совпадений за один запрос.
+        
+        Третий элемент - курсор следующей страницы для перехода на keyset-пагинацию.
+        С columns вместо объектов Book возвращаются кортежи этих колонок.
+        """
+        query, sort_spec, sort = self._search_query(q=q, title=title, author=author, subject=subject, sort=sort,
+                                                    available=available, columns=columns)
+        query = self._apply_profile(query, profile)
+        
+        # Оконный COUNT считает все совпадения до применения LIMIT/OFFSET
+        width = len(query.column_descriptions)
+        sort_columns = [expr.label(f"sort_{i}") for i, (expr, _) in enumerate(sort_spec)]
+        rows = query.add_columns(func.count().over().label("total"), *sort_columns).order_by(
+            *order_clauses(sort_spec)
+        ).offset(skip).limit(limit).all()
+        
+        if rows:
+            total = rows[0].total
+            next_cursor = None
+            if skip + len(rows) < total:
+                next_cursor = encode_cursor(tuple(rows[-1])[width + 1:], self._cursor_tag(sort))
+            return [self._row_item(row, width) for row in rows], total, next_cursor
+        if skip == 0:
+            return [], 0, None
+        
+        # Страница за пределами результатов - количество нужно посчитать отдельно
+        return [], self.get_books_count(title=title, author=author, subject=subject, q=q, available=available), None
+    
+    def search_books_after(self, cursor: Optional[str] = None, title: Optional[str] = None,
+                           author: Optional[str] = None, subject: Optional[str] = None,
+                           limit: int = 50, profile: Optional[str] = None, q: Optional[str] = None,
+                           sort: Optional[str] = None,
+                           available: Optional[bool] = None,
+                           columns: Optional[tuple] = None) -> Tuple[List[Book], Optional[str]]:
+        """Поиск книг с keyset-пагинацией: страница после курсора и курсор следующей"""
+        query, sort_spec, sort = self._search_query(q=q, title=title, author=author, subject=subject, sort=sort,
+                                                    available=available, columns=columns)
+        query = self._apply_profile(query, profile)
+        
+        return self._paginate(query, sort_spec, cursor, limit, tag=self._cursor_tag(sort))
     
     def get_books_count(self, title: Optional[str] = None, author: Optional[str] = None, 
-                       subject: Optional[str] = None) -> int:
+                       subject: Optional[str] = None, q: Optional[str] = None,
+                       available: Optional[bool] = None) -> int:
         """Получить количество книг по критериям поиска"""
-        query = self.db.query(Book)
+        query, _, _ = self._search_query(q=q, title=title, author=author, subject=subject, available=available)
+        
+        return query.count()
+    
+    def _search_query(self, q: Optional[str] = None, title: Optional[str] = None,
+                      author: Optional[str] = None, subject: Optional[str] = None,
+                      sort: Optional[str] = None,
+                      available: Optional[bool] = None,
+                      columns: Optional[tuple] = None) -> Tuple[Query, SortSpec, str]:
+        """Построить запрос поиска книг, порядок сортировки и имя примененной сортировки"""
+        if sort is not None and sort not in BOOK_SORT_OPTIONS:
+            raise ValueError(f"Unknown sort: {sort}")
+        
+        query = self.db.query(*columns) if columns else self.db.query(Book)
+        relevance = None
+        
+        # Доступность хранится в самой книге (current_issue_id) - фильтр без обращения к issues
+        if available is True:
+            query = query.filter(Book.current_issue_id.is_(None))
+        elif available is False:
+            query = query.filter(Book.current_issue_id.isnot(None))
+        
+        if any((q, title, author, subject)):
+            # Полнотекстовый индекс, если СУБД его поддерживает
+            if self.search_index.is_supported:
+                query, relevance = self.search_index.apply_search(
+                    query, q=q, title=title, author=author, subject=subject
+                )
+            else:
+                query = self._apply_like_filters(query, q=q, title=title, author=author, subject=subject)
+        
+        if sort is None:
+            sort = "relevance" if relevance is not None else "key"
+        
+        sort_spec = []
+        if sort == "title":
+            sort_spec.append((Book.title, False))
+        elif sort == "relevance" and relevance is not None:
+            sort_spec.append(relevance)
+        else:
+            sort = "key"
+        # Ключ книги делает порядок однозначным
+        sort_spec.append((Book.key, False))
+        return query, sort_spec, sort
+    
+    def _apply_like_filters(self, query: Query, q: Optional[str] = None, title: Optional[str] = None,
+                            author: Optional[str] = None, subject: Optional[str] = None) -> Query:
+        """Поиск через LIKE для СУБД без полнотекстового индекса"""
+        if q:
+            query = query.filter(or_(
+                Book.title.contains(q),
+                Book.description.contains(q),
+                Book.authors.any(Author.name.contains(q)),
+                Book.subjects.any(BookSubject.subject.contains(q))
+            ))
         
         if title:
             query = query.filter(Book.title.contains(title))
         
+        # EXISTS вместо JOIN, чтобы книга с несколькими авторами/темами не дублировалась
         if author:
-            query = query.join(Book.authors).filter(Author.name.contains(author))
+            query = query.filter(Book.authors.any(Author.name.contains(author)))
         
         if subject:
-            query = query.join(Book.subjects).filter(BookSubject.subject.contains(subject))
+            query = query.filter(Book.subjects.any(BookSubject.subject.contains(subject)))
         
-        return query.count()
+        return query
+    
+    @staticmethod
+    def _cursor_tag(sort: str) -> str:
+        """Метка курсора: курсор действителен только для той же сортировки"""
+        return f"books:{sort}"
     
     def is_book_available(self, book_key: int) -> bool:
         """Проверить доступность книги"""
-        active_issue = self.db.query(Issue).filter(
-            and_(
-                Issue.book_key == book_key,
-                Issue.return_date.is_(None)
-            )
-        ).first()
-        return active_issue is None
+        current_issue_id = self.db.query(Book.current_issue_id).filter(Book.key == book_key).scalar()
+        return current_issue_id is None
     
     def get_authors_by_book(self, book_key: int) -> List[Author]:
         """Получить авторов книги"""
@@ -60,11 +173,7 @@ class BookRepository(BaseRepository[Book]):
     def create_with_relations(self, book_data: dict, authors_keys: List[int] = None, 
                             subjects: List[str] = None) -> Book:
         """Создать книгу с авторами и темами"""
-        # Определить следующий ключ
-        max_key = self.db.query(func.max(Book.key)).scalar() or 0
-        new_key = max_key + 1
-        
-        book_data['key'] = new_key
+        # Ключ назначает база (autoincrement) при flush
         db_book = Book(**book_data)
         self.db.add(db_book)
         self.db.flush()
@@ -81,6 +190,7 @@ class BookRepository(BaseRepository[Book]):
             for subject_text in subjects:
                 self.db.add(BookSubject(subject=subject_text, book_key=db_book.key))
         
+        self.search_index.index_book(db_book)
         self.db.commit()
         self.db.refresh(db_book)
         return db_book
@@ -111,6 +221,8 @@ class BookRepository(BaseRepository[Book]):
             for subject_text in subjects:
                 self.db.add(BookSubject(subject=subject_text, book_key=book_key))
         
+        self._bump_version(db_book)
+        self.search_index.index_book(db_book)
         self.db.commit()
         self.db.refresh(db_book)
         return db_book
@@ -124,6 +236,7 @@ class BookRepository(BaseRepository[Book]):
         # Удалить связанные записи
         self.db.query(BookSubject).filter(BookSubject.book_key == book_key).delete()
         self.db.query(BookCover).filter(BookCover.book_key == book_key).delete()
+        self.search_index.remove_book(book_key)
         
         # Очистить связи many-to-many
         db_book.authors.clear()
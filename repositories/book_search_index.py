@@ -0,0 +1,150 @@
+import re
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import Select, between, column, delete, false, func, insert, literal_column, select, table, text
+from sqlalchemy.dialects.mysql import match as mysql_match
+from typing import Any, Dict, List, Optional, Tuple
+from models import Book, Author, BookSubject, book_authors
+
+
+# Слова запроса: всё остальное (кавычки, операторы FTS) отбрасывается
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_FTS_COLUMNS = ("title", "subtitle", "description", "authors", "subjects")
+
+
+class BookSearchIndex:
+    """Полнотекстовый индекс книг (FTS5 в SQLite, FULLTEXT в MySQL)"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+        # В FTS5 ключ документа - rowid, в MySQL - обычная колонка book_key
+        self.key_name = "rowid" if self.dialect == "sqlite" else "book_key"
+        self.table = table("books_fts", column(self.key_name), *[column(name) for name in _FTS_COLUMNS])
+    
+    @property
+    def is_supported(self) -> bool:
+        """Есть ли полнотекстовый индекс для текущей СУБД"""
+        return self.dialect in ("sqlite", "mysql")
+    
+    @staticmethod
+    def tokenize(text: Optional[str]) -> List[str]:
+        """Разбить строку поиска на слова"""
+        return _TOKEN_RE.findall(text or "")
+    
+    def apply_search(self, query: Query, q: Optional[str] = None, title: Optional[str] = None,
+                     author: Optional[str] = None, subject: Optional[str] = None) -> Tuple[Query, Any]:
+        """Ограничить запрос книг совпадениями в индексе.
+        
+        Возвращает запрос и ключ сортировки по релевантности: (выражение, по убыванию).
+        """
+        # Общий запрос ищется по всем колонкам, фильтры - по своей колонке
+        terms = [(None, token) for token in self.tokenize(q)]
+        for field, value in (("title", title), ("authors", author), ("subjects", subject)):
+            terms.extend((field, token) for token in self.tokenize(value))
+        
+        key_column = self.table.c[self.key_name]
+        query = query.join(self.table, key_column == Book.key)
+        if not terms:
+            return query.filter(false()), (key_column, False)
+        
+        if self.dialect == "sqlite":
+            expression = " AND ".join(
+                f'{field} : "{token}"*' if field else f'"{token}"*' for field, token in terms
+            )
+            query = query.filter(literal_column("books_fts").op("MATCH")(expression))
+            # rank в FTS5 - это bm25: чем меньше, тем релевантнее
+            return query, (literal_column("books_fts.rank"), False)
+        
+        all_columns = [self.table.c[name] for name in _FTS_COLUMNS]
+        relevance = mysql_match(
+            *all_columns, against=" ".join(f"{token}*" for _, token in terms)
+        ).in_boolean_mode()
+        for field, token in terms:
+            columns = [self.table.c[field]] if field else all_columns
+            query = query.filter(mysql_match(*columns, against=f"+{token}*").in_boolean_mode())
+        return query, (relevance, True)
+    
+    def index_book(self, book: Book) -> None:
+        """Обновить документ книги в индексе в рамках текущей транзакции"""
+        if not self.is_supported:
+            return
+        
+        self.db.flush()
+        authors = [name for (name,) in self.db.query(Author.name).join(Author.books).filter(Book.key == book.key)]
+        subjects = [subject for (subject,) in self.db.query(BookSubject.subject).filter(BookSubject.book_key == book.key)]
+        
+        self.remove_book(book.key)
+        self.db.execute(insert(self.table).values(self._document(book, authors, subjects)))
+    
+    def remove_book(self, book_key: int) -> None:
+        """Удалить документ книги из индекса"""
+        if not self.is_supported:
+            return
+        self.db.execute(delete(self.table).where(self.table.c[self.key_name] == book_key))
+    
+    def reindex(self, book_keys: List[int]) -> None:
+        """Пересобрать документы книг book_keys в рамках текущей транзакции"""
+        if not self.is_supported or not book_keys:
+            return
+        self.db.execute(delete(self.table).where(self.table.c[self.key_name].in_(book_keys)))
+        self.db.execute(insert(self.table).from_select(
+            [self.key_name, *_FTS_COLUMNS], self._documents_select(Book.key.in_(book_keys))
+        ))
+    
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """Перестроить индекс по всем книгам, вернуть количество документов.
+        
+        Документы собираются в базе (INSERT ... SELECT с агрегацией авторов
+        и тем) диапазонами ключей по batch_size книг.
+        """
+        if not self.is_supported:
+            return 0
+        
+        self.db.execute(delete(self.table))
+        if self.dialect == "mysql":
+            # По умолчанию GROUP_CONCAT обрезает результат до 1024 байт
+            self.db.execute(text("SET SESSION group_concat_max_len = 1048576"))
+        
+        last_key, total = 0, 0
+        while True:
+            upper = self.db.scalar(
+                select(Book.key).where(Book.key > last_key).order_by(Book.key).offset(batch_size - 1).limit(1)
+            )
+            keys = Book.key > last_key if upper is None else between(Book.key, last_key + 1, upper)
+            result = self.db.execute(insert(self.table).from_select(
+                [self.key_name, *_FTS_COLUMNS], self._documents_select(keys)
+            ))
+            total += result.rowcount
+            if upper is None:
+                break
+            last_key = upper
+        
+        self.db.commit()
+        return total
+    
+    def _documents_select(self, condition) -> Select:
+        """SELECT документов индекса для книг, отобранных condition"""
+        authors = (
+            select(func.coalesce(func.aggregate_strings(Author.name, " "), ""))
+            .select_from(book_authors.join(Author, Author.key == book_authors.c.author_key))
+            .where(book_authors.c.book_key == Book.key)
+            .scalar_subquery()
+        )
+        subjects = (
+            select(func.coalesce(func.aggregate_strings(BookSubject.subject, " "), ""))
+            .where(BookSubject.book_key == Book.key)
+            .scalar_subquery()
+        )
+        return select(Book.key, Book.title, Book.subtitle, Book.description, authors, subjects).where(condition)
+    
+    def _document(self, book: Book, authors: List[str], subjects: List[str]) -> Dict[str, Any]:
+        """Собрать документ индекса для книги"""
+        return {
+            self.key_name: book.key,
+            "title": book.title,
+            "subtitle": book.subtitle,
+            "description": book.description,
+            "authors": " ".join(authors),
+            "subjects": " ".join(subjects),
+        }
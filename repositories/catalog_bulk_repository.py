@@ -0,0 +1,157 @@
+from sqlalchemy import Index, Table, delete, func, insert, select, text, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Iterator, List, Optional
+from models import Author, Book, BookCover, BookSubject, book_authors
+
+
+# Ключей в одном IN (ограничение на число параметров SQLite)
+IN_CHUNK = 5000
+
+
+def _chunked(values: Iterable[int], size: int = IN_CHUNK) -> Iterator[List[int]]:
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class CatalogBulkRepository:
+    """Массовая запись каталога (импорт дампов): executemany и upsert без ORM.
+    
+    Книги и авторы вставляются или обновляются по ключу Open Library
+    (ol_key), свои ключи им назначает база; строки, созданные в
+    библиотеке (ol_key = NULL), импорт не затрагивает. Темы, обложки и
+    связи с авторами пишутся обычной вставкой по назначенным ключам.
+    """
+    
+    tables = [Book.__table__, Author.__table__, book_authors, BookSubject.__table__, BookCover.__table__]
+    book_columns = ["title", "subtitle", "first_publish_date", "description"]
+    author_columns = ["name", "biography", "birth_date", "death_date", "wikipedia"]
+    in_chunk = IN_CHUNK
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+        if self.dialect not in ("sqlite", "mysql"):
+            raise ValueError(f"Bulk import is not supported for {self.dialect}")
+    
+    def count_books(self) -> int:
+        return self.db.scalar(select(func.count()).select_from(Book))
+    
+    def upsert_authors(self, rows: List[dict]) -> Dict[int, int]:
+        """Вставить или обновить авторов по ol_key; вернуть {ol_key: key}"""
+        if not rows:
+            return {}
+        self._upsert(Author.__table__, rows, self.author_columns)
+        return self.author_keys([row["ol_key"] for row in rows])
+    
+    def upsert_books(self, rows: List[dict]) -> Dict[int, int]:
+        """Вставить или обновить книги по ol_key (обновленные получают новую версию); вернуть {ol_key: key}"""
+        if not rows:
+            return {}
+        self._upsert(Book.__table__, rows, self.book_columns, bump_version=True)
+        return self._keys(Book.__table__, [row["ol_key"] for row in rows])
+    
+    def author_keys(self, ol_keys: Iterable[int]) -> Dict[int, int]:
+        """Ключи уже загруженных авторов: {ol_key: key}"""
+        return self._keys(Author.__table__, ol_keys)
+    
+    def write_children(self, book_keys: List[int], links: List[dict], subjects: List[dict],
+                       covers: List[dict], replace: bool = False) -> None:
+        """Записать связи с авторами, темы и обложки в текущей транзакции (фиксирует вызывающий).
+        
+        replace: сначала удалить темы, обложки и связи с авторами книг
+        book_keys (повторный импорт уже загруженных книг).
+        """
+        if replace:
+            for chunk in _chunked(book_keys):
+                for table in (book_authors, BookSubject.__table__, BookCover.__table__):
+                    self.db.execute(delete(table).where(table.c.book_key.in_(chunk)))
+        if links:
+            # Повтор работы в дампе не должен ломать пачку на первичном ключе связи
+            self.db.execute(
+                insert(book_authors).prefix_with("OR IGNORE", dialect="sqlite").prefix_with("IGNORE", dialect="mysql"),
+                links
+            )
+        if subjects:
+            self.db.execute(insert(BookSubject.__table__), subjects)
+        if covers:
+            self.db.execute(insert(BookCover.__table__), covers)
+    
+    def linked_books(self, author_keys: List[int]) -> List[int]:
+        """Ключи книг, связанных с авторами"""
+        book_keys = set()
+        for chunk in _chunked(author_keys):
+            book_keys.update(self.db.scalars(
+                select(book_authors.c.book_key).where(book_authors.c.author_key.in_(chunk))
+            ))
+        return sorted(book_keys)
+    
+    def bump_versions(self, book_keys: Iterable[int]) -> None:
+        """Новая версия (ETag) книг, у которых изменились авторы"""
+        table = Book.__table__
+        for chunk in _chunked(book_keys):
+            self.db.execute(update(table).where(table.c.key.in_(chunk)).values(version=table.c.version + 1))
+    
+    def _keys(self, table: Table, ol_keys: Iterable[int]) -> Dict[int, int]:
+        keys = {}
+        for chunk in _chunked(ol_keys):
+            keys.update(self.db.execute(select(table.c.ol_key, table.c.key).where(table.c.ol_key.in_(chunk))).all())
+        return keys
+    
+    def _upsert(self, table, rows: List[dict], columns: List[str], bump_version: bool = False) -> None:
+        """INSERT ... ON CONFLICT (ol_key) / ON DUPLICATE KEY UPDATE одним executemany"""
+        if self.dialect == "sqlite":
+            statement = sqlite_insert(table)
+            values: Dict = {name: statement.excluded[name] for name in columns}
+        else:
+            statement = mysql_insert(table)
+            values = {name: statement.inserted[name] for name in columns}
+        if bump_version:
+            # Обновленная книга получает новый ETag
+            values["version"] = table.c.version + 1
+        
+        if self.dialect == "sqlite":
+            statement = statement.on_conflict_do_update(index_elements=[table.c.ol_key], set_=values)
+        else:
+            # Ключ в строках не передается: конфликт возможен только по уникальному ol_key
+            statement = statement.on_duplicate_key_update(values)
+        self.db.execute(statement, rows)
+    
+    def deferrable_indexes(self, tables: Optional[List[Table]] = None) -> List[Index]:
+        """Вторичные индексы таблиц (по умолчанию каталога), которые можно построить после загрузки.
+        
+        Уникальные индексы остаются: на них опирается upsert по ol_key.
+        MySQL не дает удалить индекс, на который опирается внешний ключ.
+        """
+        indexes = []
+        for table in tables or self.tables:
+            foreign_columns = {element.parent.name for element in table.foreign_keys}
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.unique or (self.dialect == "mysql" and index.columns.keys()[0] in foreign_columns):
+                    continue
+                indexes.append(index)
+        return indexes
+    
+    def drop_indexes(self, indexes: Iterable[Index]) -> None:
+        """Удалить индексы перед загрузкой"""
+        connection = self.db.connection()
+        for index in indexes:
+            index.drop(connection, checkfirst=True)
+        self.db.commit()
+    
+    def create_indexes(self, indexes: Iterable[Index]) -> None:
+        """Построить индексы после загрузки (один проход по таблице на индекс)"""
+        connection = self.db.connection()
+        for index in indexes:
+            index.create(connection, checkfirst=True)
+        self.db.commit()
+    
+    def analyze(self, tables: Optional[List[Table]] = None) -> None:
+        """Обновить статистику планировщика после загрузки"""
+        if self.dialect == "sqlite":
+            self.db.execute(text("ANALYZE"))
+        else:
+            self.db.execute(text("ANALYZE TABLE " + ", ".join(table.name for table in tables or self.tables)))
+        self.db.commit()
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from models import Customer
+from sqlalchemy import and_, func
+from typing import List, Optional, Tuple
+from models import Customer, normalize_name
 from .base_repository import BaseRepository
 
 
@@ -11,9 +11,14 @@ class CustomerRepository(BaseRepository[Customer]):
     def __init__(self, db: Session):
         super().__init__(db, Customer)
     
-    def search_customers(self, customer_id: Optional[int] = None, name: Optional[str] = None) -> List[Customer]:
-        """Поиск клиентов по ID или имени"""
-        query = self.db.query(Customer)
+    def search_customers(self, customer_id: Optional[int] = None, name: Optional[str] = None,
+                         cursor: Optional[str] = None, limit: int = 100,
+                         columns: Optional[tuple] = None) -> Tuple[List[Customer], Optional[str]]:
+        """Поиск клиентов по ID или имени (keyset-пагинация по ID).
+        
+        С columns вместо объектов Customer возвращаются кортежи этих колонок.
+        """
+        query = self.db.query(*columns) if columns else self.db.query(Customer)
         
         if customer_id:
             query = query.filter(Customer.id == customer_id)
@@ -21,15 +26,49 @@ class CustomerRepository(BaseRepository[Customer]):
         if name:
             query = query.filter(Customer.name.contains(name))
         
-        return query.all()
+        return self._paginate(query, [(Customer.id, False)], cursor, limit, tag="customers")
     
-    def create_customer(self, customer_data: dict) -> Customer:
-        """Создать нового клиента с автоматической генерацией ID"""
-        # Генерировать ID клиента начиная с C1000
-        last_customer = self.db.query(Customer).order_by(Customer.id.desc()).first()
-        new_id = 1000 if not last_customer else last_customer.id + 1
+    def lookup_customers(self, name: Optional[str] = None, email: Optional[str] = None,
+                         phone: Optional[str] = None, skip: int = 0, limit: int = 20,
+                         columns: Optional[tuple] = None) -> Tuple[List[Customer], int]:
+        """Поиск клиентов по началу имени, email или телефону вместе с общим количеством.
+        
+        Имя сравнивается с customers.name_normalized диапазоном по индексу,
+        email и телефон - точным совпадением. Результаты упорядочены по имени.
+        """
+        query = self.db.query(*columns) if columns else self.db.query(Customer)
+        
+        if name and normalize_name(name):
+            query = query.filter(self._prefix_condition(normalize_name(name)))
+        if email:
+            query = query.filter(Customer.email == email.strip())
+        if phone:
+            query = query.filter(Customer.phone == phone.strip())
         
-        customer_data['id'] = new_id
+        # Оконный COUNT считает все совпадения до применения LIMIT/OFFSET
+        width = len(query.column_descriptions)
+        rows = query.add_columns(func.count().over().label("total")).order_by(
+            Customer.name_normalized, Customer.id
+        ).offset(skip).limit(limit).all()
+        
+        if rows:
+            return [self._row_item(row, width) for row in rows], rows[0].total
+        if skip == 0:
+            return [], 0
+        # Страница за пределами результатов - количество нужно посчитать отдельно
+        return [], query.order_by(None).count()
+    
+    @staticmethod
+    def _prefix_condition(prefix: str):
+        """name_normalized начинается с prefix (диапазон вместо LIKE, чтобы работал индекс)"""
+        condition = Customer.name_normalized >= prefix
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            condition = and_(condition, Customer.name_normalized < prefix[:-1] + chr(last + 1))
+        return condition
+    
+    def create_customer(self, customer_data: dict) -> Customer:
+        """Создать нового клиента; ID назначает база (autoincrement, начиная с 1000)"""
         return self.create(customer_data)
     
     def get_customers_with_pagination(self, skip: int = 0, limit: int = 100) -> List[Customer]:
@@ -1,96 +1,376 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, func, update, insert, select, literal, case, delete, exists
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import OperationalError
 from datetime import date, timedelta
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple, TypeVar
 from models import Issue, Book, Customer
+from config import MAX_ACTIVE_LOANS
 from .base_repository import BaseRepository
 
+T = TypeVar("T")
+
+# Результат выдачи одной книги из пачки: (book_key, id выдачи или None, ошибка или None)
+CheckoutResult = Tuple[int, Optional[int], Optional[str]]
+# Результат возврата одной позиции из пачки: (строка закрытой выдачи или None, ошибка или None)
+ReturnResult = Tuple[Optional[Row], Optional[str]]
+
+# Сортировки списка просрочек; id в конце делает порядок однозначным для курсора
+OVERDUE_SORT_OPTIONS = {
+    "due": [(Issue.return_until, False), (Issue.id, False)],
+    "issued": [(Issue.date_of_issue, False), (Issue.id, False)],
+    "customer": [(Issue.customer_id, False), (Issue.return_until, False), (Issue.id, False)],
+}
+
+
+class CheckoutConflictError(ValueError):
+    """Книгу уже выдали в параллельной транзакции или база занята"""
+
+
+def is_retryable_error(error: OperationalError) -> bool:
+    """Ошибка блокировки, после которой транзакцию можно повторить"""
+    message = str(error.orig).lower()
+    # SQLite: database is locked; MySQL: 1205 lock wait timeout, 1213 deadlock
+    return "locked" in message or "deadlock" in message or "lock wait timeout" in message
+
 
 class IssueRepository(BaseRepository[Issue]):
     """Репозиторий для работы с выдачами книг"""
     
+    max_active_issues = MAX_ACTIVE_LOANS
+    loan_period_days = 21
+    checkout_attempts = 3
+    
+    load_profiles = {
+        # Выдача вместе с книгой (IssueWithBookDTO)
+        "with_book": (joinedload(Issue.book),),
+        # Выдача вместе с клиентом (IssueWithCustomerDTO)
+        "with_customer": (joinedload(Issue.customer),),
+        # Выдача с книгой и клиентом (IssueResponseDTO)
+        "full": (joinedload(Issue.book), joinedload(Issue.customer)),
+    }
+    
     def __init__(self, db: Session):
         super().__init__(db, Issue)
     
-    def get_current_issues_by_customer(self, customer_id: int) -> List[Issue]:
+    def get_current_issues_by_customer(self, customer_id: int, profile: Optional[str] = None) -> List[Issue]:
         """Получить текущие выдачи клиента"""
-        return self.db.query(Issue).filter(
+        query = self._apply_profile(self.db.query(Issue), profile)
+        return query.filter(
             and_(
                 Issue.customer_id == customer_id,
                 Issue.return_date.is_(None)
             )
         ).order_by(Issue.return_until.asc()).all()
     
-    def get_issue_history_by_customer(self, customer_id: int) -> List[Issue]:
-        """Получить историю выдач клиента"""
-        return self.db.query(Issue).filter(
+    def get_issue_history_by_customer(self, customer_id: int, profile: Optional[str] = None,
+                                      cursor: Optional[str] = None,
+                                      limit: int = 100) -> Tuple[List[Issue], Optional[str]]:
+        """Получить историю выдач клиента (keyset-пагинация)"""
+        query = self._apply_profile(self.db.query(Issue), profile).filter(
             and_(
                 Issue.customer_id == customer_id,
                 Issue.return_date.isnot(None)
             )
-        ).order_by(Issue.return_date.desc()).all()
+        )
+        sort = [(Issue.return_date, True), (Issue.id, True)]
+        return self._paginate(query, sort, cursor, limit, tag="customer-history")
     
-    def get_book_history(self, book_key: int) -> List[Issue]:
-        """Получить историю выдачи книги"""
-        return self.db.query(Issue).filter(Issue.book_key == book_key).order_by(Issue.date_of_issue.desc()).all()
+    def get_book_history(self, book_key: int, profile: Optional[str] = None,
+                         cursor: Optional[str] = None,
+                         limit: int = 100) -> Tuple[List[Issue], Optional[str]]:
+        """Получить историю выдачи книги (keyset-пагинация)"""
+        query = self._apply_profile(self.db.query(Issue), profile).filter(Issue.book_key == book_key)
+        sort = [(Issue.date_of_issue, True), (Issue.id, True)]
+        return self._paginate(query, sort, cursor, limit, tag="book-history")
     
-    def get_overdue_issues(self) -> List[Issue]:
-        """Получить просроченные выдачи"""
-        today = date.today()
-        return self.db.query(Issue).filter(
-            and_(
-                Issue.return_date.is_(None),
-                Issue.return_until < today
-            )
-        ).order_by(Issue.return_until.asc()).all()
+    def get_overdue_issues(self, profile: Optional[str] = None, sort: str = "due",
+                           cursor: Optional[str] = None,
+                           limit: int = 100) -> Tuple[List[Issue], Optional[str]]:
+        """Получить просроченные выдачи (keyset-пагинация)"""
+        if sort not in OVERDUE_SORT_OPTIONS:
+            raise ValueError(f"Unknown sort: {sort}")
+        query = self._apply_profile(self.db.query(Issue), profile).filter(self._overdue_condition())
+        return self._paginate(query, OVERDUE_SORT_OPTIONS[sort], cursor, limit, tag=f"overdue:{sort}")
+    
+    @staticmethod
+    def overdue_report_statement():
+        """Запрос отчета о просрочках: выдача, книга и клиент одной строкой"""
+        return select(
+            Issue.id.label("issue_id"),
+            Issue.book_key,
+            Book.title,
+            Issue.customer_id,
+            Customer.name.label("customer_name"),
+            Customer.email,
+            Customer.phone,
+            Issue.date_of_issue,
+            Issue.return_until,
+            Issue.renewed
+        ).join(Book, Book.key == Issue.book_key).join(
+            Customer, Customer.id == Issue.customer_id
+        ).where(IssueRepository._overdue_condition()).order_by(Issue.return_until.asc(), Issue.id.asc())
+    
+    @staticmethod
+    def _overdue_condition():
+        """Условие просрочки: книга не возвращена, срок прошел"""
+        return and_(
+            Issue.return_date.is_(None),
+            Issue.return_until < date.today()
+        )
     
     def is_book_available(self, book_key: int) -> bool:
         """Проверить доступность книги"""
-        active_issue = self.db.query(Issue).filter(
-            and_(
-                Issue.book_key == book_key,
-                Issue.return_date.is_(None)
-            )
-        ).first()
-        return active_issue is None
+        current_issue_id = self.db.query(Book.current_issue_id).filter(Book.key == book_key).scalar()
+        return current_issue_id is None
     
     def can_customer_borrow(self, customer_id: int) -> bool:
-        """Проверить, может ли клиент взять книгу (лимит 5 книг)"""
-        active_issues = self.get_current_issues_by_customer(customer_id)
-        return len(active_issues) < 5
+        """Проверить, может ли клиент взять книгу (лимит MAX_ACTIVE_LOANS книг)"""
+        return self._active_issues_count(customer_id).scalar() < self.max_active_issues
     
     def create_issue(self, book_key: int, customer_id: int) -> Issue:
-        """Создать новую выдачу книги"""
-        # Проверить лимит клиента
-        if not self.can_customer_borrow(customer_id):
-            raise ValueError("Customer has reached the maximum limit of 5 active issues")
+        """Создать новую выдачу книги (атомарно, с повтором при блокировке)"""
+        issue_id = self._run_transaction(lambda: self._checkout(book_key, customer_id))
+        return self.get_by_id(issue_id)
+    
+    def create_issues(self, book_keys: List[int], customer_id: int) -> List[CheckoutResult]:
+        """Выдать клиенту несколько книг в одной транзакции"""
+        return self._run_transaction(lambda: self._checkout_many(book_keys, customer_id))
+    
+    def _run_transaction(self, operation: Callable[[], T]) -> T:
+        """Выполнить операцию и commit, повторяя транзакцию при блокировке"""
+        for attempt in range(self.checkout_attempts):
+            try:
+                result = operation()
+                self.db.commit()
+            except OperationalError as e:
+                self.db.rollback()
+                if not is_retryable_error(e):
+                    raise
+                continue
+            except Exception:
+                self.db.rollback()
+                raise
+            return result
+        raise CheckoutConflictError("Database is busy, please retry")
+    
+    def _checkout(self, book_key: int, customer_id: int) -> int:
+        """Вставить выдачу и занять книгу; проверки выполняются самими запросами"""
+        today = date.today()
+        # Выдача вставляется, только если клиент существует и у него меньше max_active_issues открытых
+        result = self.db.execute(
+            insert(Issue).from_select(
+                ["book_key", "customer_id", "date_of_issue", "return_until", "renewed"],
+                select(
+                    literal(book_key),
+                    literal(customer_id),
+                    literal(today),
+                    literal(today + timedelta(days=self.loan_period_days)),
+                    literal(False)
+                ).where(
+                    and_(
+                        exists().where(Customer.id == customer_id),
+                        self._active_issues_count(customer_id).scalar_subquery() < self.max_active_issues
+                    )
+                )
+            )
+        )
+        if result.rowcount == 0:
+            if self.db.query(Customer.id).filter(Customer.id == customer_id).first() is None:
+                raise ValueError("Customer not found")
+            raise ValueError(self._limit_message())
+        issue_id = result.lastrowid
         
-        # Проверить доступность книги
-        if not self.is_book_available(book_key):
-            raise ValueError("Book is already checked out")
+        # Книгу получает только та транзакция, которая первой заняла свободный current_issue_id
+        claimed = self.db.execute(
+            update(Book).where(
+                and_(Book.key == book_key, Book.current_issue_id.is_(None))
+            ).values(current_issue_id=issue_id, version=Book.version + 1)
+        )
+        if claimed.rowcount == 0:
+            self.db.rollback()
+            if self.db.query(Book.key).filter(Book.key == book_key).first() is None:
+                raise ValueError("Book not found")
+            raise CheckoutConflictError("Book is already checked out")
+        return issue_id
+    
+    def _checkout_many(self, book_keys: List[int], customer_id: int) -> List[CheckoutResult]:
+        """Проверить пачку книг набором запросов, вставить выдачи и занять книги"""
+        # Сначала запись: параллельная выдача этому клиенту дождется нашего commit
+        # (SQLite начинает транзакцию и берет блокировку записи только на первом
+        # изменении, FOR UPDATE игнорирует), поэтому число выдач ниже читается под блокировкой
+        if self._lock_customer(customer_id) == 0:
+            raise ValueError("Customer not found")
         
-        today = date.today()
-        return_date = today + timedelta(days=21)
+        current = dict(
+            self.db.query(Book.key, Book.current_issue_id).filter(Book.key.in_(set(book_keys))).all()
+        )
+        remaining = self.max_active_issues - self._active_issues_count(customer_id).scalar()
         
-        issue_data = {
-            'book_key': book_key,
-            'customer_id': customer_id,
-            'date_of_issue': today,
-            'return_until': return_date,
-            'renewed': False
+        errors = {}
+        candidates = []
+        seen = set()
+        for position, book_key in enumerate(book_keys):
+            if book_key in seen:
+                errors[position] = "Duplicate book in batch"
+            elif book_key not in current:
+                errors[position] = "Book not found"
+            elif current[book_key] is not None:
+                errors[position] = "Book is already checked out"
+            elif len(candidates) >= remaining:
+                errors[position] = self._limit_message()
+            else:
+                candidates.append(book_key)
+            seen.add(book_key)
+        
+        today = date.today()
+        issues = {
+            book_key: Issue(
+                book_key=book_key,
+                customer_id=customer_id,
+                date_of_issue=today,
+                return_until=today + timedelta(days=self.loan_period_days),
+                renewed=False
+            )
+            for book_key in candidates
         }
+        if issues:
+            self.db.add_all(issues.values())
+            self.db.flush()
+            issue_ids = {book_key: issue.id for book_key, issue in issues.items()}
+            claimed = self.db.execute(
+                update(Book).where(
+                    and_(Book.key.in_(candidates), Book.current_issue_id.is_(None))
+                ).values(current_issue_id=case(issue_ids, value=Book.key), version=Book.version + 1)
+            )
+            if claimed.rowcount < len(candidates):
+                # Часть книг успели выдать параллельно - их выдачи удаляются
+                owners = dict(self.db.query(Book.key, Book.current_issue_id).filter(Book.key.in_(candidates)).all())
+                lost = [book_key for book_key in candidates if owners[book_key] != issue_ids[book_key]]
+                self.db.execute(delete(Issue).where(Issue.id.in_([issue_ids[key] for key in lost])))
+                for book_key in lost:
+                    del issue_ids[book_key]
+        else:
+            issue_ids = {}
         
-        return self.create(issue_data)
+        results = []
+        for position, book_key in enumerate(book_keys):
+            if position in errors:
+                results.append((book_key, None, errors[position]))
+            elif book_key in issue_ids:
+                results.append((book_key, issue_ids[book_key], None))
+            else:
+                results.append((book_key, None, "Book is already checked out"))
+        return results
+    
+    def _lock_customer(self, customer_id: int) -> int:
+        """Заблокировать строку клиента пустым UPDATE (версия не меняется); 0 - клиента нет"""
+        return self.db.execute(
+            update(Customer).where(Customer.id == customer_id).values(version=Customer.version),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+    
+    def _limit_message(self) -> str:
+        return f"Customer has reached the maximum limit of {self.max_active_issues} active issues"
+    
+    def _active_issues_count(self, customer_id: int):
+        """Запрос количества открытых выдач клиента (покрывается индексом ix_issues_customer_return)"""
+        return self.db.query(func.count(Issue.id)).filter(
+            and_(
+                Issue.customer_id == customer_id,
+                Issue.return_date.is_(None)
+            )
+        )
     
     def return_book(self, issue_id: int) -> Optional[Issue]:
         """Вернуть книгу"""
         issue = self.get_by_id(issue_id)
         if issue:
             issue.return_date = date.today()
+            # Освободить книгу, если она числится за этой выдачей
+            self.db.execute(
+                update(Book).where(
+                    and_(Book.key == issue.book_key, Book.current_issue_id == issue.id)
+                ).values(current_issue_id=None, version=Book.version + 1)
+            )
             self.db.commit()
             self.db.refresh(issue)
         return issue
     
+    def return_issues(self, issue_ids: List[int], book_keys: List[int]) -> List[ReturnResult]:
+        """Вернуть пачку выдач (по id выдачи или ключу книги) в одной транзакции"""
+        return self._run_transaction(lambda: self._return_many(issue_ids, book_keys))
+    
+    def _return_many(self, issue_ids: List[int], book_keys: List[int]) -> List[ReturnResult]:
+        """Найти открытые выдачи пачки, закрыть их и освободить книги"""
+        conditions = []
+        if issue_ids:
+            conditions.append(Issue.id.in_(set(issue_ids)))
+        if book_keys:
+            conditions.append(Issue.book_key.in_(set(book_keys)))
+        if not conditions:
+            return []
+        
+        open_issues = and_(Issue.return_date.is_(None), or_(*conditions))
+        # Сначала пустой UPDATE: блокировка записи (в MySQL - строк выдач) до чтения,
+        # параллельный возврат тех же выдач дождется нашего commit (см. _checkout_many)
+        self.db.execute(
+            update(Issue).where(open_issues).values(return_date=Issue.return_date),
+            execution_options={"synchronize_session": False}
+        )
+        rows = self.db.execute(
+            select(Issue.id, Issue.book_key, Issue.customer_id, Issue.return_until).where(open_issues)
+        ).all()
+        by_id = {row.id: row for row in rows}
+        by_book = {row.book_key: row for row in rows}
+        
+        results = []
+        closed = set()
+        requested = [(by_id, issue_id) for issue_id in issue_ids] + [(by_book, book_key) for book_key in book_keys]
+        for index, key in requested:
+            row = index.get(key)
+            if row is None:
+                results.append((None, "No open issue found"))
+            elif row.id in closed:
+                results.append((None, "Duplicate item in batch"))
+            else:
+                closed.add(row.id)
+                results.append((row, None))
+        
+        if closed:
+            updated = self.db.execute(
+                update(Issue).where(
+                    and_(Issue.id.in_(closed), Issue.return_date.is_(None))
+                ).values(return_date=date.today()),
+                execution_options={"synchronize_session": False}
+            )
+            if updated.rowcount != len(closed):
+                # Результаты пачки построены по прочитанным строкам - они должны совпасть с закрытыми
+                raise CheckoutConflictError("Issues were returned concurrently, please retry")
+            self.db.execute(
+                update(Book).where(Book.current_issue_id.in_(closed)).values(
+                    current_issue_id=None, version=Book.version + 1
+                ),
+                execution_options={"synchronize_session": False}
+            )
+        return results
+    
+    def sync_active_loans(self) -> None:
+        """Пересчитать current_issue_id всех книг по таблице выдач (после загрузки данных)"""
+        open_issue = self.db.query(func.max(Issue.id)).filter(
+            and_(
+                Issue.book_key == Book.key,
+                Issue.return_date.is_(None)
+            )
+        ).scalar_subquery()
+        # Версия растет только у книг, чья доступность действительно изменилась
+        self.db.execute(
+            update(Book).where(Book.current_issue_id.is_distinct_from(open_issue)).values(
+                current_issue_id=open_issue, version=Book.version + 1
+            )
+        )
+        self.db.commit()
+    
     def renew_issue(self, issue_id: int) -> Optional[Issue]:
         """Продлить выдачу книги"""
         issue = self.get_by_id(issue_id)
@@ -108,7 +388,7 @@ class IssueRepository(BaseRepository[Issue]):
     
     def get_issue_with_details(self, issue_id: int) -> Optional[Issue]:
         """Получить выдачу с деталями книги и клиента"""
-        return self.db.query(Issue).filter(Issue.id == issue_id).first()
+        return self.get_by_id(issue_id, profile="full")
 
 
 
@@ -0,0 +1,65 @@
+import base64
+import json
+from datetime import date, datetime
+from sqlalchemy import and_, or_
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+# Порядок сортировки для keyset-пагинации: [(выражение, по убыванию), ...].
+# Последним элементом всегда идет уникальный ключ, чтобы порядок был однозначным.
+SortSpec = List[Tuple[Any, bool]]
+
+
+def _encode_value(value: Any) -> Any:
+    """Сериализовать значение ключа сортировки в JSON-совместимый вид"""
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """Восстановить значение ключа сортировки из курсора"""
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def encode_cursor(values: Sequence[Any], tag: str = "") -> str:
+    """Собрать непрозрачный курсор из значений ключей сортировки последней строки"""
+    payload = json.dumps({"t": tag, "v": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, tag: str = "", size: Optional[int] = None) -> List[Any]:
+    """Разобрать курсор; ValueError, если он поврежден или выдан для другой сортировки"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_decode_value(v) for v in payload["v"]]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+    
+    if payload.get("t") != tag or (size is not None and len(values) != size):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def order_clauses(sort: SortSpec) -> list:
+    """ORDER BY для порядка сортировки"""
+    return [expr.desc() if descending else expr.asc() for expr, descending in sort]
+
+
+def keyset_filter(sort: SortSpec, values: Sequence[Any]):
+    """Условие "строка идет после values" в заданном порядке сортировки"""
+    clauses = []
+    for i, (expr, descending) in enumerate(sort):
+        after = expr < values[i] if descending else expr > values[i]
+        equal_prefix = [sort[j][0] == values[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, after))
+    return or_(*clauses)
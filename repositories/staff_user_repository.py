@@ -0,0 +1,32 @@
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from models import StaffUser
+from .base_repository import BaseRepository
+
+
+class StaffUserRepository(BaseRepository[StaffUser]):
+    """Репозиторий учетных записей сотрудников"""
+    
+    def __init__(self, db: Session):
+        super().__init__(db, StaffUser)
+    
+    def get_by_username(self, username: str) -> Optional[StaffUser]:
+        """Получить учетную запись по имени"""
+        return self.db.query(StaffUser).filter(StaffUser.username == username).first()
+    
+    def get_all_users(self) -> List[StaffUser]:
+        """Все учетные записи по имени"""
+        return self.db.query(StaffUser).order_by(StaffUser.username).all()
+    
+    def create_user(self, username: str, password_hash: str) -> StaffUser:
+        """Создать учетную запись"""
+        if self.get_by_username(username) is not None:
+            raise ValueError(f"Staff user {username} already exists")
+        return self.create({"username": username, "password_hash": password_hash})
+    
+    def update_user(self, username: str, fields: dict) -> StaffUser:
+        """Изменить учетную запись (хэш пароля, активность)"""
+        user = self.get_by_username(username)
+        if user is None:
+            raise ValueError(f"Staff user {username} not found")
+        return self.update(user, fields)
@@ -0,0 +1,28 @@
+"""
+Быстрая отдача DTO: JSON без повторной валидации по response_model.
+
+Если endpoint возвращает модель, FastAPI выгружает ее в dict, заново
+проверяет по response_model и только потом кодирует в JSON. DTO чтения
+уже проверены при сборке в сервисах, поэтому TrustedJSONResponse сразу
+кодирует их сериализатором pydantic-core. response_model в маршруте
+остается для схемы OpenAPI.
+"""
+from typing import Any, Dict, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class TrustedJSONResponse(JSONResponse):
+    """JSON-ответ из готовых DTO (модель, список моделей или dict)"""
+    
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def cursor_page_response(page, headers: Optional[Dict[str, str]] = None) -> TrustedJSONResponse:
+    """Элементы CursorPageDTO в теле, курсор следующей страницы - в заголовке X-Next-Cursor"""
+    headers = dict(headers or {})
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return TrustedJSONResponse(page.items, headers=headers)
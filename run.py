@@ -1,27 +1,23 @@
 #!/usr/bin/env python3
 """
 Run script for Bookmaster3000 backend
+
+Схема базы к запуску должна быть создана: python init_db.py
 """
 import uvicorn
-from main import app
+from config import SERVER_HOST, SERVER_PORT, SERVER_RELOAD, SERVER_WORKERS
 
 if __name__ == "__main__":
     print("Starting Bookmaster3000 Backend Server...")
-    print("API Documentation: http://localhost:8000/docs")
+    print(f"API Documentation: http://localhost:{SERVER_PORT}/docs")
     print("Press Ctrl+C to stop the server")
     
+    # Приложение импортирует сам uvicorn (в каждом воркере / при перезагрузке)
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
+        host=SERVER_HOST,
+        port=SERVER_PORT,
+        reload=SERVER_RELOAD,
+        workers=None if SERVER_RELOAD else SERVER_WORKERS,
         log_level="info"
     )
-
-
-
-
-
-
-
-
@@ -2,6 +2,9 @@ from sqlalchemy.orm import Session
 from datetime import date
 from database import SessionLocal, engine
 from models import Base, Book, Author, BookSubject, BookCover, Customer, Issue
+from repositories import BookSearchIndex, IssueRepository
+from services import StaffService
+from config import ADMIN_USERNAME, ADMIN_PASSWORD
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -178,6 +181,9 @@ def create_sample_data():
                     book.authors.append(author)
         
         db.commit()
+        IssueRepository(db).sync_active_loans()
+        BookSearchIndex(db).rebuild()
+        StaffService(db).ensure_user(ADMIN_USERNAME, ADMIN_PASSWORD)
         print("Sample data created successfully!")
         
     except Exception as e:
@@ -1,12 +1,20 @@
 # Services package
+from .async_service import AsyncService
 from .book_service import BookService
 from .customer_service import CustomerService
 from .issue_service import IssueService
 from .auth_service import AuthService
+from .staff_service import StaffService
+from .catalog_import_service import CatalogImportService
+from .overdue_export_service import OverdueExportService
 
 __all__ = [
+    "AsyncService",
     "BookService",
     "CustomerService",
     "IssueService",
-    "AuthService"
+    "AuthService",
+    "StaffService",
+    "CatalogImportService",
+    "OverdueExportService"
 ]
@@ -0,0 +1,34 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Generic, Type, TypeVar
+
+S = TypeVar("S")
+
+
+class AsyncService(Generic[S]):
+    """Асинхронная версия сервиса.
+    
+    Каждый вызов метода выполняется через AsyncSession.run_sync: бизнес-логика
+    сервиса остается синхронной, а ввод-вывод идет через асинхронный драйвер
+    и не блокирует event loop.
+    """
+    
+    def __init__(self, db: AsyncSession, service_class: Type[S]):
+        self.db = db
+        self.service_class = service_class
+    
+    async def run(self, func: Callable[[S], Any]) -> Any:
+        """Выполнить функцию над экземпляром сервиса в синхронном контексте сессии"""
+        def call(sync_db: Session) -> Any:
+            return func(self.service_class(sync_db))
+        
+        return await self.db.run_sync(call)
+    
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        # Проверить, что метод существует, до первого вызова
+        getattr(self.service_class, name)
+        
+        async def method(*args, **kwargs):
+            return await self.run(lambda service: getattr(service, name)(*args, **kwargs))
+        
+        return method
@@ -1,21 +1,30 @@
 from datetime import timedelta
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from auth import authenticate_user, create_access_token, verify_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from auth import (
+    create_access_token, decode_token, verify_token, verify_password_async,
+    staff_cache, staff_tag, ACCESS_TOKEN_EXPIRE_MINUTES
+)
+from repositories import AsyncStaffUserRepository
 from dto import UserLoginDTO, TokenDTO, UserResponseDTO
 
 
 class AuthService:
     """Сервис для аутентификации"""
     
-    def login(self, user_credentials: UserLoginDTO) -> Optional[TokenDTO]:
+    def __init__(self, db: AsyncSession):
+        self.staff_repo = AsyncStaffUserRepository(db)
+    
+    async def login(self, user_credentials: UserLoginDTO) -> Optional[TokenDTO]:
         """Войти в систему"""
-        user = authenticate_user(user_credentials.username, user_credentials.password)
-        if not user:
+        username = await self.authenticate(user_credentials.username, user_credentials.password)
+        if username is None:
             return None
         
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": user["username"]}, 
+            data={"sub": username}, 
             expires_delta=access_token_expires
         )
         
@@ -24,9 +33,27 @@ class AuthService:
             token_type="bearer"
         )
     
+    async def authenticate(self, username: str, password: str) -> Optional[str]:
+        """Проверить пароль сотрудника; имя пользователя или None"""
+        user = await staff_cache.get_or_load_async(
+            ("staff", username),
+            lambda: self.staff_repo.get_credentials(username),
+            lambda user: [staff_tag(username)]
+        )
+        # Отключенная учетная запись проверяется так же долго, как отсутствующая
+        password_hash = user.password_hash if user is not None and user.is_active else None
+        valid, new_hash = await verify_password_async(password, password_hash)
+        if not valid:
+            return None
+        
+        if new_hash is not None:
+            await self.staff_repo.update_password_hash(user.id, new_hash)
+            staff_cache.invalidate(staff_tag(username))
+        return user.username
+    
     def get_current_user(self, token: str) -> Optional[UserResponseDTO]:
         """Получить текущего пользователя по токену"""
-        username = verify_token(token)
+        username = self.verify_token(token)
         if not username:
             return None
         
@@ -34,8 +61,7 @@ class AuthService:
     
     def verify_token(self, token: str) -> Optional[str]:
         """Проверить токен"""
-        return verify_token(token)
-
-
-
-
+        try:
+            return decode_token(token)
+        except JWTError:
+            return None
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from repositories import BookRepository, AuthorRepository
+from cache import catalog_cache, invalidate_books, book_tag, BOOK_LIST_TAG, AVAILABILITY_TAG
+from etag import make_etag
 from dto import BookCreateDTO, BookUpdateDTO, BookResponseDTO, BookSearchDTO, BookListResponseDTO
 from models import Book
 
@@ -13,27 +15,83 @@ class BookService:
         self.book_repo = BookRepository(db)
         self.author_repo = AuthorRepository(db)
     
+    # Поля поиска, которые сравниваются без учета регистра и пробелов по краям
+    _normalized_search_fields = ("q", "title", "author", "subject")
+    
     def get_books(self, search_params: BookSearchDTO) -> BookListResponseDTO:
-        """Получить список книг с поиском и пагинацией"""
-        books = self.book_repo.search_books(
+        """Получить список книг с поиском и пагинацией (через кэш каталога)"""
+        def tags(page: BookListResponseDTO) -> List[str]:
+            result = [BOOK_LIST_TAG] + [book_tag(book.key) for book in page.items]
+            if search_params.available is not None:
+                result.append(AVAILABILITY_TAG)
+            return result
+        
+        return catalog_cache.get_or_load(
+            self._books_cache_key(search_params), lambda: self._load_books(search_params), tags
+        )
+    
+    def _books_cache_key(self, search_params: BookSearchDTO) -> tuple:
+        """Ключ кэша списка: нормализованные параметры поиска"""
+        params = search_params.model_dump()
+        for field in self._normalized_search_fields:
+            value = params.get(field)
+            params[field] = (value.strip().casefold() or None) if isinstance(value, str) else value
+        return ("books",) + tuple(sorted(params.items()))
+    
+    def get_books_etag(self, search_params: BookSearchDTO) -> str:
+        """ETag страницы списка по ключам и версиям книг, без загрузки связей и DTO"""
+        found, page = catalog_cache.get(self._books_cache_key(search_params))
+        if found:
+            return self.books_page_etag(page)
+        
+        search = dict(
+            q=search_params.q,
             title=search_params.title,
             author=search_params.author,
             subject=search_params.subject,
-            skip=search_params.skip,
-            limit=search_params.limit
+            limit=search_params.limit,
+            sort=search_params.sort,
+            available=search_params.available,
+            columns=(Book.key, Book.version)
         )
+        if search_params.cursor:
+            versions, next_cursor = self.book_repo.search_books_after(cursor=search_params.cursor, **search)
+            return self._page_etag(versions, None, None, search_params.limit, next_cursor)
         
-        total = self.book_repo.get_books_count(
+        versions, total, next_cursor = self.book_repo.search_books_with_total(skip=search_params.skip, **search)
+        page_number = search_params.skip // search_params.limit + 1
+        return self._page_etag(versions, total, page_number, search_params.limit, next_cursor)
+    
+    @staticmethod
+    def books_page_etag(page: BookListResponseDTO) -> str:
+        """ETag собранной страницы списка"""
+        versions = [(book.key, book.version) for book in page.items]
+        return BookService._page_etag(versions, page.total, page.page, page.limit, page.next_cursor)
+    
+    @staticmethod
+    def _page_etag(versions: list, total: Optional[int], page: Optional[int],
+                   limit: int, next_cursor: Optional[str]) -> str:
+        return make_etag("books", [list(item) for item in versions], total, page, limit, next_cursor)
+    
+    def _load_books(self, search_params: BookSearchDTO) -> BookListResponseDTO:
+        """Загрузить страницу списка книг из базы"""
+        if search_params.cursor:
+            return self._get_books_after_cursor(search_params)
+        
+        books, total, next_cursor = self.book_repo.search_books_with_total(
+            q=search_params.q,
             title=search_params.title,
             author=search_params.author,
-            subject=search_params.subject
+            subject=search_params.subject,
+            skip=search_params.skip,
+            limit=search_params.limit,
+            profile="detail",
+            sort=search_params.sort,
+            available=search_params.available
         )
         
         # Преобразовать в DTO
-        book_dtos = []
-        for book in books:
-            book_dto = self._convert_to_response_dto(book)
-            book_dtos.append(book_dto)
+        book_dtos = self._convert_to_response_dtos(books)
         
         total_pages = (total + search_params.limit - 1) // search_params.limit
         
@@ -42,16 +100,56 @@ class BookService:
             total=total,
             page=search_params.skip // search_params.limit + 1,
             limit=search_params.limit,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
+        )
+    
+    def _get_books_after_cursor(self, search_params: BookSearchDTO) -> BookListResponseDTO:
+        """Получить страницу книг после курсора (keyset-пагинация)"""
+        books, next_cursor = self.book_repo.search_books_after(
+            cursor=search_params.cursor,
+            q=search_params.q,
+            title=search_params.title,
+            author=search_params.author,
+            subject=search_params.subject,
+            limit=search_params.limit,
+            profile="detail",
+            sort=search_params.sort,
+            available=search_params.available
+        )
+        
+        return BookListResponseDTO(
+            items=self._convert_to_response_dtos(books),
+            limit=search_params.limit,
+            next_cursor=next_cursor
         )
     
     def get_book(self, book_key: int) -> Optional[BookResponseDTO]:
-        """Получить книгу по ключу"""
-        book = self.book_repo.get_by_key(book_key)
+        """Получить книгу по ключу (через кэш каталога)"""
+        return catalog_cache.get_or_load(
+            ("book", book_key), lambda: self._load_book(book_key), lambda book: [book_tag(book_key)]
+        )
+    
+    def get_book_etag(self, book_key: int, representation: str = "book") -> Optional[str]:
+        """ETag книги по одной версии строки; None - книги нет"""
+        found, book = catalog_cache.get(("book", book_key))
+        version = book.version if found else self.book_repo.get_version(book_key)
+        if version is None:
+            return None
+        return make_etag(representation, book_key, version)
+    
+    @staticmethod
+    def book_etag(book: BookResponseDTO, representation: str = "book") -> str:
+        """ETag собранного DTO книги (representation различает /books/{key} и /availability)"""
+        return make_etag(representation, book.key, book.version)
+    
+    def _load_book(self, book_key: int) -> Optional[BookResponseDTO]:
+        """Загрузить книгу из базы"""
+        book = self.book_repo.get_by_key(book_key, profile="detail")
         if not book:
             return None
         
-        return self._convert_to_response_dto(book)
+        return self._convert_to_response_dtos([book])[0]
     
     def create_book(self, book_data: BookCreateDTO) -> BookResponseDTO:
         """Создать новую книгу"""
@@ -62,8 +160,9 @@ class BookService:
             authors_keys=book_data.authors_keys,
             subjects=book_data.subjects
         )
+        invalidate_books([], lists=True)
         
-        return self._convert_to_response_dto(book)
+        return self._convert_to_response_dtos([book])[0]
     
     def update_book(self, book_key: int, book_data: BookUpdateDTO) -> Optional[BookResponseDTO]:
         """Обновить книгу"""
@@ -75,15 +174,18 @@ class BookService:
             authors_keys=book_data.authors_keys,
             subjects=book_data.subjects
         )
+        invalidate_books([book_key], lists=True)
         
         if not book:
             return None
         
-        return self._convert_to_response_dto(book)
+        return self._convert_to_response_dtos([book])[0]
     
     def delete_book(self, book_key: int) -> bool:
         """Удалить книгу"""
-        return self.book_repo.delete_with_relations(book_key)
+        deleted = self.book_repo.delete_with_relations(book_key)
+        invalidate_books([book_key], lists=True)
+        return deleted
     
     def check_book_availability(self, book_key: int) -> bool:
         """Проверить доступность книги"""
@@ -98,7 +200,12 @@ class BookService:
         # Это нужно будет переписать с правильным запросом
         return []
     
-    def _convert_to_response_dto(self, book: Book) -> BookResponseDTO:
+    def _convert_to_response_dtos(self, books: List[Book]) -> List[BookResponseDTO]:
+        """Преобразовать список книг в DTO"""
+        # Доступность уже загружена вместе с книгой (current_issue_id)
+        return [self._convert_to_response_dto(book, book.current_issue_id is None) for book in books]
+    
+    def _convert_to_response_dto(self, book: Book, is_available: bool) -> BookResponseDTO:
         """Преобразовать модель книги в DTO ответа"""
         return BookResponseDTO(
             key=book.key,
@@ -124,7 +231,8 @@ class BookService:
                 "cover_file": cover.cover_file,
                 "book_key": cover.book_key
             } for cover in book.covers],
-            is_available=self.book_repo.is_book_available(book.key)
+            is_available=is_available,
+            version=book.version
         )
 
 
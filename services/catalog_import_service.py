@@ -0,0 +1,229 @@
+import gzip
+import json
+import re
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from functools import lru_cache
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from repositories import BookSearchIndex, CatalogBulkRepository
+
+# /works/OL45883W, /authors/OL1A -> 45883, 1
+OL_KEY = re.compile(r"/(works|authors)/OL(\d+)[WA]$")
+YEAR = re.compile(r"\b(\d{4})\b")
+DATE_FORMATS = ("%Y-%m-%d", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y", "%B %Y", "%b %Y", "%Y")
+
+
+def parse_ol_key(value, kind: str) -> Optional[int]:
+    """Числовой ключ Open Library (/works/OL45883W -> 45883) или None"""
+    if isinstance(value, dict):
+        value = value.get("key")
+    match = OL_KEY.search(value) if isinstance(value, str) else None
+    return int(match.group(2)) if match and match.group(1) == kind else None
+
+
+@lru_cache(maxsize=4096)
+def parse_ol_date(value: Optional[str]) -> Optional[date]:
+    """Дата из свободного текста Open Library ("1925", "April 10, 1925"); иначе год"""
+    if not value:
+        return None
+    value = value.strip()
+    for format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, format).date()
+        except ValueError:
+            pass
+    match = YEAR.search(value)
+    return date(int(match.group(1)), 1, 1) if match and int(match.group(1)) > 0 else None
+
+
+def ol_text(value) -> Optional[str]:
+    """Текст поля Open Library: строка или {"type": "/type/text", "value": ...}"""
+    if isinstance(value, dict):
+        value = value.get("value")
+    return value if isinstance(value, str) and value else None
+
+
+def clip(value: Optional[str], length: int) -> Optional[str]:
+    return value[:length] if value else value
+
+
+class CatalogImportService:
+    """Потоковый импорт дампов Open Library (работы и авторы).
+    
+    Файлы читаются построчно (в том числе .gz): дамп TSV
+    (type, key, revision, last_modified, JSON) или JSONL. Записи
+    накапливаются в пачки по batch_size, каждая пишется одной транзакцией.
+    Книги и авторы сопоставляются по ключу Open Library (ol_key), строки,
+    созданные в библиотеке, не затрагиваются. При загрузке в пустой каталог
+    вторичные и полнотекстовый индексы строятся после загрузки; при
+    повторном импорте темы, обложки и авторы книг заменяются, а документы
+    поиска обновляются вместе с пачкой.
+    
+    Связь с автором, которого еще нет в базе, ждет его записи (поэтому
+    авторов выгоднее загружать первыми); не дождавшиеся связи считаются
+    в skipped_links.
+    """
+    
+    def __init__(self, db: Session, batch_size: int = 2000):
+        self.db = db
+        self.bulk_repo = CatalogBulkRepository(db)
+        self.search_index = BookSearchIndex(db)
+        self.batch_size = batch_size
+        self.stats = Counter()
+        # ol_key автора -> ключи книг, ожидающих его записи
+        self.pending_links: Dict[int, List[int]] = defaultdict(list)
+    
+    def import_files(self, paths: Iterable[str], defer_indexes: bool = True, update_search: bool = True,
+                     progress: Optional[Callable[[Counter], None]] = None) -> Counter:
+        """Импортировать файлы по порядку; вернуть счетчики (строки, записи, секунды фаз)"""
+        initial_load = self.bulk_repo.count_books() == 0
+        indexes = self.bulk_repo.deferrable_indexes() if defer_indexes and initial_load else []
+        started = time.perf_counter()
+        self.bulk_repo.drop_indexes(indexes)
+        try:
+            for path in paths:
+                for batch in self._batches(self._records(path)):
+                    self._write(batch, initial_load, reindex=update_search and not initial_load)
+                    if progress:
+                        progress(self.stats)
+        finally:
+            self.stats["load_seconds"] = time.perf_counter() - started
+            self.stats["skipped_links"] = sum(len(book_keys) for book_keys in self.pending_links.values())
+            self.pending_links.clear()
+            # Индексы восстанавливаются и после ошибки: схема не должна остаться без них
+            self.db.rollback()
+            if indexes:
+                phase_started = time.perf_counter()
+                self.bulk_repo.create_indexes(indexes)
+                self.bulk_repo.analyze()
+                self.stats["index_seconds"] = time.perf_counter() - phase_started
+        
+        if update_search and initial_load:
+            phase_started = time.perf_counter()
+            self.search_index.rebuild(batch_size=5000)
+            self.stats["search_index_seconds"] = time.perf_counter() - phase_started
+        return self.stats
+    
+    def _records(self, path: str) -> Iterator[dict]:
+        """Записи файла по одной"""
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as lines:
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                self.stats["records"] += 1
+                try:
+                    yield json.loads(line if line.startswith("{") else line.rsplit("\t", 1)[-1])
+                except ValueError:
+                    self.stats["skipped_invalid"] += 1
+    
+    def _batches(self, records: Iterator[dict]) -> Iterator[List[Tuple[str, dict]]]:
+        """Пачки (тип, запись) работ и авторов по batch_size"""
+        batch = []
+        for record in records:
+            kind = record.get("type")
+            kind = kind.get("key") if isinstance(kind, dict) else kind
+            if kind not in ("/type/work", "/type/author"):
+                self.stats["skipped_other"] += 1
+                continue
+            batch.append((kind, record))
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def _write(self, batch: List[Tuple[str, dict]], initial_load: bool, reindex: bool) -> None:
+        authors, works = [], []
+        for kind, record in batch:
+            row = self._author_row(record) if kind == "/type/author" else self._book_row(record)
+            if row is None:
+                self.stats["skipped_invalid"] += 1
+            elif kind == "/type/author":
+                authors.append(row)
+            else:
+                works.append((row, record))
+        
+        author_keys = self.bulk_repo.upsert_authors(authors)
+        book_keys = self.bulk_repo.upsert_books([book for book, _ in works])
+        
+        work_authors = {}
+        for book, record in works:
+            work_authors[book_keys[book["ol_key"]]] = {
+                parse_ol_key(entry.get("author") if isinstance(entry, dict) else entry, "authors")
+                for entry in record.get("authors") or []
+            } - {None}
+        known = dict(author_keys)
+        known.update(self.bulk_repo.author_keys(
+            {ol_key for ol_keys in work_authors.values() for ol_key in ol_keys} - known.keys()
+        ))
+        
+        links, subjects, covers = [], [], []
+        for key, ol_keys in work_authors.items():
+            for ol_key in ol_keys:
+                if ol_key in known:
+                    links.append({"book_key": key, "author_key": known[ol_key]})
+                else:
+                    self.pending_links[ol_key].append(key)
+        # Дождавшиеся связи: книги из прошлых пачек получают авторов этой
+        resolved = set()
+        for ol_key, author_key in author_keys.items():
+            for key in self.pending_links.pop(ol_key, ()):
+                links.append({"book_key": key, "author_key": author_key})
+                resolved.add(key)
+        for book, record in works:
+            key = book_keys[book["ol_key"]]
+            subjects.extend(
+                {"book_key": key, "subject": subject[:255]}
+                for subject in dict.fromkeys(s.strip() for s in record.get("subjects") or [] if isinstance(s, str))
+                if subject
+            )
+            covers.extend(
+                {"book_key": key, "cover_file": str(cover)}
+                for cover in dict.fromkeys(record.get("covers") or [])
+                if isinstance(cover, int) and cover > 0
+            )
+        
+        self.bulk_repo.write_children(list(work_authors), links, subjects, covers, replace=not initial_load)
+        # Книги обновленных авторов получают новый ETag. При первой загрузке
+        # книги этих авторов - только что дождавшиеся связи (индекс по author_key отложен)
+        changed = resolved if initial_load else set(self.bulk_repo.linked_books(list(author_keys.values())))
+        self.bulk_repo.bump_versions(changed)
+        if reindex:
+            keys, size = sorted(changed.union(work_authors)), self.bulk_repo.in_chunk
+            for start in range(0, len(keys), size):
+                self.search_index.reindex(keys[start:start + size])
+        self.db.commit()
+        self.stats.update(authors=len(authors), works=len(works), book_authors=len(links),
+                          subjects=len(subjects), covers=len(covers))
+        self.stats["rows"] += len(authors) + len(works) + len(links) + len(subjects) + len(covers)
+    
+    def _book_row(self, record: dict) -> Optional[dict]:
+        key = parse_ol_key(record.get("key"), "works")
+        title = ol_text(record.get("title"))
+        if key is None or title is None:
+            return None
+        return {
+            "ol_key": key,
+            "title": clip(title, 255),
+            "subtitle": clip(ol_text(record.get("subtitle")), 255),
+            "first_publish_date": parse_ol_date(ol_text(record.get("first_publish_date"))),
+            "description": ol_text(record.get("description")),
+        }
+    
+    def _author_row(self, record: dict) -> Optional[dict]:
+        key = parse_ol_key(record.get("key"), "authors")
+        name = ol_text(record.get("name")) or ol_text(record.get("personal_name"))
+        if key is None or name is None:
+            return None
+        return {
+            "ol_key": key,
+            "name": clip(name, 255),
+            "biography": ol_text(record.get("bio")),
+            "birth_date": parse_ol_date(ol_text(record.get("birth_date"))),
+            "death_date": parse_ol_date(ol_text(record.get("death_date"))),
+            "wikipedia": clip(ol_text(record.get("wikipedia")), 500),
+        }
@@ -1,8 +1,12 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from repositories import CustomerRepository
-from dto import CustomerCreateDTO, CustomerUpdateDTO, CustomerResponseDTO, CustomerSearchDTO, CustomerListResponseDTO
+from dto import (
+    CustomerCreateDTO, CustomerUpdateDTO, CustomerResponseDTO, CustomerSearchDTO,
+    CustomerLookupDTO, CustomerListResponseDTO, CursorPageDTO
+)
 from models import Customer
+from etag import make_etag
 
 
 class CustomerService:
@@ -12,14 +16,69 @@ class CustomerService:
         self.db = db
         self.customer_repo = CustomerRepository(db)
     
-    def get_customers(self, search_params: CustomerSearchDTO) -> List[CustomerResponseDTO]:
-        """Получить список клиентов с поиском"""
-        customers = self.customer_repo.search_customers(
+    def get_customers(self, search_params: CustomerSearchDTO) -> CursorPageDTO[CustomerResponseDTO]:
+        """Получить страницу клиентов с поиском"""
+        customers, next_cursor = self.customer_repo.search_customers(
             customer_id=search_params.customer_id,
-            name=search_params.name
+            name=search_params.name,
+            cursor=search_params.cursor,
+            limit=search_params.limit
         )
         
-        return [self._convert_to_response_dto(customer) for customer in customers]
+        return CursorPageDTO[CustomerResponseDTO](
+            items=[self._convert_to_response_dto(customer) for customer in customers],
+            next_cursor=next_cursor
+        )
+    
+    def lookup_customers(self, params: CustomerLookupDTO) -> CustomerListResponseDTO:
+        """Найти клиентов по началу имени, email или телефону (страница и общее количество)"""
+        customers, total = self.customer_repo.lookup_customers(
+            name=params.name,
+            email=params.email,
+            phone=params.phone,
+            skip=params.skip,
+            limit=params.limit
+        )
+        
+        return CustomerListResponseDTO(
+            items=[self._convert_to_response_dto(customer) for customer in customers],
+            total=total,
+            page=params.skip // params.limit + 1,
+            limit=params.limit,
+            total_pages=(total + params.limit - 1) // params.limit
+        )
+    
+    def get_customers_etag(self, search_params: CustomerSearchDTO) -> str:
+        """ETag страницы клиентов по ID и версиям, без сборки DTO"""
+        versions, next_cursor = self.customer_repo.search_customers(
+            customer_id=search_params.customer_id,
+            name=search_params.name,
+            cursor=search_params.cursor,
+            limit=search_params.limit,
+            columns=(Customer.id, Customer.version)
+        )
+        return self._page_etag(versions, next_cursor)
+    
+    @staticmethod
+    def customers_page_etag(page: CursorPageDTO[CustomerResponseDTO]) -> str:
+        """ETag собранной страницы клиентов"""
+        return CustomerService._page_etag([(customer.id, customer.version) for customer in page.items], page.next_cursor)
+    
+    @staticmethod
+    def _page_etag(versions: list, next_cursor: Optional[str]) -> str:
+        return make_etag("customers", [list(item) for item in versions], next_cursor)
+    
+    def get_customer_etag(self, customer_id: int) -> Optional[str]:
+        """ETag клиента по версии строки; None - клиента нет"""
+        version = self.customer_repo.get_version(customer_id)
+        if version is None:
+            return None
+        return make_etag("customer", customer_id, version)
+    
+    @staticmethod
+    def customer_etag(customer: CustomerResponseDTO) -> str:
+        """ETag собранного DTO клиента"""
+        return make_etag("customer", customer.id, customer.version)
     
     def get_customer(self, customer_id: int) -> Optional[CustomerResponseDTO]:
         """Получить клиента по ID"""
@@ -61,6 +120,7 @@ class CustomerService:
             city=customer.city,
             phone=customer.phone,
             email=customer.email,
+            version=customer.version,
             issues=[]  # Пока не загружаем выдачи для простоты
         )
 
@@ -1,12 +1,15 @@
 from sqlalchemy.orm import Session
-from datetime import date
+from datetime import date, timedelta
 from typing import List, Optional
 from repositories import IssueRepository, BookRepository, CustomerRepository
 from dto import (
     IssueCreateDTO, IssueResponseDTO, IssueWithBookDTO, IssueWithCustomerDTO,
-    IssueRenewResponseDTO, IssueReturnResponseDTO
+    IssueRenewResponseDTO, IssueReturnResponseDTO, CursorPageDTO,
+    IssueBatchCreateDTO, IssueBatchItemDTO, IssueBatchResponseDTO,
+    IssueBatchReturnDTO, IssueBatchReturnItemDTO, IssueBatchReturnResponseDTO
 )
 from models import Issue
+from cache import invalidate_books
 
 
 class IssueService:
@@ -20,27 +23,45 @@ class IssueService:
     
     def get_current_issues_by_customer(self, customer_id: int) -> List[IssueWithBookDTO]:
         """Получить текущие выдачи клиента"""
-        issues = self.issue_repo.get_current_issues_by_customer(customer_id)
+        issues = self.issue_repo.get_current_issues_by_customer(customer_id, profile="with_book")
         
         return [self._convert_to_issue_with_book_dto(issue) for issue in issues]
     
-    def get_issue_history_by_customer(self, customer_id: int) -> List[IssueWithBookDTO]:
-        """Получить историю выдач клиента"""
-        issues = self.issue_repo.get_issue_history_by_customer(customer_id)
+    def get_issue_history_by_customer(self, customer_id: int, cursor: Optional[str] = None,
+                                      limit: int = 100) -> CursorPageDTO[IssueWithBookDTO]:
+        """Получить страницу истории выдач клиента"""
+        issues, next_cursor = self.issue_repo.get_issue_history_by_customer(
+            customer_id, profile="with_book", cursor=cursor, limit=limit
+        )
         
-        return [self._convert_to_issue_with_book_dto(issue) for issue in issues]
+        return CursorPageDTO[IssueWithBookDTO](
+            items=[self._convert_to_issue_with_book_dto(issue) for issue in issues],
+            next_cursor=next_cursor
+        )
     
-    def get_book_history(self, book_key: int) -> List[IssueWithCustomerDTO]:
-        """Получить историю выдачи книги"""
-        issues = self.issue_repo.get_book_history(book_key)
+    def get_book_history(self, book_key: int, cursor: Optional[str] = None,
+                         limit: int = 100) -> CursorPageDTO[IssueWithCustomerDTO]:
+        """Получить страницу истории выдачи книги"""
+        issues, next_cursor = self.issue_repo.get_book_history(
+            book_key, profile="with_customer", cursor=cursor, limit=limit
+        )
         
-        return [self._convert_to_issue_with_customer_dto(issue) for issue in issues]
+        return CursorPageDTO[IssueWithCustomerDTO](
+            items=[self._convert_to_issue_with_customer_dto(issue) for issue in issues],
+            next_cursor=next_cursor
+        )
     
-    def get_overdue_issues(self) -> List[IssueWithCustomerDTO]:
-        """Получить просроченные выдачи"""
-        issues = self.issue_repo.get_overdue_issues()
+    def get_overdue_issues(self, sort: str = "due", cursor: Optional[str] = None,
+                           limit: int = 100) -> CursorPageDTO[IssueWithCustomerDTO]:
+        """Получить страницу просроченных выдач"""
+        issues, next_cursor = self.issue_repo.get_overdue_issues(
+            profile="with_customer", sort=sort, cursor=cursor, limit=limit
+        )
         
-        return [self._convert_to_issue_with_customer_dto(issue) for issue in issues]
+        return CursorPageDTO[IssueWithCustomerDTO](
+            items=[self._convert_to_issue_with_customer_dto(issue) for issue in issues],
+            next_cursor=next_cursor
+        )
     
     def create_issue(self, issue_data: IssueCreateDTO) -> IssueResponseDTO:
         """Создать новую выдачу"""
@@ -48,17 +69,76 @@ class IssueService:
             book_key=issue_data.book_key,
             customer_id=issue_data.customer_id
         )
+        # Книга стала недоступной - сбросить ее в кэше каталога
+        invalidate_books([issue.book_key], availability=True)
         
         return self._convert_to_response_dto(issue)
     
+    def create_issues(self, batch: IssueBatchCreateDTO) -> IssueBatchResponseDTO:
+        """Выдать клиенту несколько книг одной транзакцией"""
+        results = self.issue_repo.create_issues(batch.book_keys, batch.customer_id)
+        invalidate_books([book_key for book_key, issue_id, _ in results if issue_id is not None], availability=True)
+        return_until = date.today() + timedelta(days=self.issue_repo.loan_period_days)
+        
+        items = [
+            IssueBatchItemDTO(
+                book_key=book_key,
+                issued=issue_id is not None,
+                issue_id=issue_id,
+                return_until=return_until if issue_id is not None else None,
+                error=error
+            )
+            for book_key, issue_id, error in results
+        ]
+        issued = sum(1 for item in items if item.issued)
+        return IssueBatchResponseDTO(
+            customer_id=batch.customer_id,
+            issued=issued,
+            failed=len(items) - issued,
+            items=items
+        )
+    
     def return_book(self, issue_id: int) -> IssueReturnResponseDTO:
         """Вернуть книгу"""
         issue = self.issue_repo.return_book(issue_id)
         if not issue:
             raise ValueError("Issue not found")
+        invalidate_books([issue.book_key], availability=True)
         
         return IssueReturnResponseDTO(message="Book returned successfully")
     
+    def return_books(self, batch: IssueBatchReturnDTO) -> IssueBatchReturnResponseDTO:
+        """Вернуть пачку книг и отметить просроченные"""
+        results = self.issue_repo.return_issues(batch.issue_ids, batch.book_keys)
+        invalidate_books([row.book_key for row, _ in results if row is not None], availability=True)
+        requested = [("issue_id", issue_id) for issue_id in batch.issue_ids] + \
+                    [("book_key", book_key) for book_key in batch.book_keys]
+        today = date.today()
+        
+        items = []
+        for (field, value), (row, error) in zip(requested, results):
+            if row is None:
+                items.append(IssueBatchReturnItemDTO(returned=False, error=error, **{field: value}))
+                continue
+            days_overdue = max((today - row.return_until).days, 0)
+            items.append(IssueBatchReturnItemDTO(
+                issue_id=row.id,
+                book_key=row.book_key,
+                customer_id=row.customer_id,
+                returned=True,
+                return_until=row.return_until,
+                is_overdue=days_overdue > 0,
+                days_overdue=days_overdue
+            ))
+        
+        returned = sum(1 for item in items if item.returned)
+        return IssueBatchReturnResponseDTO(
+            returned=returned,
+            overdue=sum(1 for item in items if item.is_overdue),
+            failed=len(items) - returned,
+            items=items
+        )
+    
     def renew_issue(self, issue_id: int) -> IssueRenewResponseDTO:
         """Продлить выдачу"""
         issue = self.issue_repo.renew_issue(issue_id)
@@ -102,7 +182,7 @@ class IssueService:
         """Преобразовать выдачу в DTO с информацией о книге"""
         today = date.today()
         is_overdue = issue.return_until < today and issue.return_date is None
-        was_overdue = issue.return_date and issue.return_date > issue.return_until
+        was_overdue = issue.return_date is not None and issue.return_date > issue.return_until
         
         return IssueWithBookDTO(
             id=issue.id,
@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List
+from repositories import AsyncIssueRepository
+
+
+class OverdueExportService:
+    """Потоковая выгрузка просроченных выдач (NDJSON / CSV).
+    
+    Строки читаются с сервера пачками и сразу отдаются клиенту, поэтому
+    память не зависит от количества просрочек.
+    """
+    
+    media_types = {
+        "ndjson": "application/x-ndjson",
+        "csv": "text/csv; charset=utf-8",
+    }
+    columns = [
+        "issue_id", "book_key", "title", "customer_id", "customer_name", "email", "phone",
+        "date_of_issue", "return_until", "days_overdue", "renewed"
+    ]
+    
+    def __init__(self, db: AsyncSession, batch_size: int = 500):
+        self.issue_repo = AsyncIssueRepository(db)
+        self.batch_size = batch_size
+    
+    async def export(self, format: str) -> AsyncIterator[str]:
+        """Отдать отчет частями в формате format"""
+        if format not in self.media_types:
+            raise ValueError(f"Unknown export format: {format}")
+        encode = self._encode_csv if format == "csv" else self._encode_ndjson
+        today = date.today()
+        
+        if format == "csv":
+            yield self._csv_lines([self.columns])
+        async for rows in self.issue_repo.stream_overdue_report(self.batch_size):
+            yield encode([self._record(row, today) for row in rows])
+    
+    def _record(self, row, today: date) -> dict:
+        """Строка отчета с вычисленным количеством дней просрочки"""
+        record = dict(row._mapping)
+        record["days_overdue"] = (today - row.return_until).days
+        return record
+    
+    def _encode_ndjson(self, records: List[dict]) -> str:
+        return "".join(json.dumps(record, default=str, ensure_ascii=False) + "\n" for record in records)
+    
+    def _encode_csv(self, records: List[dict]) -> str:
+        return self._csv_lines([[record[column] for column in self.columns] for record in records])
+    
+    def _csv_lines(self, rows: List[list]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
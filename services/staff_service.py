@@ -0,0 +1,46 @@
+from sqlalchemy.orm import Session
+from typing import List
+from auth import get_password_hash, staff_cache, staff_tag
+from repositories import StaffUserRepository
+from models import StaffUser
+
+
+class StaffService:
+    """Управление учетными записями сотрудников (init_db.py, manage_staff.py).
+    
+    Пароль хэшируется здесь же, синхронно: сервис не вызывается из event loop.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.staff_repo = StaffUserRepository(db)
+    
+    def list_users(self) -> List[StaffUser]:
+        """Все учетные записи"""
+        return self.staff_repo.get_all_users()
+    
+    def create_user(self, username: str, password: str) -> StaffUser:
+        """Создать учетную запись"""
+        user = self.staff_repo.create_user(username, get_password_hash(password))
+        staff_cache.invalidate(staff_tag(username))
+        return user
+    
+    def ensure_user(self, username: str, password: str) -> bool:
+        """Создать учетную запись, если ее нет; True, если создана"""
+        if self.staff_repo.get_by_username(username) is not None:
+            return False
+        self.create_user(username, password)
+        return True
+    
+    def set_password(self, username: str, password: str) -> StaffUser:
+        """Сменить пароль"""
+        return self._update(username, {"password_hash": get_password_hash(password)})
+    
+    def set_active(self, username: str, is_active: bool) -> StaffUser:
+        """Включить или отключить учетную запись"""
+        return self._update(username, {"is_active": is_active})
+    
+    def _update(self, username: str, fields: dict) -> StaffUser:
+        user = self.staff_repo.update_user(username, fields)
+        staff_cache.invalidate(staff_tag(username))
+        return user
@@ -0,0 +1,87 @@
+"""
+Замеры запуска приложения: импорт, сборка приложения, прогрев пулов
+и первый запрос. Отдаются в /health/startup и пишутся в лог при старте.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# Логгер uvicorn: строки о запуске попадают в его вывод без отдельной настройки logging
+logger = logging.getLogger("uvicorn.error")
+
+
+class StartupTimings:
+    """Длительности фаз запуска процесса"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases: Dict[str, float] = {}
+        # Момент готовности (после lifespan) и длительность первого запроса
+        self.ready_at: Optional[float] = None
+        self.first_request: Optional[float] = None
+        self.first_request_path: Optional[str] = None
+    
+    def record(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] = seconds
+    
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """Записать длительность блока with как фазу phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+    
+    def mark_ready(self) -> None:
+        self.ready_at = time.perf_counter()
+        logger.info("Startup: %s", ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.phases.items()))
+    
+    def record_first_request(self, path: str, seconds: float) -> bool:
+        """Запомнить первый запрос; False, если он уже был"""
+        with self._lock:
+            if self.first_request is not None:
+                return False
+            self.first_request, self.first_request_path = seconds, path
+        logger.info("First request %s: %.1f ms", path, seconds * 1000)
+        return True
+    
+    def snapshot(self) -> dict:
+        """Замеры в миллисекундах для /health/startup"""
+        with self._lock:
+            return {
+                "phases_ms": {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()},
+                "ready": self.ready_at is not None,
+                "first_request_ms": round(self.first_request * 1000, 2) if self.first_request is not None else None,
+                "first_request_path": self.first_request_path,
+            }
+
+
+startup_timings = StartupTimings()
+
+
+class FirstRequestTimer:
+    """ASGI middleware: длительность первого HTTP запроса процесса.
+    
+    После первого запроса остается одна проверка флага на запрос.
+    """
+    
+    def __init__(self, app, timings: StartupTimings = startup_timings):
+        self.app = app
+        self.timings = timings
+        self._pending = True
+    
+    async def __call__(self, scope, receive, send):
+        if not self._pending or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if self.timings.record_first_request(scope["path"], time.perf_counter() - started):
+                self._pending = False
@@ -0,0 +1,5 @@
+"""Общая настройка тестов: временная база SQLite вместо рабочей"""
+from benchmarks.common import use_temporary_database
+
+# До импорта database: тесты не должны открывать bookmaster3000.db
+use_temporary_database()
@@ -0,0 +1,57 @@
+"""Параллельные пачки выдач и возвратов не нарушают инварианты выдач"""
+import threading
+from argparse import Namespace
+
+import pytest
+
+from benchmarks.checkout_contention import INVARIANTS, check_invariants, prepare, run_level
+from database import SessionLocal, engine
+from repositories import IssueRepository
+
+
+@pytest.mark.parametrize("threads", [8, 32])
+def test_batch_checkouts_keep_the_loan_limit(threads):
+    # Мало клиентов и пачки по 4 книги: выдачи одному клиенту постоянно пересекаются
+    args = Namespace(books=60, customers=3, batch=4, duration=2.0)
+    prepare(engine, args.books, args.customers)
+    stats, _ = run_level(engine, args, threads)
+
+    assert stats["checkouts"] > 0
+    assert check_invariants(engine, IssueRepository.max_active_issues) == dict.fromkeys(INVARIANTS, 0)
+
+
+def test_parallel_batch_returns_close_each_issue_once():
+    # Два пульта возврата сканируют одни и те же книги
+    limit = IssueRepository.max_active_issues
+    prepare(engine, books=400, customers=400 // limit)
+    db = SessionLocal()
+    try:
+        repo = IssueRepository(db)
+        book_keys = list(range(1, 401))
+        for n, customer_id in enumerate(range(1000, 1000 + 400 // limit)):
+            repo.create_issues(book_keys[n * limit:(n + 1) * limit], customer_id)
+        issue_ids = [issue.id for issue in repo.get_all(limit=1000)]
+    finally:
+        db.close()
+    assert len(issue_ids) == 400
+
+    barrier = threading.Barrier(2)
+    returned = []
+
+    def desk():
+        session = SessionLocal()
+        try:
+            barrier.wait()
+            results = IssueRepository(session).return_issues(issue_ids, [])
+            returned.append(sum(1 for row, error in results if row is not None))
+        finally:
+            session.close()
+
+    desks = [threading.Thread(target=desk) for _ in range(2)]
+    for thread in desks:
+        thread.start()
+    for thread in desks:
+        thread.join()
+
+    assert sorted(returned) == [0, 400]
+    assert check_invariants(engine, limit) == dict.fromkeys(INVARIANTS, 0)
@@ -0,0 +1,43 @@
+"""Количество SQL запросов на endpoint чтения не зависит от объема данных"""
+import pytest
+from fastapi.testclient import TestClient
+
+from auth import create_access_token
+from benchmarks.query_counts import DATASETS, ENDPOINTS, load_dataset, measure
+from main import app
+
+# Текущее число запросов; рост - регрессия (N+1, лишняя загрузка связей)
+EXPECTED = {
+    "/books?limit=100": 4,
+    "/books/1": 4,
+    "/books/1/availability": 4,
+    "/customers": 1,
+    "/customers/1000": 1,
+    "/customers/search?name=customer": 1,
+    "/issues/customers/1000/current": 1,
+    "/issues/customers/1000/history": 1,
+    "/issues/books/1/history": 1,
+    "/issues/overdue": 1,
+}
+
+
+@pytest.fixture(scope="module")
+def counts() -> dict:
+    """Количество запросов на каждый endpoint для каждого набора данных"""
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin'})}"}
+    results = {}
+    for name in DATASETS:
+        load_dataset(name)
+        results[name] = measure(client, headers)
+    return results
+
+
+@pytest.mark.parametrize("path", ENDPOINTS)
+def test_query_count_does_not_grow_with_data(counts, path):
+    assert counts["small"][path] == counts["large"][path]
+
+
+@pytest.mark.parametrize("path", ENDPOINTS)
+def test_query_count_is_unchanged(counts, path):
+    assert counts["large"][path] == EXPECTED[path]